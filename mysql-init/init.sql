@@ -59,3 +59,10 @@ CREATE TABLE IF NOT EXISTS data_logs (
 
 GRANT ALL PRIVILEGES ON testdb.* TO 'sqoop'@'%';
 FLUSH PRIVILEGES;
+
+-- Transaction ID sequences (leased in blocks by scripts/id_allocator.py;
+-- the row is seeded from MAX(transaction_id) on first use)
+CREATE TABLE IF NOT EXISTS id_sequences (
+    name VARCHAR(50) PRIMARY KEY,
+    next_id BIGINT UNSIGNED NOT NULL
+);
@@ -5,11 +5,23 @@ Analyzes the Online Sales Data CSV to understand structure and prepare for proce
 """
 
 import pandas as pd
+import argparse
 import os
 from pathlib import Path
 
-def analyze_dataset():
-    """Analyze the sales dataset and print comprehensive information"""
+from profile_cache import load_profile, describe_status
+
+def analyze_dataset(workers=None):
+    """
+    Analyze the sales dataset and print comprehensive information
+
+    The file is profiled in a single chunked, multi-process pass
+    (see dataset_profile.py), so memory stays constant for large exports.
+    Profiles are cached (see profile_cache.py), so unchanged files are not rescanned.
+
+    Args:
+        workers: Profiler worker processes (default: CPU count)
+    """
     
     # Dataset path
     data_dir = Path("/shared-data") if os.path.exists("/shared-data") else Path("shared-data")
@@ -29,64 +41,64 @@ def analyze_dataset():
     print(f"📁 File: {csv_file.name}")
     print(f"📊 Size: {file_size_mb:.2f} MB\n")
     
-    # Read the dataset
-    print("📖 Loading dataset...")
-    df = pd.read_csv(csv_file)
+    # Profile the dataset in one streaming pass
+    print("📖 Profiling dataset (single pass)...")
+    profile, cache_status = load_profile(csv_file, workers=workers)
+    print(describe_status(cache_status))
     
     # Basic statistics
     print(f"\n{'='*60}")
     print("BASIC STATISTICS")
     print('='*60)
-    print(f"Total Rows: {len(df):,}")
-    print(f"Total Columns: {len(df.columns)}")
+    print(f"Total Rows: {profile.rows:,}")
+    print(f"Total Columns: {len(profile.columns)}")
     print(f"\nColumn Names and Types:")
     print("-" * 60)
-    for col in df.columns:
-        dtype = df[col].dtype
-        null_count = df[col].isnull().sum()
-        print(f"  {col:30s} | {str(dtype):12s} | {null_count} nulls")
+    for col in profile.columns:
+        dtype = profile.dtypes[col]
+        null_count = profile.nulls[col]
+        distinct = profile.distinct[col].count()
+        print(f"  {col:30s} | {str(dtype):12s} | {null_count} nulls | ~{distinct:,} distinct")
     
     # Sample data
     print(f"\n{'='*60}")
     print("SAMPLE DATA (First 5 rows)")
     print('='*60)
-    print(df.head().to_string())
+    print(profile.head.to_string())
     
     # Value counts for categorical columns
     print(f"\n{'='*60}")
     print("CATEGORICAL DATA ANALYSIS")
     print('='*60)
     
-    categorical_cols = ['Product Category', 'Region', 'Payment Method']
-    for col in categorical_cols:
-        if col in df.columns:
-            print(f"\n{col}:")
-            print(df[col].value_counts())
+    for col in profile.categorical_cols:
+        print(f"\n{col}:")
+        print(pd.Series(profile.categories[col], name='count').rename_axis(col).sort_values(ascending=False))
     
     # Numerical statistics
     print(f"\n{'='*60}")
     print("NUMERICAL DATA STATISTICS")
     print('='*60)
-    numerical_cols = ['Units Sold', 'Unit Price', 'Total Revenue']
-    if all(col in df.columns for col in numerical_cols):
-        print(df[numerical_cols].describe())
+    if profile.numerical_cols:
+        print(profile.describe())
+        print("(quantiles are approximate)")
     
     # Date analysis
     print(f"\n{'='*60}")
     print("DATE ANALYSIS")
     print('='*60)
-    if 'Date' in df.columns:
-        df['Date'] = pd.to_datetime(df['Date'])
-        print(f"Date Range: {df['Date'].min()} to {df['Date'].max()}")
-        print(f"Total Days: {(df['Date'].max() - df['Date'].min()).days}")
+    first_date, last_date = profile.date_range()
+    if first_date is not None:
+        print(f"Date Range: {first_date} to {last_date}")
+        print(f"Total Days: {(last_date - first_date).days}")
         print(f"\nTransactions by Month:")
-        print(df.groupby(df['Date'].dt.to_period('M')).size())
+        print(profile.date_histogram('M'))
     
     # Recommendations
     print(f"\n{'='*60}")
     print("RECOMMENDED DATA SPLIT STRATEGY")
     print('='*60)
-    total_rows = len(df)
+    total_rows = profile.rows
     historical_count = int(total_rows * 0.7)
     realtime_count = total_rows - historical_count
     
@@ -94,8 +106,8 @@ def analyze_dataset():
     print(f"  ├─ Historical (MySQL): {historical_count:,} records (70%)")
     print(f"  └─ Real-time (Kafka):  {realtime_count:,} records (30%)\n")
     
-    if 'Date' in df.columns:
-        split_date = df.sort_values('Date').iloc[historical_count]['Date']
+    if first_date is not None:
+        split_date = profile.date_at_row(historical_count)
         print(f"Suggested Split Date: {split_date}")
         print(f"  ├─ Historical: Before {split_date}")
         print(f"  └─ Real-time: From {split_date} onwards")
@@ -112,5 +124,13 @@ def analyze_dataset():
     
     print("\n✅ Analysis Complete!\n")
 
+def main():
+    parser = argparse.ArgumentParser(description='Analyze the sales dataset')
+    parser.add_argument('--workers', type=int, help='Profiler worker processes (default: CPU count)')
+    
+    args = parser.parse_args()
+    
+    analyze_dataset(args.workers)
+
 if __name__ == "__main__":
-    analyze_dataset()
+    main()
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Async Real-time Streamer
+asyncio dual-write engine: many transactions in flight to Kafka and MySQL at once
+
+Three stages run concurrently and are decoupled by bounded queues:
+
+  generate ──┬──> kafka queue ──> publish stage (aiokafka, acks in callbacks)
+             └──> mysql queue ──> writer tasks (aiomysql pool, one multi-row INSERT + commit per batch)
+
+Every generated transaction goes to both queues. A slow sink only fills its
+own queue; the other sink keeps draining its backlog, and generation pauses
+once the full queue has no room (backpressure), so memory stays bounded.
+The coupling is deliberate: both sinks must receive every row, so once the
+faster sink has drained its queue it runs at the slower one's pace. Pacing
+them separately would mean buffering without bound or dropping rows.
+
+Leasing a block of transaction IDs is a blocking MySQL round trip (retried
+with sleeps if it fails), so it runs in a worker thread, off the event loop.
+
+The sinks are plain objects with the aiokafka / aiomysql method names, so
+InMemoryKafkaProducer and InMemoryMySQLPool below stand in for them in
+tests and dry runs (--fake-sinks) without a broker or database.
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+
+from realtime_stream import RealtimeStreamer, INSERT_SQL, mysql_row
+from partitioning import KEY_STRATEGIES, record_key, encode_key
+from serializers import SERIALIZERS, get_serializer
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+TOPIC = 'ecommerce-transactions'
+MYSQL_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': 'rootpassword',
+    'db': 'testdb'
+}
+
+# Seconds between throughput log lines
+REPORT_INTERVAL = 1.0
+
+class InMemoryKafkaProducer:
+    """
+    In-process stand-in for aiokafka.AIOKafkaProducer
+
+    send() returns a future that resolves after `latency` seconds; at most
+    `max_pending` sends are unresolved at once, beyond that send() waits,
+    like a full producer buffer.
+    """
+
+    def __init__(self, latency=0.005, max_pending=10000, failure_rate=0.0, value_serializer=None,
+                 key_serializer=None, partitions=3):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.value_serializer = value_serializer or (lambda v: v)
+        self.key_serializer = key_serializer or (lambda k: k)
+        self.partitions = partitions
+        self.messages = []
+        self.pending = 0
+        self._slots = asyncio.Semaphore(max_pending)
+
+    async def start(self):
+        pass
+
+    async def send(self, topic, value=None, key=None):
+        await self._slots.acquire()
+        self.pending += 1
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        value, key = self.value_serializer(value), self.key_serializer(key)
+
+        def deliver():
+            self._slots.release()
+            self.pending -= 1
+            if random.random() < self.failure_rate:
+                future.set_exception(RuntimeError("simulated delivery failure"))
+            else:
+                partition = hash(key) % self.partitions if key is not None else random.randrange(self.partitions)
+                self.messages.append((topic, key, value, partition))
+                future.set_result(partition)
+
+        loop.call_later(self.latency, deliver)
+        return future
+
+    async def flush(self):
+        while self.pending:
+            await asyncio.sleep(self.latency)
+
+    async def stop(self):
+        await self.flush()
+
+class _InMemoryCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def executemany(self, sql, rows):
+        pool = self.conn.pool
+        await asyncio.sleep(pool.latency + pool.row_latency * len(rows))
+        self.conn.pending.extend(rows)
+
+class _InMemoryConnection:
+    def __init__(self, pool):
+        self.pool = pool
+        self.pending = []
+
+    def cursor(self):
+        return _InMemoryCursor(self)
+
+    async def commit(self):
+        await asyncio.sleep(self.pool.latency)
+        self.pool.rows.extend(self.pending)
+        self.pending = []
+
+    async def rollback(self):
+        self.pending = []
+
+class _InMemoryAcquire:
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def __aenter__(self):
+        await self.pool.slots.acquire()
+        return _InMemoryConnection(self.pool)
+
+    async def __aexit__(self, *exc):
+        self.pool.slots.release()
+        return False
+
+class InMemoryMySQLPool:
+    """
+    In-process stand-in for an aiomysql pool
+
+    Each statement costs `latency` + `row_latency` per row; at most
+    `maxsize` connections are checked out at once. Committed rows are
+    collected in `rows`.
+    """
+
+    def __init__(self, maxsize=4, latency=0.002, row_latency=0.00002):
+        self.maxsize = maxsize
+        self.latency = latency
+        self.row_latency = row_latency
+        self.slots = asyncio.Semaphore(maxsize)
+        self.rows = []
+
+    def acquire(self):
+        return _InMemoryAcquire(self)
+
+    def close(self):
+        pass
+
+    async def wait_closed(self):
+        pass
+
+class AsyncRealtimeStreamer:
+    """
+    Generate transactions and dual-write them to Kafka and MySQL concurrently
+
+    Args:
+        producer: Started-or-not aiokafka-style producer (start/send/flush/stop)
+        pool: aiomysql-style pool (acquire() -> connection with cursor()/commit()/rollback())
+        queue_size: Capacity of each stage's queue
+        db_writers: Concurrent MySQL writer tasks (at most the pool size)
+        db_batch_size: Most rows per INSERT + commit
+        key_by: Kafka message key strategy (see partitioning.py)
+        first_transaction_id: First ID to generate (default: leased in blocks from MySQL, see id_allocator.py)
+    """
+
+    def __init__(self, producer, pool, queue_size=10000, db_writers=4, db_batch_size=500, key_by=None,
+                 first_transaction_id=None):
+        self.producer = producer
+        self.pool = pool
+        self.kafka_queue = asyncio.Queue(maxsize=queue_size)
+        self.mysql_queue = asyncio.Queue(maxsize=queue_size)
+        self.db_writers = db_writers
+        self.db_batch_size = db_batch_size
+        self.key_by = key_by if key_by != 'none' else None
+        self.generator = RealtimeStreamer(first_transaction_id=first_transaction_id)
+        self.generated = 0
+        self.kafka_sent = 0
+        self.kafka_acked = 0
+        self.kafka_failed = 0
+        self.mysql_written = 0
+        self.mysql_failed = 0
+
+    async def generate(self, rate=None, duration=None, count=None):
+        """Produce transactions into both queues, paced at `rate` per second if given"""
+        start = time.monotonic()
+        while True:
+            elapsed = time.monotonic() - start
+            if (duration and elapsed >= duration) or (count and self.generated >= count):
+                return
+            if rate:
+                due = int(elapsed * rate) - self.generated
+                if due <= 0:
+                    await asyncio.sleep(min(0.005, 1 / rate))
+                    continue
+            else:
+                due = 100
+            if count:
+                due = min(due, count - self.generated)
+            for _ in range(due):
+                transaction = await self.next_transaction()
+                # put() waits while a queue is full: this is where backpressure lands,
+                # on both sinks, since each must get every transaction
+                await self.kafka_queue.put(transaction)
+                await self.mysql_queue.put(transaction)
+                self.generated += 1
+            await asyncio.sleep(0)
+
+    async def next_transaction(self):
+        """Generate a transaction, leasing the next block of IDs in a worker thread when one is due"""
+        allocator = self.generator.id_allocator
+        if allocator and allocator.exhausted:
+            return await asyncio.to_thread(self.generator.generate_transaction)
+        return self.generator.generate_transaction()
+
+    def _on_delivery(self, future):
+        if future.cancelled() or future.exception():
+            self.kafka_failed += 1
+        else:
+            self.kafka_acked += 1
+
+    async def publish(self):
+        """Kafka stage: send without waiting for each ack"""
+        while True:
+            transaction = await self.kafka_queue.get()
+            try:
+                delivery = await self.producer.send(TOPIC, value=transaction, key=record_key(transaction, self.key_by))
+                delivery.add_done_callback(self._on_delivery)
+                self.kafka_sent += 1
+            except Exception as e:
+                self.kafka_failed += 1
+                logger.error(f"❌ Kafka send failed for transaction #{transaction['transaction_id']}: {e}")
+            finally:
+                self.kafka_queue.task_done()
+
+    async def write(self):
+        """MySQL stage: drain up to db_batch_size queued rows per INSERT + commit"""
+        while True:
+            batch = [await self.mysql_queue.get()]
+            while len(batch) < self.db_batch_size and not self.mysql_queue.empty():
+                batch.append(self.mysql_queue.get_nowait())
+            try:
+                async with self.pool.acquire() as conn:
+                    try:
+                        async with conn.cursor() as cursor:
+                            await cursor.executemany(INSERT_SQL, [mysql_row(t) for t in batch])
+                        await conn.commit()
+                        self.mysql_written += len(batch)
+                    except Exception:
+                        await conn.rollback()
+                        raise
+            except Exception as e:
+                self.mysql_failed += len(batch)
+                logger.error(f"❌ Failed to save batch of {len(batch)} to MySQL: {e}")
+            finally:
+                for _ in batch:
+                    self.mysql_queue.task_done()
+
+    async def report(self):
+        last = (time.monotonic(), 0, 0, 0)
+        while True:
+            await asyncio.sleep(REPORT_INTERVAL)
+            now = time.monotonic()
+            elapsed = now - last[0]
+            logger.info(f"📊 generated {(self.generated - last[1]) / elapsed:,.0f}/s | "
+                        f"kafka acked {(self.kafka_acked - last[2]) / elapsed:,.0f}/s "
+                        f"(queue {self.kafka_queue.qsize():,}/{self.kafka_queue.maxsize:,}, failed {self.kafka_failed:,}) | "
+                        f"mysql {(self.mysql_written - last[3]) / elapsed:,.0f}/s "
+                        f"(queue {self.mysql_queue.qsize():,}/{self.mysql_queue.maxsize:,}, failed {self.mysql_failed:,})")
+            last = (now, self.generated, self.kafka_acked, self.mysql_written)
+
+    async def run(self, rate=None, duration=None, count=None):
+        """
+        Stream until duration seconds or count transactions (None for both = until cancelled)
+
+        On the way out both queues are drained and the producer flushed, so
+        every generated transaction has been attempted on both sinks.
+        """
+        await self.producer.start()
+        workers = [asyncio.create_task(self.publish()), asyncio.create_task(self.report())]
+        workers += [asyncio.create_task(self.write()) for _ in range(self.db_writers)]
+        start = time.monotonic()
+        try:
+            await self.generate(rate, duration, count)
+        finally:
+            await self.kafka_queue.join()
+            await self.mysql_queue.join()
+            await self.producer.stop()
+            if self.generator.id_allocator:
+                await asyncio.to_thread(self.generator.id_allocator.close)
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            elapsed = time.monotonic() - start
+            logger.info(f"📊 Total: {self.generated:,} generated in {elapsed:.1f}s "
+                        f"({self.generated / elapsed if elapsed else 0:,.0f} TPS)")
+            logger.info(f"📊 Kafka acked {self.kafka_acked:,}, failed {self.kafka_failed:,} | "
+                        f"MySQL written {self.mysql_written:,}, failed {self.mysql_failed:,}")
+
+async def create_sinks(serializer='json', key_by=None, pool_size=4, fake=False):
+    """aiokafka producer and aiomysql pool (or the in-memory fakes)"""
+    value_serializer = get_serializer(serializer)
+    key_serializer = encode_key if key_by and key_by != 'none' else None
+    if fake:
+        return (InMemoryKafkaProducer(value_serializer=value_serializer, key_serializer=key_serializer),
+                InMemoryMySQLPool(maxsize=pool_size))
+
+    from aiokafka import AIOKafkaProducer
+    import aiomysql
+    producer = AIOKafkaProducer(
+        bootstrap_servers='localhost:9092',
+        value_serializer=value_serializer,
+        key_serializer=key_serializer,
+        acks='all',
+        linger_ms=20,
+        max_batch_size=256 * 1024
+    )
+    pool = await aiomysql.create_pool(minsize=1, maxsize=pool_size, autocommit=False, **MYSQL_CONFIG)
+    return producer, pool
+
+async def stream(rate=None, duration=None, count=None, queue_size=10000, db_writers=4, db_batch_size=500,
+                 key_by=None, serializer='json', fake=False):
+    producer, pool = await create_sinks(serializer, key_by, db_writers, fake)
+    streamer = AsyncRealtimeStreamer(producer, pool, queue_size, db_writers, db_batch_size, key_by,
+                                     first_transaction_id=1001 if fake else None)
+    try:
+        await streamer.run(rate, duration, count)
+    finally:
+        pool.close()
+        await pool.wait_closed()
+    return streamer
+
+def main():
+    parser = argparse.ArgumentParser(description='asyncio dual-write streamer for Kafka and MySQL')
+    parser.add_argument('--rate', type=float, help='Transactions per second (default: as fast as the sinks allow)')
+    parser.add_argument('--duration', type=float, help='Stop after this many seconds')
+    parser.add_argument('--count', type=int, help='Stop after this many transactions')
+    parser.add_argument('--queue-size', type=int, default=10000, help='Capacity of each stage queue (default: 10000)')
+    parser.add_argument('--db-writers', type=int, default=4, help='Concurrent MySQL writers / pool size (default: 4)')
+    parser.add_argument('--db-batch-size', type=int, default=500, help='Most rows per INSERT + commit (default: 500)')
+    parser.add_argument('--key-by', choices=KEY_STRATEGIES, default='none', help='Kafka message key (default: none)')
+    parser.add_argument('--serializer', choices=list(SERIALIZERS), default='json', help='Kafka message format (default: json)')
+    parser.add_argument('--fake-sinks', action='store_true', help='Use in-memory Kafka/MySQL stand-ins (no services needed)')
+    args = parser.parse_args()
+
+    if not args.fake_sinks:
+        try:
+            import aiokafka  # noqa: F401
+            import aiomysql  # noqa: F401
+        except ImportError:
+            print("❌ Error: async mode requires aiokafka and aiomysql (pip3 install aiokafka aiomysql)")
+            return
+
+    print("=" * 70)
+    print("⚡ ASYNC REAL-TIME DATA STREAMING")
+    print("=" * 70)
+    print(f"Sinks: {'in-memory fakes' if args.fake_sinks else 'Kafka ecommerce-transactions + MySQL testdb.transactions'}")
+    print("Press Ctrl+C to stop streaming")
+    print("=" * 70)
+    print()
+
+    try:
+        asyncio.run(stream(args.rate, args.duration, args.count, args.queue_size, args.db_writers,
+                           args.db_batch_size, args.key_by, args.serializer, args.fake_sinks))
+    except KeyboardInterrupt:
+        logger.info("\n⚠️  Streaming stopped by user (Ctrl+C)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Streaming Dataset Profiler
+Single-pass, multi-process profile of a CSV file in constant memory
+
+The file is cut into byte ranges aligned to line boundaries. Each worker
+process streams its range in blocks and builds a partial DatasetProfile;
+the partial profiles are merged at the end. Every statistic is mergeable:
+exact null/category/date counts, Chan's parallel moments for mean/std,
+HyperLogLog for distinct counts and KLL for quantiles.
+"""
+
+import pandas as pd
+import numpy as np
+import io
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from sketches import HyperLogLog, KLLSketch
+
+CATEGORICAL_COLUMNS = ['Product Category', 'Region', 'Payment Method']
+NUMERICAL_COLUMNS = ['Units Sold', 'Unit Price', 'Total Revenue']
+DATE_COLUMN = 'Date'
+
+# Bytes parsed per block inside a worker, and the smallest range worth a worker
+BLOCK_BYTES = 8 * 1024 * 1024
+MIN_RANGE_BYTES = 4 * 1024 * 1024
+
+def _merge_dtype(a, b):
+    """Widen two pandas dtype names the way read_csv would for the whole file"""
+    if a is None or a == b:
+        return b
+    if b is None:
+        return a
+    numeric = {'int64', 'float64'}
+    if a in numeric and b in numeric:
+        return 'float64'
+    return 'object'
+
+class NumericStats:
+    """Mergeable count/mean/std/min/max plus a KLL quantile sketch"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.kll = KLLSketch()
+
+    def update(self, values):
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        other = NumericStats()
+        other.count = len(values)
+        other.mean = float(values.mean())
+        other.m2 = float(((values - other.mean) ** 2).sum())
+        other.kll.update(values)
+        self.merge(other)
+
+    def merge(self, other):
+        n = self.count + other.count
+        if n:
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / n
+            self.m2 += other.m2 + delta * delta * self.count * other.count / n
+        self.count = n
+        self.kll.merge(other.kll)
+        return self
+
+    def describe(self):
+        """Same rows as pandas.Series.describe()"""
+        std = (self.m2 / (self.count - 1)) ** 0.5 if self.count > 1 else float('nan')
+        return pd.Series({
+            'count': float(self.count),
+            'mean': self.mean,
+            'std': std,
+            'min': self.kll.min,
+            '25%': self.kll.quantile(0.25),
+            '50%': self.kll.quantile(0.50),
+            '75%': self.kll.quantile(0.75),
+            'max': self.kll.max
+        })
+
+class DatasetProfile:
+    """Partial or complete profile of a CSV file"""
+
+    def __init__(self, columns, categorical_cols=None, numerical_cols=None, date_col=DATE_COLUMN):
+        self.columns = list(columns)
+        self.categorical_cols = [c for c in (categorical_cols or CATEGORICAL_COLUMNS) if c in self.columns]
+        self.numerical_cols = [c for c in (numerical_cols or NUMERICAL_COLUMNS) if c in self.columns]
+        self.date_col = date_col if date_col in self.columns else None
+        self.rows = 0
+        self.dtypes = {c: None for c in self.columns}
+        self.nulls = Counter()
+        self.max_lengths = Counter()
+        self.distinct = {c: HyperLogLog() for c in self.columns}
+        self.categories = {c: Counter() for c in self.categorical_cols}
+        self.numeric = {c: NumericStats() for c in self.numerical_cols}
+        self.dates = Counter()
+        self.head = None
+
+    def update(self, df):
+        """Fold one parsed block of rows into the profile"""
+        self.rows += len(df)
+        if self.head is None or len(self.head) < 5:
+            self.head = pd.concat([self.head, df.head(5)]).head(5) if self.head is not None else df.head(5)
+        for col in self.columns:
+            series = df[col]
+            self.dtypes[col] = _merge_dtype(self.dtypes[col], str(series.dtype))
+            self.nulls[col] += int(series.isnull().sum())
+            self.distinct[col].update(series)
+            if not pd.api.types.is_numeric_dtype(series):
+                lengths = series.dropna().astype(str).str.len()
+                self.max_lengths[col] = max(self.max_lengths[col], int(lengths.max()) if len(lengths) else 0)
+        for col in self.categorical_cols:
+            self.categories[col].update(df[col].dropna().value_counts().to_dict())
+        for col in self.numerical_cols:
+            self.numeric[col].update(pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64))
+        if self.date_col:
+            days = pd.to_datetime(df[self.date_col], errors='coerce').dropna().dt.normalize()
+            self.dates.update(days.value_counts().to_dict())
+        return self
+
+    def merge(self, other):
+        """Merge a profile of a later part of the same file into this one"""
+        self.rows += other.rows
+        if other.head is not None and (self.head is None or len(self.head) < 5):
+            self.head = pd.concat([self.head, other.head]).head(5) if self.head is not None else other.head
+        for col in self.columns:
+            self.dtypes[col] = _merge_dtype(self.dtypes[col], other.dtypes[col])
+            self.distinct[col].merge(other.distinct[col])
+        self.nulls.update(other.nulls)
+        for col, length in other.max_lengths.items():
+            self.max_lengths[col] = max(self.max_lengths[col], length)
+        for col in self.categorical_cols:
+            self.categories[col].update(other.categories[col])
+        for col in self.numerical_cols:
+            self.numeric[col].merge(other.numeric[col])
+        self.dates.update(other.dates)
+        return self
+
+    def date_range(self):
+        if not self.dates:
+            return None, None
+        return min(self.dates), max(self.dates)
+
+    def date_histogram(self, freq='D'):
+        """Row counts per day (or per period, e.g. freq='M')"""
+        hist = pd.Series(self.dates, dtype='int64').sort_index()
+        if freq == 'D' or hist.empty:
+            return hist
+        return hist.groupby(hist.index.to_period(freq)).sum().rename_axis(self.date_col)
+
+    def date_at_row(self, position):
+        """Date of the row at `position` if the file were sorted by date"""
+        hist = self.date_histogram()
+        index = int(np.searchsorted(hist.cumsum().to_numpy(), position, side='right'))
+        return hist.index[min(index, len(hist) - 1)] if len(hist) else None
+
+    def describe(self):
+        """Numeric summary in the layout of DataFrame.describe()"""
+        return pd.DataFrame({col: stats.describe() for col, stats in self.numeric.items()})
+
+def _read_header(path):
+    with open(path, 'rb') as f:
+        header = f.readline()
+    columns = pd.read_csv(io.BytesIO(header), nrows=0).columns.tolist()
+    return columns, len(header)
+
+def _profile_range(path, columns, start, end, data_start, categorical_cols, numerical_cols, block_bytes):
+    """
+    Profile the lines whose first byte falls in [start, end)
+
+    Runs inside a worker process.
+    """
+    profile = DatasetProfile(columns, categorical_cols, numerical_cols)
+    with open(path, 'rb') as f:
+        if start > data_start:
+            # Skip the line that straddles the range start; the previous worker owns it
+            f.seek(start - 1)
+            if f.read(1) != b'\n':
+                f.readline()
+        else:
+            f.seek(data_start)
+        while f.tell() < end:
+            block = f.read(min(block_bytes, end - f.tell()))
+            if not block:
+                break
+            if not block.endswith(b'\n'):
+                block += f.readline()
+            df = pd.read_csv(io.BytesIO(block), header=None, names=columns)
+            profile.update(df)
+    return profile
+
+def profile_csv(path, workers=None, start=None, end=None, categorical_cols=None,
+                numerical_cols=None, block_bytes=BLOCK_BYTES):
+    """
+    Profile a CSV file in a single pass
+
+    Args:
+        path: CSV file with a header row
+        workers: Worker processes (default: CPU count, fewer for small files)
+        start: First byte to profile (default: just after the header)
+        end: Byte to stop at (default: end of file)
+        categorical_cols: Columns that get exact value counts
+        numerical_cols: Columns that get moments and quantile sketches
+        block_bytes: Bytes parsed at a time inside each worker
+
+    Returns:
+        DatasetProfile
+    """
+    columns, data_start = _read_header(path)
+    start = data_start if start is None else max(start, data_start)
+    end = os.path.getsize(path) if end is None else end
+
+    span = max(end - start, 0)
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, span // MIN_RANGE_BYTES + 1))
+    bounds = [start + span * i // workers for i in range(workers + 1)]
+
+    args = [
+        (path, columns, bounds[i], bounds[i + 1], data_start, categorical_cols, numerical_cols, block_bytes)
+        for i in range(workers)
+    ]
+    if workers == 1:
+        partials = [_profile_range(*args[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            partials = list(pool.map(_profile_range, *zip(*args)))
+
+    profile = partials[0]
+    for partial in partials[1:]:
+        profile.merge(partial)
+    return profile
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Duplicate-Suppressing Stream Stage
+Drops repeated transaction_ids from ecommerce-transactions before the sinks, at stream speed
+
+Producer retries (acks='all', retries=3) and reruns of stream_to_kafka.py
+put the same transaction on the topic more than once. This stage forwards
+each poll batch to ecommerce-transactions-dedup (same partition, key and
+bytes) minus the duplicates; point the sinks at that topic.
+
+Every transaction_id is checked against time-partitioned rotating Bloom
+filters (sketches.RotatingBloomFilter), so memory is fixed at --memory-mb
+and a new id costs a few bit lookups. Only ids the filters flag as maybe
+seen are verified exactly:
+  1. ids forwarded in the last --recent-seconds (held exactly, since the
+     sinks may not have written them yet)
+  2. one batched SELECT ... WHERE transaction_id IN (...) against MySQL
+A suspect found by neither is a Bloom false positive and is forwarded. If
+MySQL cannot be reached, unverified suspects are forwarded as well: the
+sinks upsert, so a duplicate is harmless there while a dropped original
+is lost. The MySQL check assumes the table is fed from the output topic
+(kafka_mysql_sink.py); rows written directly by realtime_stream.py would
+make a false positive look like a duplicate.
+
+Duplicates are remembered for about --retention seconds. The filters are
+saved on shutdown and reloaded on start, so a restart does not forget them.
+
+Offsets are committed only once every forwarded record is acknowledged.
+If a send fails, the commit is skipped, the consumer seeks back to the
+last committed offsets, and the failed ids are forgotten so the replay
+forwards them again.
+"""
+
+import argparse
+import logging
+import os
+import time
+from collections import deque
+from pathlib import Path
+
+import mysql.connector
+import pandas as pd
+from kafka import KafkaConsumer, KafkaProducer, TopicPartition
+
+from realtime_stream import MYSQL_CONFIG
+from serializers import deserialize
+from sketches import RotatingBloomFilter, hash64
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+INPUT_TOPIC = 'ecommerce-transactions'
+OUTPUT_TOPIC = 'ecommerce-transactions-dedup'
+GROUP_ID = 'dedupe'
+
+# Seconds between offset commits and between throughput log lines
+COMMIT_INTERVAL = 5.0
+REPORT_INTERVAL = 5.0
+
+def default_state_path():
+    data_dir = Path("/shared-data") if os.path.exists("/shared-data") else Path("shared-data")
+    return data_dir / "dedupe_bloom.npz"
+
+class MySQLVerifier:
+    """Exact check of suspected duplicates: which of the ids are already in the transactions table"""
+
+    def __init__(self, config=MYSQL_CONFIG):
+        self.config = config
+        self.conn = None
+        self.queries = 0
+
+    def existing(self, ids):
+        """Set of ids found in MySQL, or None if it cannot be queried"""
+        try:
+            if self.conn is None or not self.conn.is_connected():
+                self.conn = mysql.connector.connect(**self.config)
+            cursor = self.conn.cursor()
+            cursor.execute(f"SELECT transaction_id FROM transactions WHERE transaction_id IN "
+                           f"({', '.join(['%s'] * len(ids))})", list(ids))
+            found = {str(row[0]) for row in cursor.fetchall()}
+            cursor.close()
+            # Ends the read snapshot, so the next query sees rows committed since
+            self.conn.commit()
+            self.queries += 1
+            return found
+        except Exception as e:
+            logger.warning(f"⚠️  Could not verify {len(ids)} suspected duplicate(s) against MySQL: {e}")
+            self.close()
+            return None
+
+    def close(self):
+        conn, self.conn = self.conn, None
+        if conn:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+class Deduplicator:
+    """
+    Decides which transaction ids in a batch are new
+
+    Args:
+        bloom: RotatingBloomFilter holding the ids seen so far
+        verifier: Object with existing(ids) -> set or None for the exact
+            check of suspects (None: every suspect not in the recent set is
+            dropped, accepting the filters' false positives)
+        recent_seconds: How long forwarded ids are also held exactly
+    """
+
+    def __init__(self, bloom, verifier=None, recent_seconds=60.0):
+        self.bloom = bloom
+        self.verifier = verifier
+        self.recent_seconds = recent_seconds
+        self.recent = set()
+        self.recent_order = deque()
+        # Forwarded ids whose send failed: let them through once more even though the filters have them
+        self.resend = set()
+        self.seen = 0
+        self.suspects = 0
+        self.duplicates = 0
+        self.false_positives = 0
+        self.unverified = 0
+
+    def _expire(self, now):
+        order = self.recent_order
+        while order and order[0][0] <= now - self.recent_seconds:
+            self.recent.discard(order.popleft()[1])
+
+    def filter(self, ids, now=None):
+        """
+        Boolean list: True for each id to forward (first occurrences), False for duplicates
+
+        ids are compared as strings, so 1001 and '1001' are the same transaction.
+        """
+        now = time.time() if now is None else now
+        ids = [str(i) for i in ids]
+        self.seen += len(ids)
+        if not ids:
+            return []
+        self._expire(now)
+        suspect = self.bloom.check_and_add(hash64(pd.Series(ids, dtype=object)), now)
+
+        keep = [True] * len(ids)
+        batch = set()
+        unresolved = []
+        for i, transaction_id in enumerate(ids):
+            if suspect[i] and transaction_id in self.resend and transaction_id not in batch:
+                self.resend.discard(transaction_id)
+            elif suspect[i]:
+                self.suspects += 1
+                if transaction_id in batch or transaction_id in self.recent:
+                    keep[i] = False
+                else:
+                    unresolved.append(i)
+            batch.add(transaction_id)
+
+        if unresolved:
+            suspects = {ids[i] for i in unresolved}
+            found = self.verifier.existing(suspects) if self.verifier else suspects
+            for i in unresolved:
+                if found is None:
+                    self.unverified += 1
+                elif ids[i] in found:
+                    keep[i] = False
+                else:
+                    self.false_positives += 1
+
+        for i, transaction_id in enumerate(ids):
+            if keep[i] and transaction_id not in self.recent:
+                self.recent.add(transaction_id)
+                self.recent_order.append((now, transaction_id))
+        self.duplicates += keep.count(False)
+        return keep
+
+    def forget(self, ids):
+        """Undo forwarding ids that never reached the output topic, so their next occurrence is kept"""
+        for transaction_id in ids:
+            transaction_id = str(transaction_id)
+            self.recent.discard(transaction_id)
+            self.resend.add(transaction_id)
+
+class DedupeService:
+    """
+    Kafka plumbing around a Deduplicator
+
+    Records keep their partition, key and serialized value, so the output
+    topic needs at least as many partitions as the input.
+    """
+
+    def __init__(self, deduplicator, input_topic=INPUT_TOPIC, output_topic=OUTPUT_TOPIC, group_id=GROUP_ID,
+                 state_path=None, bootstrap_servers='localhost:9092'):
+        self.deduplicator = deduplicator
+        self.input_topic = input_topic
+        self.output_topic = output_topic
+        self.group_id = group_id
+        self.state_path = Path(state_path) if state_path else default_state_path()
+        self.bootstrap_servers = bootstrap_servers
+        self.consumer = None
+        self.producer = None
+        # Sends since the last commit as (future, transaction id), and each partition's first uncommitted offset
+        self.pending = []
+        self.uncommitted = {}
+        self.forwarded = 0
+        self.rejected = 0
+        self.send_failures = 0
+
+    def connect(self):
+        try:
+            self.consumer = KafkaConsumer(
+                self.input_topic,
+                bootstrap_servers=self.bootstrap_servers,
+                group_id=self.group_id,
+                enable_auto_commit=False,
+                auto_offset_reset='earliest',
+                value_deserializer=lambda v: v  # Forwarded as is; decoded only to read the id
+            )
+            self.producer = KafkaProducer(
+                bootstrap_servers=self.bootstrap_servers,
+                acks='all',
+                linger_ms=20
+            )
+            logger.info(f"✅ {self.input_topic} → {self.output_topic} (group '{self.group_id}')")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Failed to connect to Kafka: {e}")
+            return False
+
+    def process(self, records):
+        """Forward the first occurrence of each transaction; returns how many were forwarded"""
+        ids, valid = [], []
+        for record in records:
+            self.uncommitted.setdefault(TopicPartition(record.topic, record.partition), record.offset)
+            try:
+                ids.append(deserialize(record.value)['transaction_id'])
+                valid.append(record)
+            except Exception as e:
+                self.rejected += 1
+                logger.warning(f"⚠️  Skipping {record.topic}[{record.partition}]@{record.offset}: {e}")
+        forwarded = 0
+        for record, transaction_id, keep in zip(valid, ids, self.deduplicator.filter(ids)):
+            if keep:
+                future = self.producer.send(self.output_topic, value=record.value, key=record.key,
+                                            partition=record.partition)
+                self.pending.append((future, transaction_id))
+                forwarded += 1
+        self.forwarded += forwarded
+        return forwarded
+
+    def commit(self):
+        """
+        Commit consumed offsets once everything forwarded from them is acknowledged
+
+        flush() does not raise for failed sends, so each future is checked.
+        On any failure nothing is committed: the consumer rewinds to the last
+        committed offsets and the failed ids are forgotten so the replay
+        forwards them. Returns whether the offsets were committed.
+        """
+        self.producer.flush()
+        failed = [(future, transaction_id) for future, transaction_id in self.pending if not future.succeeded()]
+        if failed:
+            self.send_failures += len(failed)
+            self.forwarded -= len(failed)
+            logger.error(f"❌ {len(failed):,} of {len(self.pending):,} records not acknowledged "
+                         f"(e.g. {failed[0][0].exception}); rewinding to the last commit")
+            self.deduplicator.forget(transaction_id for _, transaction_id in failed)
+            for tp, offset in self.uncommitted.items():
+                self.consumer.seek(tp, offset)
+        else:
+            self.consumer.commit()
+        self.pending = []
+        self.uncommitted = {}
+        return not failed
+
+    def run(self, duration=None):
+        if not self.connect():
+            return
+        bloom = self.deduplicator.bloom
+        if bloom.load(self.state_path):
+            logger.info(f"♻️  Restored Bloom filters from {self.state_path}")
+        dedup = self.deduplicator
+        start = last_commit = last_report = time.monotonic()
+        reported = 0
+        try:
+            while not (duration and time.monotonic() - start >= duration):
+                batch = self.consumer.poll(timeout_ms=500)
+                if batch:
+                    self.process(r for records in batch.values() for r in records)
+
+                now = time.monotonic()
+                if now - last_commit >= COMMIT_INTERVAL:
+                    self.commit()
+                    last_commit = now
+                if now - last_report >= REPORT_INTERVAL:
+                    logger.info(f"📊 {(dedup.seen - reported) / (now - last_report):,.0f} events/s | "
+                                f"forwarded {self.forwarded:,}, duplicates {dedup.duplicates:,} | "
+                                f"suspects {dedup.suspects:,} (false positives {dedup.false_positives:,}, "
+                                f"unverified {dedup.unverified:,}) | rotations {bloom.rotations} | "
+                                f"rejected {self.rejected:,}, send failures {self.send_failures:,}")
+                    reported = dedup.seen
+                    last_report = now
+        except KeyboardInterrupt:
+            logger.info("\n⚠️  Dedupe stopped by user (Ctrl+C)")
+        finally:
+            self.cleanup()
+
+    def cleanup(self):
+        if self.producer and self.consumer:
+            try:
+                self.commit()
+            except Exception as e:
+                logger.warning(f"Could not commit offsets on shutdown: {e}")
+        if self.consumer:
+            self.consumer.close(autocommit=False)
+        if self.producer:
+            self.producer.close()
+        if self.deduplicator.verifier:
+            self.deduplicator.verifier.close()
+        self.deduplicator.bloom.save(self.state_path)
+        dedup = self.deduplicator
+        logger.info(f"📊 Total: {dedup.seen:,} events, {self.forwarded:,} forwarded, "
+                    f"{dedup.duplicates:,} duplicates dropped; filters saved to {self.state_path}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Drop duplicate transaction_ids before they reach the sinks')
+    parser.add_argument('--input-topic', default=INPUT_TOPIC, help=f'Topic to read (default: {INPUT_TOPIC})')
+    parser.add_argument('--output-topic', default=OUTPUT_TOPIC,
+                        help=f'Topic for unique transactions (default: {OUTPUT_TOPIC})')
+    parser.add_argument('--memory-mb', type=float, default=64.0, help='Memory for all Bloom filters (default: 64)')
+    parser.add_argument('--fp-rate', type=float, default=0.001,
+                        help='False-positive rate of a lookup, i.e. share of new ids verified exactly (default: 0.001)')
+    parser.add_argument('--retention', type=float, default=6 * 3600,
+                        help='Seconds an id is remembered (default: 21600)')
+    parser.add_argument('--generations', type=int, default=6,
+                        help='Filters the retention is split into; one is cleared per rotation (default: 6)')
+    parser.add_argument('--recent-seconds', type=float, default=60.0,
+                        help='Forwarded ids also held exactly for this long (default: 60)')
+    parser.add_argument('--no-verify', action='store_true',
+                        help='Skip the MySQL check: drop every suspect not seen recently, false positives included')
+    parser.add_argument('--state', help='Bloom filter state file (default: shared-data/dedupe_bloom.npz)')
+    parser.add_argument('--group-id', default=GROUP_ID, help=f'Consumer group (default: {GROUP_ID})')
+    parser.add_argument('--duration', type=float, help='Stop after this many seconds (default: run until Ctrl+C)')
+    parser.add_argument('--bootstrap-servers', default='localhost:9092', help='Kafka brokers (default: localhost:9092)')
+    args = parser.parse_args()
+    if not 0 < args.fp_rate < 1:
+        parser.error("--fp-rate must be between 0 and 1")
+    if args.memory_mb <= 0 or args.retention <= 0 or args.generations < 1:
+        parser.error("--memory-mb, --retention and --generations must be positive")
+
+    bloom = RotatingBloomFilter(int(args.memory_mb * 1024 ** 2), args.fp_rate, args.retention, args.generations)
+    deduplicator = Deduplicator(bloom, None if args.no_verify else MySQLVerifier(), args.recent_seconds)
+
+    print("╔════════════════════════════════════════════════════════════╗")
+    print("║          Duplicate-Suppressing Stream Stage                ║")
+    print("╚════════════════════════════════════════════════════════════╝\n")
+    print(f"🔁 {args.input_topic} → {args.output_topic}")
+    print(f"🧮 {args.generations} Bloom filters, {bloom.nbytes() / 1024 ** 2:.0f} MB: "
+          f"{bloom.capacity:,} ids per {bloom.period / 60:g} min at {args.fp_rate:g} false positives\n")
+
+    DedupeService(deduplicator, args.input_topic, args.output_topic, args.group_id, args.state,
+                  args.bootstrap_servers).run(args.duration)
+
+if __name__ == "__main__":
+    main()
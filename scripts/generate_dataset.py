@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Synthetic Dataset Generator
+Generates large transaction datasets in the Online Sales Data schema for scale testing
+
+Rows are drawn as whole NumPy columns, one chunk at a time:
+  products  - Zipf-distributed popularity over the catalog (--zipf 0 = uniform)
+  regions   - each region follows its own yearly cycle, peaking at a
+              different time of year (--seasonality 0 = uniform)
+  prices    - uniform within each product's price range
+  units     - geometric (mostly 1-3, capped at 10), as in the source data
+Chunks are generated and written (by pyarrow, several times faster than
+DataFrame.to_csv) in parallel worker processes. Chunk i
+uses the i-th seed spawned from the master seed and owns a fixed ID range,
+so the output depends only on the seed, never on the worker count.
+"""
+
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+import argparse
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+
+from realtime_stream import PRODUCTS, REGIONS, PAYMENT_METHODS
+
+FORMATS = ['csv', 'parquet']
+
+COLUMNS = ['Transaction ID', 'Date', 'Product Category', 'Product Name', 'Units Sold',
+           'Unit Price', 'Total Revenue', 'Region', 'Payment Method']
+
+DEFAULT_CHUNK_ROWS = 1_000_000
+MAX_UNITS = 10
+
+def default_catalog():
+    """Products (with price ranges), regions and payment methods of RealtimeStreamer"""
+    return {
+        'products': [(p['name'], p['category'], *p['price_range']) for p in PRODUCTS],
+        'regions': list(REGIONS),
+        'payment_methods': list(PAYMENT_METHODS)
+    }
+
+def catalog_from_csv(csv_file):
+    """
+    Catalog observed in an Online Sales Data CSV
+
+    Each product's price range is the lowest to highest Unit Price it sold at.
+    Products keep their order of first appearance (their Zipf rank).
+    """
+    df = pd.read_csv(csv_file)
+    products = df.groupby('Product Name', sort=False).agg(
+        category=('Product Category', 'first'), low=('Unit Price', 'min'), high=('Unit Price', 'max'))
+    return {
+        'products': list(products.itertuples(name=None)),
+        'regions': list(df['Region'].unique()),
+        'payment_methods': list(df['Payment Method'].unique())
+    }
+
+def zipf_weights(n, exponent):
+    """Probability of rank 1..n under a Zipf law (exponent 0 = uniform)"""
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+def region_season_weights(days, start_date, num_regions, amplitude):
+    """
+    Region probabilities for each day, shape (days, num_regions)
+
+    Region r's share swings by +/- amplitude around its mean over a year,
+    peaking r/num_regions of the way through the year.
+    """
+    day_of_year = (np.arange(days) + start_date.timetuple().tm_yday - 1) / 365.25
+    phases = np.arange(num_regions) / num_regions
+    weights = 1 + amplitude * np.cos(2 * np.pi * (day_of_year[:, None] - phases[None, :]))
+    return weights / weights.sum(axis=1, keepdims=True)
+
+def build_spec(catalog, zipf=1.1, seasonality=0.5, start_date='2024-01-01', days=365):
+    """Everything a worker needs to draw rows; small and picklable"""
+    start = date.fromisoformat(start_date)
+    products = catalog['products']
+    categories = sorted({category for _, category, _, _ in products})
+    first_day = np.datetime64(start)
+    return {
+        'names': [name for name, _, _, _ in products],
+        'categories': categories,
+        'product_category': np.array([categories.index(category) for _, category, _, _ in products]),
+        'low': np.array([low for _, _, low, _ in products], dtype=np.float64),
+        'high': np.array([high for _, _, _, high in products], dtype=np.float64),
+        'product_probs': zipf_weights(len(products), zipf),
+        'regions': catalog['regions'],
+        'region_cdf': np.cumsum(region_season_weights(days, start, len(catalog['regions']), seasonality), axis=1),
+        'payment_methods': catalog['payment_methods'],
+        'dates': [str(d) for d in np.arange(first_day, first_day + days)],
+        # Quote CSV fields only if some catalog value needs it, like the source file
+        'csv_quoting': 'needed' if any(set(',"\n') & set(name) for name, _, _, _ in products) else 'none'
+    }
+
+def generate_chunk(spec, n, first_id, rng):
+    """
+    Draw n rows as a DataFrame in the Online Sales Data schema
+
+    Transaction IDs are first_id .. first_id + n - 1. Text columns are
+    categoricals, which both writers handle without building n Python strings.
+    """
+    product = rng.choice(len(spec['names']), size=n, p=spec['product_probs'])
+    day = rng.integers(0, len(spec['dates']), size=n)
+    # Inverse-CDF draw of each row's region from its day's seasonal weights
+    region_cdf = spec['region_cdf']
+    region = (region_cdf[day] < rng.random(n)[:, None]).sum(axis=1)
+    region = np.minimum(region, region_cdf.shape[1] - 1)
+    units = np.minimum(rng.geometric(0.5, size=n), MAX_UNITS)
+    low, high = spec['low'][product], spec['high'][product]
+    price = np.round(low + rng.random(n) * (high - low), 2)
+    payment = rng.integers(0, len(spec['payment_methods']), size=n)
+
+    return pd.DataFrame({
+        'Transaction ID': np.arange(first_id, first_id + n, dtype=np.int64),
+        'Date': pd.Categorical.from_codes(day, spec['dates']),
+        'Product Category': pd.Categorical.from_codes(spec['product_category'][product], spec['categories']),
+        'Product Name': pd.Categorical.from_codes(product, spec['names']),
+        'Units Sold': units,
+        'Unit Price': price,
+        'Total Revenue': np.round(units * price, 2),
+        'Region': pd.Categorical.from_codes(region, spec['regions']),
+        'Payment Method': pd.Categorical.from_codes(payment, spec['payment_methods'])
+    }, columns=COLUMNS)
+
+def write_chunk(df, path, fmt='csv', header=True, quoting='none'):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if fmt == 'parquet':
+        pq.write_table(table, path)
+        return
+    with open(path, 'wb') as f:
+        if header:
+            f.write((','.join(COLUMNS) + '\n').encode('utf-8'))
+        pa_csv.write_csv(table, f, pa_csv.WriteOptions(include_header=False, quoting_style=quoting))
+
+# Generation spec of a worker process, set once by _init_worker()
+_worker_spec = None
+
+def _init_worker(spec):
+    global _worker_spec
+    _worker_spec = spec
+
+def _generate_chunk_task(path, n, first_id, seed, fmt, header):
+    """Generate and write one chunk in a worker; returns (file name, rows, bytes)"""
+    df = generate_chunk(_worker_spec, n, first_id, np.random.default_rng(seed))
+    write_chunk(df, path, fmt, header, _worker_spec['csv_quoting'])
+    return Path(path).name, n, Path(path).stat().st_size
+
+def merge_csv_parts(parts, output_file):
+    """Concatenate CSV parts (only the first has a header) into one file"""
+    with open(output_file, 'wb') as out:
+        for part in parts:
+            with open(part, 'rb') as f:
+                shutil.copyfileobj(f, out, 16 * 1024 * 1024)
+
+def generate_dataset(rows, output=None, fmt='csv', chunk_rows=DEFAULT_CHUNK_ROWS, workers=None, seed=None,
+                     zipf=1.1, seasonality=0.5, start_date='2024-01-01', days=365, first_id=10001,
+                     catalog_csv=None, overwrite=False):
+    """
+    Generate a synthetic sales dataset
+
+    Args:
+        rows: Total rows
+        output: CSV file, or Parquet directory of part files
+            (default: shared-data/synthetic_sales.csv / synthetic_sales.parquet)
+        fmt: 'csv' (one file, merged from parallel parts) or 'parquet' (a directory of parts)
+        chunk_rows: Rows per chunk; one chunk is generated and written per task
+        workers: Worker processes (default: all cores)
+        seed: Master seed; chunk i uses the i-th seed spawned from it (default: random)
+        zipf: Zipf exponent of product popularity (0 = uniform)
+        seasonality: 0..1 yearly swing of each region's share
+        start_date: First Date in the data (YYYY-MM-DD)
+        days: Number of days covered
+        first_id: First Transaction ID
+        catalog_csv: Take products, price ranges, regions and payment methods
+            from this CSV instead of RealtimeStreamer's catalog
+        overwrite: Replace an existing Parquet directory even if it holds
+            more than part files from an earlier run
+    """
+    print("╔════════════════════════════════════════════════════════════╗")
+    print("║          Synthetic Dataset Generator                       ║")
+    print("╚════════════════════════════════════════════════════════════╝\n")
+
+    data_dir = Path("/shared-data") if os.path.exists("/shared-data") else Path("shared-data")
+    output = Path(output) if output else data_dir / f"synthetic_sales.{fmt}"
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    if catalog_csv:
+        catalog = catalog_from_csv(catalog_csv)
+        print(f"📖 Catalog from {catalog_csv}")
+    else:
+        catalog = default_catalog()
+        print("📖 Catalog from RealtimeStreamer PRODUCTS")
+    print(f"✓ {len(catalog['products'])} products, {len(catalog['regions'])} regions, "
+          f"{len(catalog['payment_methods'])} payment methods")
+    spec = build_spec(catalog, zipf, seasonality, start_date, days)
+
+    num_chunks = max(1, -(-rows // chunk_rows))
+    workers = max(1, min(workers or os.cpu_count() or 1, num_chunks))
+    seeds = np.random.SeedSequence(seed).spawn(num_chunks)
+    print(f"🎯 {rows:,} rows, {start_date} + {days} days, zipf {zipf:g}, seasonality {seasonality:g}")
+    print(f"⚙️  {num_chunks} chunk(s) of up to {chunk_rows:,} rows | Workers: {workers} | "
+          f"Seed: {seed if seed is not None else 'random'}\n")
+
+    parts_dir = output if fmt == 'parquet' else output.with_name(output.name + '.parts')
+    clear_parts_dir(parts_dir, fmt, overwrite)
+    tasks = []
+    for i in range(num_chunks):
+        n = min(chunk_rows, rows - i * chunk_rows)
+        tasks.append((parts_dir / f"part-{i:05d}.{fmt}", n, first_id + i * chunk_rows, seeds[i], fmt, i == 0))
+
+    print(f"{'='*60}")
+    print("GENERATING CHUNKS")
+    print('='*60)
+    start_time = time.time()
+    written = 0
+    if workers == 1:
+        _init_worker(spec)
+        results = (_generate_chunk_task(*task) for task in tasks)
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(spec,))
+        results = pool.map(_generate_chunk_task, *zip(*tasks))
+    try:
+        for name, n, size in results:
+            written += n
+            print(f"✓ {name}: {n:,} rows ({size / 1024 / 1024:.1f} MB) - {written / rows * 100:.0f}%")
+    finally:
+        if workers > 1:
+            pool.shutdown()
+
+    if fmt == 'csv':
+        merge_csv_parts([task[0] for task in tasks], output)
+        shutil.rmtree(parts_dir)
+    elapsed = time.time() - start_time
+    size = output.stat().st_size if output.is_file() else sum(p.stat().st_size for p in output.iterdir())
+
+    print(f"\n{'='*60}")
+    print("SUMMARY")
+    print('='*60)
+    print(f"✅ Rows: {written:,} (Transaction ID {first_id} - {first_id + written - 1})")
+    print(f"✅ Output: {output} ({size / 1024 / 1024:,.1f} MB)")
+    print(f"✅ Throughput: {written / elapsed if elapsed else 0:,.0f} rows/sec ({elapsed:.1f}s)")
+
+    print(f"\n📊 Product popularity (configured):")
+    top = np.argsort(spec['product_probs'])[::-1][:5]
+    for i in top:
+        print(f"  {spec['names'][i]:<30} {spec['product_probs'][i] * 100:5.1f}%")
+
+def clear_parts_dir(parts_dir, fmt, overwrite=False):
+    """
+    Empty (or create) the directory the chunks are written to
+
+    An existing directory is only removed if it holds nothing but part-*
+    files from an earlier run, or with overwrite, so a mistyped --output
+    cannot wipe unrelated data.
+    """
+    if parts_dir.exists():
+        if parts_dir.is_dir():
+            others = [p.name for p in parts_dir.iterdir() if not (p.is_file() and p.match(f"part-*.{fmt}"))]
+        else:
+            others = [parts_dir.name]
+        if others and not overwrite:
+            raise FileExistsError(f"{parts_dir} exists and holds more than part-*.{fmt} files "
+                                  f"(e.g. {others[0]}); choose another --output or pass --overwrite")
+        if parts_dir.is_dir():
+            shutil.rmtree(parts_dir)
+        else:
+            parts_dir.unlink()
+    parts_dir.mkdir(parents=True)
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic Online Sales Data dataset at scale')
+    parser.add_argument('--rows', type=int, default=10_000_000, help='Rows to generate (default: 10000000)')
+    parser.add_argument('--output', help='Output CSV file or Parquet directory (default: shared-data/synthetic_sales.<format>)')
+    parser.add_argument('--format', choices=FORMATS, default='csv', help='Output format (default: csv)')
+    parser.add_argument('--overwrite', action='store_true',
+                        help='Replace an existing Parquet --output directory even if it holds other files')
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS,
+                        help=f'Rows per parallel chunk (default: {DEFAULT_CHUNK_ROWS})')
+    parser.add_argument('--workers', type=int, default=0, help='Worker processes (default: 0 = all cores)')
+    parser.add_argument('--seed', type=int, help='Master seed for reproducible output')
+    parser.add_argument('--zipf', type=float, default=1.1, help='Zipf exponent of product popularity, 0 = uniform (default: 1.1)')
+    parser.add_argument('--seasonality', type=float, default=0.5,
+                        help='Yearly swing of each region\'s share, 0..1 (default: 0.5)')
+    parser.add_argument('--start-date', default='2024-01-01', help='First date (default: 2024-01-01)')
+    parser.add_argument('--days', type=int, default=365, help='Days covered (default: 365)')
+    parser.add_argument('--first-id', type=int, default=10001, help='First Transaction ID (default: 10001)')
+    parser.add_argument('--catalog', help='Take products/prices/regions/payment methods from this CSV '
+                                          '(e.g. "shared-data/Online Sales Data.csv")')
+
+    args = parser.parse_args()
+    if args.rows < 1 or args.chunk_rows < 1 or args.days < 1:
+        parser.error("--rows, --chunk-rows and --days must be at least 1")
+    if not 0 <= args.seasonality <= 1:
+        parser.error("--seasonality must be between 0 and 1")
+
+    try:
+        generate_dataset(args.rows, args.output, args.format, args.chunk_rows, args.workers, args.seed, args.zipf,
+                         args.seasonality, args.start_date, args.days, args.first_id, args.catalog, args.overwrite)
+    except FileExistsError as e:
+        parser.error(str(e))
+
+if __name__ == "__main__":
+    main()
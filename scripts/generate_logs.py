@@ -5,9 +5,13 @@ Generates realistic application logs from transaction data
 """
 
 import pandas as pd
+import numpy as np
 import random
 import argparse
 import os
+import string
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime, timedelta
 
@@ -28,9 +32,9 @@ SERVICES = [
     'ShippingService'
 ]
 
-def get_log_level():
+def get_log_level(rng=random):
     """Get random log level based on distribution"""
-    rand = random.random()
+    rand = rng.random()
     cumulative = 0
     for level, prob in LOG_LEVELS.items():
         cumulative += prob
@@ -38,54 +42,249 @@ def get_log_level():
             return level
     return 'INFO'
 
-def generate_log_message(row, log_level):
+# Message templates per log level. Fields come from the transaction row
+# (txn_id, product, category, units, amount, payment, region) or are random
+# (stock, volume, delay); see RANDOM_FIELDS.
+MESSAGE_TEMPLATES = {
+    'ERROR': [
+        "Payment declined for transaction #{txn_id}: Insufficient funds",
+        "Inventory check failed for product '{product}': Database timeout",
+        "Failed to send order confirmation for transaction #{txn_id}: SMTP error",
+        "Shipping address validation failed for transaction #{txn_id}: Invalid postal code",
+        "Payment gateway error for transaction #{txn_id}: Connection timeout",
+    ],
+    'WARN': [
+        "Low stock alert for product '{product}': {stock} units remaining",
+        "High transaction volume detected in {region}: {volume} orders/minute",
+        "Payment processing delay for transaction #{txn_id}: {delay} seconds",
+        "Product '{product}' approaching reorder point in {region}",
+        "Unusual transaction pattern detected for payment method: {payment}",
+    ],
+    'INFO': [
+        "Processing order #{txn_id} - {product} x{units}",
+        "Payment authorized for transaction #{txn_id}: ${amount} via {payment}",
+        "Stock updated for product '{product}': -{units} units",
+        "Order confirmation sent for transaction #{txn_id}",
+        "Shipping label generated for transaction #{txn_id} to {region}",
+        "Transaction #{txn_id} completed successfully - Total: ${amount}",
+        "Inventory check passed for '{product}' in category {category}",
+    ]
+}
+
+# Inclusive ranges of the random numbers used in templates
+RANDOM_FIELDS = {
+    'stock': (1, 10),
+    'volume': (100, 500),
+    'delay': (2, 5)
+}
+
+# Transaction CSV column behind each row field
+ROW_FIELDS = {
+    'txn_id': 'Transaction ID',
+    'product': 'Product Name',
+    'category': 'Product Category',
+    'units': 'Units Sold',
+    'amount': 'Total Revenue',
+    'payment': 'Payment Method',
+    'region': 'Region'
+}
+
+# Lines formatted and written per block in vectorized mode
+VECTOR_BLOCK_LINES = 500_000
+
+# Lookup tables for timestamp formatting in vectorized mode
+_TIME_OF_DAY = np.array([
+    f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}." for s in range(86400)
+], dtype=object)
+_MILLISECONDS = np.array([f"{ms:03d}" for ms in range(1000)], dtype=object)
+
+def row_fields(row):
+    """Template field values for one transaction row"""
+    fields = {name: str(row[column]) for name, column in ROW_FIELDS.items()}
+    fields['amount'] = f"{row['Total Revenue']:.2f}"
+    return fields
+
+def generate_log_message(row, log_level, rng=random):
     """Generate log message based on transaction data and log level"""
     
-    txn_id = row['Transaction ID']
-    product = row['Product Name']
-    category = row['Product Category']
-    units = row['Units Sold']
-    amount = row['Total Revenue']
-    payment = row['Payment Method']
-    region = row['Region']
-    
-    service = random.choice(SERVICES)
-    
-    if log_level == 'ERROR':
-        error_messages = [
-            f"Payment declined for transaction #{txn_id}: Insufficient funds",
-            f"Inventory check failed for product '{product}': Database timeout",
-            f"Failed to send order confirmation for transaction #{txn_id}: SMTP error",
-            f"Shipping address validation failed for transaction #{txn_id}: Invalid postal code",
-            f"Payment gateway error for transaction #{txn_id}: Connection timeout",
-        ]
-        message = random.choice(error_messages)
-        
-    elif log_level == 'WARN':
-        warn_messages = [
-            f"Low stock alert for product '{product}': {random.randint(1, 10)} units remaining",
-            f"High transaction volume detected in {region}: {random.randint(100, 500)} orders/minute",
-            f"Payment processing delay for transaction #{txn_id}: {random.randint(2, 5)} seconds",
-            f"Product '{product}' approaching reorder point in {region}",
-            f"Unusual transaction pattern detected for payment method: {payment}",
-        ]
-        message = random.choice(warn_messages)
-        
-    else:  # INFO
-        info_messages = [
-            f"Processing order #{txn_id} - {product} x{units}",
-            f"Payment authorized for transaction #{txn_id}: ${amount:.2f} via {payment}",
-            f"Stock updated for product '{product}': -{units} units",
-            f"Order confirmation sent for transaction #{txn_id}",
-            f"Shipping label generated for transaction #{txn_id} to {region}",
-            f"Transaction #{txn_id} completed successfully - Total: ${amount:.2f}",
-            f"Inventory check passed for '{product}' in category {category}",
-        ]
-        message = random.choice(info_messages)
+    fields = row_fields(row)
+    for name, (low, high) in RANDOM_FIELDS.items():
+        fields[name] = rng.randint(low, high)
+    
+    service = rng.choice(SERVICES)
+    message = rng.choice(MESSAGE_TEMPLATES[log_level]).format(**fields)
     
     return service, message
 
-def generate_logs(csv_file, output_dir='logs/incoming', logs_per_file=1000, num_files=5):
+def _compile_templates():
+    """
+    Flatten MESSAGE_TEMPLATES into one list of (level, segments), in LOG_LEVELS order
+
+    Each template becomes alternating literal strings and field names
+    (ending with the newline) so that a whole batch of lines can be laid
+    out as string pieces by array indexing.
+    """
+    compiled = []
+    for level in LOG_LEVELS:
+        templates = MESSAGE_TEMPLATES[level]
+        for template in templates:
+            segments = []
+            for literal, field, _, _ in string.Formatter().parse(template):
+                if literal:
+                    segments.append(('literal', literal))
+                if field:
+                    segments.append(('field', field))
+            # The line terminator rides on the last literal
+            if segments[-1][0] == 'literal':
+                segments[-1] = ('literal', segments[-1][1] + '\n')
+            else:
+                segments.append(('literal', '\n'))
+            compiled.append((level, segments))
+    return compiled
+
+def prepare_row_fields(df):
+    """Pre-format every row field once as an object array indexed by row"""
+    fields = {
+        name: df[column].astype(str).to_numpy(dtype=object)
+        for name, column in ROW_FIELDS.items()
+    }
+    fields['amount'] = np.array([f"{v:.2f}" for v in df['Total Revenue']], dtype=object)
+    return fields
+
+def format_log_block(fields, n, start_time, rng, templates=None, window_seconds=86400):
+    """
+    Build n log lines at once from NumPy draws
+
+    Every line is laid out as consecutive string pieces in one flat array:
+    the timestamp up to the seconds, the milliseconds with the level and
+    service prefix, then the template's literals and fields. Filling the
+    pieces is pure array indexing, and a single str.join turns the whole
+    block into text.
+
+    Args:
+        fields: Output of prepare_row_fields()
+        n: Number of lines
+        start_time: datetime the window of timestamps starts at
+        rng: numpy.random.Generator
+        templates: Output of _compile_templates()
+        window_seconds: Length of the timestamp window (default: 24h)
+
+    Returns:
+        str with n newline-terminated lines
+    """
+    templates = templates or _compile_templates()
+    levels = list(LOG_LEVELS)
+    level_probs = np.array(list(LOG_LEVELS.values()))
+    
+    rows = rng.integers(0, len(fields['txn_id']), n)
+    level_ids = rng.choice(len(levels), size=n, p=level_probs / level_probs.sum())
+    service_ids = rng.integers(0, len(SERVICES), n)
+    offsets_ms = rng.integers(0, window_seconds + 1, n) * 1000 + rng.integers(0, 1000000, n) // 1000
+    
+    # Pick a template within each line's level
+    template_ids = np.empty(n, dtype=np.int64)
+    first = 0
+    for level_id, level in enumerate(levels):
+        count = len(MESSAGE_TEMPLATES[level])
+        mask = level_ids == level_id
+        template_ids[mask] = first + rng.integers(0, count, int(mask.sum()))
+        first += count
+    
+    # Timestamps and prefixes are table lookups: 'YYYY-MM-DD HH:MM:SS.' then 'mmm [LEVEL] [Service] '
+    day_start = datetime.combine(start_time.date(), datetime.min.time())
+    start_ms = int((start_time - day_start) / timedelta(milliseconds=1))
+    absolute_ms = start_ms + offsets_ms
+    days = absolute_ms // 86_400_000
+    day_labels = np.array([
+        (day_start + timedelta(days=int(day))).strftime('%Y-%m-%d ')
+        for day in range(int(days.max()) + 1)
+    ], dtype=object)
+    stamp_table = (day_labels[:, None] + _TIME_OF_DAY[None, :]).ravel()
+    prefixes = np.array([
+        f" [{level}] [{service}] " for level in levels for service in SERVICES
+    ], dtype=object)
+    prefix_table = (_MILLISECONDS[:, None] + prefixes[None, :]).ravel()
+    
+    # Flat layout: each line is 2 + len(segments) consecutive pieces
+    segment_counts = np.array([len(segments) for _, segments in templates])
+    counts = 2 + segment_counts[template_ids]
+    starts = np.cumsum(counts) - counts
+    pieces = np.empty(int(counts.sum()), dtype=object)
+    pieces[starts] = stamp_table[absolute_ms // 1000]
+    pieces[starts + 1] = prefix_table[(absolute_ms % 1000) * len(prefixes) + level_ids * len(SERVICES) + service_ids]
+    
+    for template_id, (_, segments) in enumerate(templates):
+        idx = np.flatnonzero(template_ids == template_id)
+        if not len(idx):
+            continue
+        for offset, (kind, value) in enumerate(segments, start=2):
+            target = starts[idx] + offset
+            if kind == 'literal':
+                pieces[target] = value
+            elif value in RANDOM_FIELDS:
+                low, high = RANDOM_FIELDS[value]
+                choices = np.array([str(v) for v in range(low, high + 1)], dtype=object)
+                pieces[target] = choices[rng.integers(0, len(choices), len(idx))]
+            else:
+                pieces[target] = fields[value][rows[idx]]
+    
+    return ''.join(pieces.tolist())
+
+def generate_log_file(filepath, df, n, start_time, rng):
+    """Write n lines to filepath one transaction row at a time; returns lines written"""
+    with open(filepath, 'w') as f:
+        for i in range(n):
+            # Pick random transaction
+            row = df.iloc[rng.randrange(len(df))]
+            
+            # Generate timestamp with some randomness
+            log_time = start_time + timedelta(
+                seconds=rng.randint(0, 86400),
+                microseconds=rng.randint(0, 999999)
+            )
+            
+            # Get log level and generate message
+            log_level = get_log_level(rng)
+            service, message = generate_log_message(row, log_level, rng)
+            
+            # Format log line
+            log_line = f"{log_time.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]} [{log_level}] [{service}] {message}\n"
+            f.write(log_line)
+    return n
+
+def generate_log_file_vectorized(filepath, fields, n, start_time, rng, block_lines=VECTOR_BLOCK_LINES):
+    """Write n lines to filepath in large formatted blocks; returns lines written"""
+    templates = _compile_templates()
+    written = 0
+    with open(filepath, 'w', buffering=16 * 1024 * 1024) as f:
+        while written < n:
+            count = min(block_lines, n - written)
+            f.write(format_log_block(fields, count, start_time, rng, templates))
+            written += count
+    return written
+
+# Transaction data of a worker process, set once by _init_worker()
+_worker_source = None
+
+def _init_worker(source):
+    global _worker_source
+    _worker_source = source
+
+def _generate_file_task(filepath, n, start_time, seed, vectorized):
+    """
+    Generate one log file from its own seed
+
+    Runs in a worker process (or inline with workers=1). The file's content
+    depends only on its seed, so any worker count gives the same bytes.
+    """
+    if vectorized:
+        written = generate_log_file_vectorized(filepath, _worker_source, n, start_time, np.random.default_rng(seed))
+    else:
+        written = generate_log_file(filepath, _worker_source, n, start_time, random.Random(int(seed.generate_state(1)[0])))
+    return Path(filepath).name, written, Path(filepath).stat().st_size
+
+def generate_logs(csv_file, output_dir='logs/incoming', logs_per_file=1000, num_files=5, vectorized=False,
+                  workers=1, seed=None, start_date=None):
     """
     Generate application logs from transaction data
     
@@ -94,6 +293,11 @@ def generate_logs(csv_file, output_dir='logs/incoming', logs_per_file=1000, num_
         output_dir: Output directory for log files
         logs_per_file: Number of log entries per file
         num_files: Total number of log files to generate
+        vectorized: Draw and format each file's lines in NumPy blocks instead of one row at a time
+        workers: Worker processes, each generating whole files (default: 1, in-process)
+        seed: Master seed; file i uses the i-th seed spawned from it (default: random)
+        start_date: Date (YYYY-MM-DD) of the newest file's window (default: now).
+            The same seed and start_date reproduce byte-identical files.
     """
     
     print("╔════════════════════════════════════════════════════════════╗")
@@ -118,46 +322,41 @@ def generate_logs(csv_file, output_dir='logs/incoming', logs_per_file=1000, num_
     print("GENERATING LOG FILES")
     print('='*60)
     
-    total_logs = logs_per_file * num_files
-    logs_generated = 0
+    workers = max(1, min(workers or os.cpu_count() or 1, num_files))
+    seeds = np.random.SeedSequence(seed).spawn(num_files)
+    reference = datetime.strptime(start_date, '%Y-%m-%d') + timedelta(days=1) if start_date else datetime.now()
+    print(f"⚙️  Workers: {workers} | Seed: {seed if seed is not None else 'random'} | "
+          f"Mode: {'vectorized' if vectorized else 'row'}")
     
-    # Generate log files
+    tasks = []
     for file_num in range(num_files):
-        timestamp = datetime.now() - timedelta(days=num_files - file_num)
+        timestamp = reference - timedelta(days=num_files - file_num)
         filename = f"ecommerce_app_{timestamp.strftime('%Y%m%d_%H%M%S')}.log"
-        filepath = output_path / filename
-        
-        print(f"\n📝 Generating {filename}...")
-        
-        with open(filepath, 'w') as f:
-            for i in range(logs_per_file):
-                # Pick random transaction
-                row = df.sample(1).iloc[0]
-                
-                # Generate timestamp with some randomness
-                log_time = timestamp + timedelta(
-                    seconds=random.randint(0, 86400),
-                    microseconds=random.randint(0, 999999)
-                )
-                
-                # Get log level and generate message
-                log_level = get_log_level()
-                service, message = generate_log_message(row, log_level)
-                
-                # Format log line
-                log_line = f"{log_time.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]} [{log_level}] [{service}] {message}\n"
-                f.write(log_line)
-                
-                logs_generated += 1
-        
-        file_size = filepath.stat().st_size / 1024  # KB
-        print(f"✓ Generated {logs_per_file:,} logs ({file_size:.1f} KB)")
+        tasks.append((output_path / filename, logs_per_file, timestamp, seeds[file_num], vectorized))
+    
+    source = prepare_row_fields(df) if vectorized else df
+    logs_generated = 0
+    start_time = time.time()
+    
+    if workers == 1:
+        _init_worker(source)
+        results = (_generate_file_task(*task) for task in tasks)
+        for filename, written, size in results:
+            logs_generated += written
+            print(f"✓ {filename}: {written:,} logs ({size / 1024:.1f} KB)")
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(source,)) as pool:
+            for filename, written, size in pool.map(_generate_file_task, *zip(*tasks)):
+                logs_generated += written
+                print(f"✓ {filename}: {written:,} logs ({size / 1024:.1f} KB)")
     
     print(f"\n{'='*60}")
     print("SUMMARY")
     print('='*60)
     print(f"✅ Total log files: {num_files}")
     print(f"✅ Total log entries: {logs_generated:,}")
+    elapsed = time.time() - start_time
+    print(f"✅ Throughput: {logs_generated / elapsed if elapsed else 0:,.0f} lines/sec ({elapsed:.1f}s)")
     print(f"✅ Output directory: {output_path}")
     
     # Show log level distribution
@@ -173,12 +372,196 @@ def generate_logs(csv_file, output_dir='logs/incoming', logs_per_file=1000, num_
     print("  1. Start Flume agent to process logs: bash scripts/start_flume.sh")
     print("  2. Verify logs in HDFS: bash scripts/verify_hdfs.sh")
 
+class SpoolWriter:
+    """
+    Writes a Flume spooling directory safely
+
+    Lines go to a hidden temp file (matching the spooldir source's
+    ignorePattern ^\\..*$) that is renamed into place once it reaches
+    the size or age limit, so Flume only ever sees complete, immutable files.
+    """
+
+    def __init__(self, spool_dir, roll_bytes, roll_seconds):
+        self.spool_dir = Path(spool_dir)
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self.roll_bytes = roll_bytes
+        self.roll_seconds = roll_seconds
+        self.file = None
+        self.tmp_path = None
+        self.opened_at = None
+        self.size = 0
+        self.sequence = 0
+        self.rolled = []  # (monotonic time, bytes) per completed file
+
+    def _open(self):
+        self.sequence += 1
+        name = f"ecommerce_app_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}_{self.sequence:05d}.log"
+        self.tmp_path = self.spool_dir / f".{name}.tmp"
+        self.final_path = self.spool_dir / name
+        self.file = open(self.tmp_path, 'w', buffering=1024 * 1024)
+        self.opened_at = time.monotonic()
+        self.size = 0
+
+    def write(self, text):
+        if self.file is None:
+            self._open()
+        self.file.write(text)
+        self.size += len(text)
+        if self.size >= self.roll_bytes:
+            self.roll()
+
+    def maybe_roll(self):
+        """Roll the current file if it is older than the age limit"""
+        if self.file is not None and time.monotonic() - self.opened_at >= self.roll_seconds:
+            self.roll()
+
+    def roll(self):
+        """Close the temp file and atomically rename it into the spool directory"""
+        if self.file is None:
+            return
+        self.file.close()
+        self.file = None
+        if self.size == 0:
+            os.remove(self.tmp_path)
+            return
+        os.replace(self.tmp_path, self.final_path)
+        self.rolled.append((time.monotonic(), self.size))
+
+def target_rate(base_rate, now, diurnal_amplitude=0.0, day_seconds=86400, burst_active=False, burst_factor=1.0):
+    """
+    Lines/sec wanted at wall-clock time `now`
+
+    The diurnal profile is a sine over the (optionally compressed) day that
+    peaks at noon and bottoms out at midnight; bursts multiply the result.
+    """
+    seconds_into_day = (now % day_seconds) / day_seconds * 86400
+    phase = (seconds_into_day / 3600 - 6) / 24 * 2 * np.pi
+    rate = base_rate * max(0.0, 1 + diurnal_amplitude * np.sin(phase))
+    return rate * (burst_factor if burst_active else 1.0)
+
+def emit_logs(csv_file, spool_dir='logs/incoming', rate=1000, duration=None, diurnal_amplitude=0.0,
+              day_seconds=86400, burst_factor=5.0, burst_probability=0.0, burst_seconds=10,
+              roll_size_mb=10, roll_seconds=60, report_interval=10, tick=0.1, seed=None):
+    """
+    Continuously emit log lines into a Flume spooling directory
+
+    Args:
+        csv_file: Source CSV file
+        spool_dir: Spooling directory watched by the log-agent source
+        rate: Base target rate in lines/sec
+        duration: Seconds to run (None = until Ctrl+C)
+        diurnal_amplitude: 0..1, relative swing of the rate over the day
+        day_seconds: Length of one simulated day (86400 = real time)
+        burst_probability: Chance per second that a burst starts
+        burst_factor: Rate multiplier during a burst
+        burst_seconds: Length of a burst
+        roll_size_mb: Roll the current file at this size
+        roll_seconds: Roll the current file at this age
+        report_interval: Seconds between progress reports
+        tick: Seconds between write cycles
+        seed: Seed for reproducible content and bursts
+    """
+    
+    print("╔════════════════════════════════════════════════════════════╗")
+    print("║          Continuous Log Emitter                            ║")
+    print("╚════════════════════════════════════════════════════════════╝\n")
+    
+    if not os.path.exists(csv_file):
+        print(f"❌ Error: File not found: {csv_file}")
+        return
+    
+    print(f"📖 Loading data from {csv_file}...")
+    fields = prepare_row_fields(pd.read_csv(csv_file))
+    templates = _compile_templates()
+    rng = np.random.default_rng(seed)
+    writer = SpoolWriter(spool_dir, int(roll_size_mb * 1024 * 1024), roll_seconds)
+    
+    print(f"📁 Spool directory: {writer.spool_dir}")
+    print(f"🎯 Target rate: {rate:,} lines/sec (diurnal ±{diurnal_amplitude*100:.0f}%, "
+          f"bursts x{burst_factor} at p={burst_probability}/s for {burst_seconds}s)")
+    print(f"🔄 Roll at {roll_size_mb} MB or {roll_seconds}s")
+    print("Press Ctrl+C to stop\n")
+    
+    started = last = last_report = time.monotonic()
+    next_tick = started + tick
+    burst_until = 0.0
+    owed = 0.0
+    total_lines = report_lines = 0
+    report_rolled = 0
+    
+    try:
+        while duration is None or last - started < duration:
+            now = time.monotonic()
+            elapsed = now - last
+            last = now
+            
+            if now >= burst_until and rng.random() < burst_probability * elapsed:
+                burst_until = now + burst_seconds
+            rate_now = target_rate(rate, time.time(), diurnal_amplitude, day_seconds,
+                                   now < burst_until, burst_factor)
+            
+            # Lines owed accumulate with real elapsed time, so slow cycles catch up
+            owed += rate_now * elapsed
+            count = int(owed)
+            if count:
+                owed -= count
+                writer.write(format_log_block(fields, count, datetime.now(), rng, templates, window_seconds=0))
+                total_lines += count
+                report_lines += count
+            writer.maybe_roll()
+            
+            if now - last_report >= report_interval:
+                rolled = writer.rolled[report_rolled:]
+                cadence = (now - last_report) / len(rolled) if rolled else 0
+                avg_kb = sum(size for _, size in rolled) / len(rolled) / 1024 if rolled else 0
+                print(f"📈 {report_lines / (now - last_report):,.0f} lines/sec "
+                      f"(target now {rate_now:,.0f}{', BURST' if now < burst_until else ''}) | "
+                      f"{len(rolled)} files rolled, every {cadence:.1f}s, avg {avg_kb:,.0f} KB")
+                report_rolled = len(writer.rolled)
+                report_lines = 0
+                last_report = now
+            
+            time.sleep(max(0.0, next_tick - time.monotonic()))
+            next_tick = max(next_tick + tick, time.monotonic())
+    
+    except KeyboardInterrupt:
+        print("\n⚠️  Emitter stopped by user")
+    
+    finally:
+        writer.roll()
+        elapsed = time.monotonic() - started
+        print(f"\n{'='*60}")
+        print("SUMMARY")
+        print('='*60)
+        print(f"✅ Lines emitted: {total_lines:,} in {elapsed:.1f}s ({total_lines / elapsed if elapsed else 0:,.0f} lines/sec)")
+        print(f"✅ Files rolled: {len(writer.rolled)}")
+        if len(writer.rolled) > 1:
+            times = [t for t, _ in writer.rolled]
+            print(f"✅ Roll cadence: every {(times[-1] - times[0]) / (len(times) - 1):.1f}s")
+
 def main():
     parser = argparse.ArgumentParser(description='Generate application logs from transaction data')
     parser.add_argument('csv_file', nargs='?', help='Source CSV file')
     parser.add_argument('--output-dir', default='logs/incoming', help='Output directory for logs')
     parser.add_argument('--logs-per-file', type=int, default=1000, help='Log entries per file')
     parser.add_argument('--num-files', type=int, default=5, help='Number of log files to generate')
+    parser.add_argument('--vectorized', action='store_true', help='Generate lines in NumPy blocks (much faster for large files)')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes, one file at a time each (0 = all cores)')
+    parser.add_argument('--seed', type=int, help='Master seed for reproducible output')
+    parser.add_argument('--start-date', help='Date (YYYY-MM-DD) of the newest file, for reproducible timestamps')
+    
+    daemon = parser.add_argument_group('daemon mode (continuous feed for the Flume spooldir)')
+    daemon.add_argument('--daemon', action='store_true', help='Emit lines continuously instead of a fixed batch')
+    daemon.add_argument('--rate', type=float, default=1000, help='Target lines/sec (default: 1000)')
+    daemon.add_argument('--duration', type=float, help='Seconds to run (default: until Ctrl+C)')
+    daemon.add_argument('--diurnal-amplitude', type=float, default=0.0, help='0..1 daily swing of the rate around --rate')
+    daemon.add_argument('--day-seconds', type=float, default=86400, help='Length of a simulated day (default: real time)')
+    daemon.add_argument('--burst-probability', type=float, default=0.0, help='Chance per second that a burst starts')
+    daemon.add_argument('--burst-factor', type=float, default=5.0, help='Rate multiplier during bursts')
+    daemon.add_argument('--burst-seconds', type=float, default=10, help='Length of a burst')
+    daemon.add_argument('--roll-size-mb', type=float, default=10, help='Roll files at this size (default: 10)')
+    daemon.add_argument('--roll-seconds', type=float, default=60, help='Roll files at this age (default: 60)')
+    daemon.add_argument('--report-interval', type=float, default=10, help='Seconds between rate reports')
     
     args = parser.parse_args()
     
@@ -189,7 +572,14 @@ def main():
         if not os.path.exists(args.csv_file):
             args.csv_file = str(data_dir / "Online Sales Data.csv")
     
-    generate_logs(args.csv_file, args.output_dir, args.logs_per_file, args.num_files)
+    if args.daemon:
+        emit_logs(args.csv_file, args.output_dir, args.rate, args.duration, args.diurnal_amplitude,
+                  args.day_seconds, args.burst_factor, args.burst_probability, args.burst_seconds,
+                  args.roll_size_mb, args.roll_seconds, args.report_interval, seed=args.seed)
+        return
+    
+    generate_logs(args.csv_file, args.output_dir, args.logs_per_file, args.num_files, args.vectorized,
+                  args.workers, args.seed, args.start_date)
 
 if __name__ == "__main__":
     main()
@@ -4,12 +4,20 @@ MySQL Schema Generator - Phase 1.3
 Auto-generates MySQL table creation script based on Online Sales Data CSV
 """
 
-import pandas as pd
 import os
 from pathlib import Path
 
-def infer_sql_type(dtype, column_name, sample_values):
-    """Infer SQL data type from pandas dtype"""
+from profile_cache import load_profile, describe_status
+
+def infer_sql_type(dtype, column_name, max_len=None):
+    """
+    Infer SQL data type from pandas dtype
+
+    Args:
+        dtype: pandas dtype (or its name) inferred for the column
+        column_name: Cleaned column name
+        max_len: Longest string value in the column (text columns only)
+    """
     dtype_str = str(dtype)
     
     # Check for specific columns
@@ -26,9 +34,9 @@ def infer_sql_type(dtype, column_name, sample_values):
         if 'price' in column_name.lower() or 'revenue' in column_name.lower() or 'amount' in column_name.lower():
             return "DECIMAL(12,2)"
         return "DECIMAL(15,2)"
-    elif dtype_str == 'object':
-        # Infer string length from sample data
-        max_len = max([len(str(v)) for v in sample_values if pd.notna(v)], default=50)
+    elif dtype_str in ('object', 'str'):
+        # String length comes from the profile of the whole column
+        max_len = max_len or 50
         if max_len <= 50:
             return "VARCHAR(50)"
         elif max_len <= 100:
@@ -61,10 +69,11 @@ def generate_mysql_schema():
         print(f"❌ Error: File not found at {csv_file}")
         return
     
-    # Read the dataset
-    print(f"📖 Reading {csv_file.name}...")
-    df = pd.read_csv(csv_file)
-    print(f"✓ Loaded {len(df):,} records with {len(df.columns)} columns\n")
+    # Profile the dataset (cached between pipeline stages)
+    print(f"📖 Profiling {csv_file.name}...")
+    profile, cache_status = load_profile(csv_file)
+    print(describe_status(cache_status))
+    print(f"✓ Profiled {profile.rows:,} records with {len(profile.columns)} columns\n")
     
     # Start building SQL
     sql_content = []
@@ -84,10 +93,9 @@ def generate_mysql_schema():
     sql_content.append("CREATE TABLE transactions (")
     
     columns = []
-    for col in df.columns:
+    for col in profile.columns:
         col_clean = col.replace(' ', '_').replace('-', '_').lower()
-        sample_values = df[col].head(100).tolist()
-        sql_type = infer_sql_type(df[col].dtype, col_clean, sample_values)
+        sql_type = infer_sql_type(profile.dtypes[col], col_clean, profile.max_lengths.get(col))
         
         # Primary key
         if col_clean == 'transaction_id':
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Transaction ID Allocator
+Hands out unique transaction IDs from blocks leased from a MySQL sequence table
+
+Each lease is a single atomic UPDATE that bumps the sequence row by the
+block size, so any number of streamers (threads, processes or hosts) can
+generate IDs with no per-row coordination and no MAX(transaction_id) scan
+at startup. The row lock is held only for that one statement.
+
+IDs are unique but not gap-free: whatever is left of a block when a
+streamer stops is never used.
+"""
+
+import threading
+
+SEQUENCE_TABLE = 'id_sequences'
+DEFAULT_BLOCK_SIZE = 10_000
+# First ID handed out on an empty database (matches the old MAX(...) fallback of 1000)
+FIRST_ID = 1001
+
+CREATE_SQL = f"""
+    CREATE TABLE IF NOT EXISTS {SEQUENCE_TABLE} (
+        name VARCHAR(50) PRIMARY KEY,
+        next_id BIGINT UNSIGNED NOT NULL
+    )
+"""
+
+# LAST_INSERT_ID(expr) stores the new value on this connection, so the
+# following SELECT reads our own bump without locking the row again
+LEASE_SQL = f"UPDATE {SEQUENCE_TABLE} SET next_id = LAST_INSERT_ID(next_id + %s) WHERE name = %s"
+
+# One-time seed for a sequence that does not exist yet. INSERT IGNORE lets
+# concurrent first runs race safely: one row wins, the others are no-ops.
+SEED_SQL = f"""
+    INSERT IGNORE INTO {SEQUENCE_TABLE} (name, next_id)
+    SELECT %s, GREATEST(COALESCE(MAX(CAST(transaction_id AS UNSIGNED)), 0) + 1, %s) FROM transactions
+"""
+SEED_EMPTY_SQL = f"INSERT IGNORE INTO {SEQUENCE_TABLE} (name, next_id) VALUES (%s, %s)"
+
+class BlockIdAllocator:
+    """
+    Thread-safe source of unique IDs for one named sequence
+
+    Args:
+        connect: Callable returning a new MySQL connection; the allocator
+            keeps its own so lease commits never mix with data inserts
+        name: Sequence name (one row in the sequence table)
+        block_size: IDs leased per UPDATE
+    """
+
+    def __init__(self, connect, name='transactions', block_size=DEFAULT_BLOCK_SIZE):
+        if block_size < 1:
+            raise ValueError("block_size must be at least 1")
+        self.connect = connect
+        self.name = name
+        self.block_size = block_size
+        self.conn = None
+        self.lock = threading.Lock()
+        self.next = 0
+        self.end = 0
+        self.leases = 0
+
+    @property
+    def exhausted(self):
+        """True when the next ID needs a new lease (a MySQL round trip)"""
+        return self.next >= self.end
+
+    def next_id(self):
+        with self.lock:
+            if self.next >= self.end:
+                self._lease()
+            value = self.next
+            self.next += 1
+            return value
+
+    def _lease(self):
+        """Reserve [end - block_size, end) with one UPDATE, seeding the sequence on first use"""
+        if self.conn is None:
+            self.conn = self.connect()
+        try:
+            cursor = self.conn.cursor()
+            if not self.leases:
+                cursor.execute(CREATE_SQL)
+            cursor.execute(LEASE_SQL, (self.block_size, self.name))
+            if cursor.rowcount == 0:
+                self._seed(cursor)
+                cursor.execute(LEASE_SQL, (self.block_size, self.name))
+            cursor.execute("SELECT LAST_INSERT_ID()")
+            end = int(cursor.fetchone()[0])
+            self.conn.commit()
+            cursor.close()
+        except Exception:
+            # Drop the connection (rolling back any uncommitted bump) and reconnect on the next lease
+            self.close()
+            raise
+        self.next, self.end = end - self.block_size, end
+        self.leases += 1
+
+    def _seed(self, cursor):
+        """Create the sequence row, starting after the largest existing transaction ID"""
+        try:
+            cursor.execute(SEED_SQL, (self.name, FIRST_ID))
+        except Exception:
+            # No transactions table yet
+            cursor.execute(SEED_EMPTY_SQL, (self.name, FIRST_ID))
+        self.conn.commit()
+
+    def close(self):
+        conn, self.conn = self.conn, None
+        if conn:
+            try:
+                conn.close()
+            except Exception:
+                pass
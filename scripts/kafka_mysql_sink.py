@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Kafka to MySQL Sink
+Consumes ecommerce-transactions in a consumer group and upserts each poll batch into MySQL
+
+Each poll batch is written with one multi-row INSERT ... ON DUPLICATE KEY
+UPDATE and one commit; Kafka offsets are committed only after the MySQL
+commit. A crash between the two re-delivers the batch, and the upsert makes
+the replay harmless (at-least-once delivery, effectively-once rows).
+
+Every instance (or --workers process) joins the same group, so Kafka splits
+the topic's partitions between them: throughput scales with the partition
+count, and instances beyond it sit idle as hot standbys.
+"""
+
+import argparse
+import logging
+import multiprocessing
+import time
+
+import mysql.connector
+from kafka import KafkaConsumer
+from kafka.errors import CommitFailedError, RebalanceInProgressError
+
+from realtime_stream import MYSQL_CONFIG, mysql_row
+from serializers import deserialize
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+TOPIC = 'ecommerce-transactions'
+GROUP_ID = 'mysql-sink'
+
+# Same columns as realtime_stream.INSERT_SQL; a re-delivered row overwrites itself
+UPSERT_SQL = """
+    INSERT INTO transactions
+    (transaction_id, product_name, product_category, units_sold, unit_price,
+     total_revenue, payment_method, region, date)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        product_name = VALUES(product_name),
+        product_category = VALUES(product_category),
+        units_sold = VALUES(units_sold),
+        unit_price = VALUES(unit_price),
+        total_revenue = VALUES(total_revenue),
+        payment_method = VALUES(payment_method),
+        region = VALUES(region),
+        date = VALUES(date)
+"""
+
+# Errors that retrying the same row can never fix
+REJECTED_ERRORS = (mysql.connector.errors.DataError, mysql.connector.errors.IntegrityError)
+
+# Seconds between throughput log lines, and before retrying a failed batch
+REPORT_INTERVAL = 5.0
+RETRY_DELAY = 2.0
+
+def event_row(event):
+    """
+    Values for UPSERT_SQL from either event shape
+
+    RealtimeStreamer events (quantity/total_amount/timestamp) go through
+    realtime_stream.mysql_row(); CSV replay events from stream_to_kafka.py
+    already use the table's column names.
+    """
+    if 'quantity' in event:
+        return mysql_row(event)
+    return (
+        str(event['transaction_id']),
+        event['product_name'],
+        event['product_category'],
+        event['units_sold'],
+        event['unit_price'],
+        event['total_revenue'],
+        event['payment_method'],
+        event['region'],
+        event['date']
+    )
+
+class MySQLSink:
+    """
+    One consumer-group member writing its partitions to MySQL
+
+    Args:
+        topic: Topic to consume
+        group_id: Consumer group shared by all sink instances
+        batch_size: Most records per poll, i.e. per upsert and commit
+        poll_ms: Longest wait for a poll batch to fill
+        bootstrap_servers: Kafka brokers
+        name: Label for log lines (e.g. worker number)
+    """
+
+    def __init__(self, topic=TOPIC, group_id=GROUP_ID, batch_size=500, poll_ms=1000,
+                 bootstrap_servers='localhost:9092', name='sink'):
+        self.topic = topic
+        self.group_id = group_id
+        self.batch_size = batch_size
+        self.poll_ms = poll_ms
+        self.bootstrap_servers = bootstrap_servers
+        self.name = name
+        self.consumer = None
+        self.mysql_conn = None
+        self.written = 0
+        self.rejected = 0
+        self.batches = 0
+        self.retries = 0
+
+    def connect(self):
+        try:
+            self.consumer = KafkaConsumer(
+                self.topic,
+                bootstrap_servers=self.bootstrap_servers,
+                group_id=self.group_id,
+                enable_auto_commit=False,
+                auto_offset_reset='earliest',
+                max_poll_records=self.batch_size,
+                value_deserializer=lambda v: v  # Decoded per record so one bad message can be skipped
+            )
+            logger.info(f"✅ [{self.name}] Joined consumer group '{self.group_id}' on {self.topic}")
+        except Exception as e:
+            logger.error(f"❌ [{self.name}] Failed to connect to Kafka: {e}")
+            return False
+        return self.connect_mysql()
+
+    def connect_mysql(self):
+        try:
+            self.mysql_conn = mysql.connector.connect(**MYSQL_CONFIG)
+            return True
+        except Exception as e:
+            logger.error(f"❌ [{self.name}] Failed to connect to MySQL: {e}")
+            return False
+
+    def decode(self, records):
+        """
+        Rows for the batch and the number of messages skipped
+
+        Undecodable or unmappable messages are logged and skipped rather
+        than blocking their partition.
+        """
+        rows = []
+        skipped = 0
+        for record in records:
+            try:
+                rows.append(event_row(deserialize(record.value)))
+            except Exception as e:
+                skipped += 1
+                logger.warning(f"⚠️  [{self.name}] Skipping {record.topic}[{record.partition}]@{record.offset}: {e}")
+        return rows, skipped
+
+    def write_batch(self, rows):
+        """
+        Upsert the rows with one multi-row statement and one commit
+
+        Returns the number of rows written, or None if the batch should be retried.
+        """
+        if self.mysql_conn is None or not self.mysql_conn.is_connected():
+            if not self.connect_mysql():
+                return None
+        try:
+            cursor = self.mysql_conn.cursor()
+            # mysql-connector rewrites executemany() of an INSERT ... VALUES into a single multi-row statement
+            cursor.executemany(UPSERT_SQL, rows)
+            self.mysql_conn.commit()
+            return len(rows)
+        except REJECTED_ERRORS as e:
+            logger.warning(f"⚠️  [{self.name}] Batch of {len(rows)} rejected ({e}); retrying row by row")
+            try:
+                self.mysql_conn.rollback()
+            except Exception:
+                self.mysql_conn = None
+                return None
+            return self.write_rows(rows)
+        except Exception as e:
+            logger.error(f"❌ [{self.name}] Failed to upsert batch of {len(rows)}: {e}")
+            try:
+                self.mysql_conn.rollback()
+            except Exception:
+                self.mysql_conn = None
+            return None
+
+    def write_rows(self, rows):
+        """
+        Upsert one row at a time, skipping the rows MySQL rejects
+
+        A rejected statement only rolls itself back, so the good rows still
+        go out in one commit. Any other error fails the whole batch for retry.
+        """
+        rejected = 0
+        try:
+            cursor = self.mysql_conn.cursor()
+            for row in rows:
+                try:
+                    cursor.execute(UPSERT_SQL, row)
+                except REJECTED_ERRORS as e:
+                    rejected += 1
+                    logger.warning(f"⚠️  [{self.name}] Skipping transaction {row[0]}: {e}")
+            self.mysql_conn.commit()
+        except Exception as e:
+            logger.error(f"❌ [{self.name}] Failed to upsert batch of {len(rows)} row by row: {e}")
+            try:
+                self.mysql_conn.rollback()
+            except Exception:
+                self.mysql_conn = None
+            return None
+        return len(rows) - rejected
+
+    def rewind(self, batch):
+        """Seek each partition back to the batch's first offset so the next poll re-reads it"""
+        for tp, records in batch.items():
+            self.consumer.seek(tp, records[0].offset)
+
+    def run(self, duration=None):
+        """Consume until duration seconds (None = until interrupted)"""
+        if not self.connect():
+            return
+        start = last_report = time.monotonic()
+        reported = 0
+        try:
+            while not (duration and time.monotonic() - start >= duration):
+                batch = self.consumer.poll(timeout_ms=self.poll_ms, max_records=self.batch_size)
+                if batch:
+                    rows, skipped = self.decode(r for records in batch.values() for r in records)
+                    written = self.write_batch(rows) if rows else 0
+                    if written is None:
+                        self.retries += 1
+                        self.rewind(batch)
+                        time.sleep(RETRY_DELAY)
+                        continue
+                    # Offsets only move once the rows are durable in MySQL
+                    try:
+                        self.consumer.commit()
+                    except (CommitFailedError, RebalanceInProgressError) as e:
+                        # Partitions moved mid-batch; their new owner re-reads it and the upsert absorbs the replay
+                        logger.warning(f"⚠️  [{self.name}] Offset commit skipped during rebalance: {e}")
+                    self.written += written
+                    self.rejected += skipped + len(rows) - written
+                    self.batches += 1
+
+                now = time.monotonic()
+                if now - last_report >= REPORT_INTERVAL:
+                    partitions = sorted(tp.partition for tp in self.consumer.assignment())
+                    logger.info(f"📊 [{self.name}] {(self.written - reported) / (now - last_report):,.0f} rows/s | "
+                                f"partitions {partitions} | {self.written:,} rows in {self.batches:,} batches "
+                                f"(avg {self.written / self.batches if self.batches else 0:,.0f}) | "
+                                f"rejected {self.rejected:,}, retried {self.retries:,}")
+                    reported = self.written
+                    last_report = now
+        except KeyboardInterrupt:
+            logger.info(f"\n⚠️  [{self.name}] Stopped by user (Ctrl+C)")
+        finally:
+            self.cleanup()
+            logger.info(f"📊 [{self.name}] Total: {self.written:,} rows upserted, {self.rejected:,} rejected")
+
+    def cleanup(self):
+        if self.consumer:
+            # Leave the group now so the partitions are reassigned without waiting for the session timeout
+            self.consumer.close(autocommit=False)
+        if self.mysql_conn:
+            self.mysql_conn.close()
+
+def _run_worker(worker_id, options):
+    MySQLSink(name=f"worker-{worker_id}", **options['sink']).run(options['duration'])
+
+def run_sinks(workers=1, duration=None, **sink_options):
+    """Run `workers` sink processes in the same consumer group (one in-process if workers == 1)"""
+    options = {'sink': sink_options, 'duration': duration}
+    if workers == 1:
+        MySQLSink(**sink_options).run(duration)
+        return
+    processes = [multiprocessing.Process(target=_run_worker, args=(w, options)) for w in range(workers)]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        # Ctrl+C reaches the children too; give them time to leave the group cleanly
+        for process in processes:
+            process.join(timeout=30)
+
+def main():
+    parser = argparse.ArgumentParser(description='Consume transactions from Kafka and upsert them into MySQL')
+    parser.add_argument('--topic', default=TOPIC, help=f'Topic to consume (default: {TOPIC})')
+    parser.add_argument('--group-id', default=GROUP_ID, help=f'Consumer group shared by all sinks (default: {GROUP_ID})')
+    parser.add_argument('--batch-size', type=int, default=500, help='Records per poll, upsert and commit (default: 500)')
+    parser.add_argument('--poll-ms', type=int, default=1000, help='Longest wait for a batch to fill (default: 1000)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Sink processes in this group; more than the partition count leaves some idle (default: 1)')
+    parser.add_argument('--duration', type=float, help='Stop after this many seconds (default: run until Ctrl+C)')
+    parser.add_argument('--bootstrap-servers', default='localhost:9092', help='Kafka brokers (default: localhost:9092)')
+    args = parser.parse_args()
+    if args.batch_size < 1 or args.workers < 1:
+        parser.error("--batch-size and --workers must be at least 1")
+
+    print("╔════════════════════════════════════════════════════════════╗")
+    print("║          Kafka → MySQL Sink                                ║")
+    print("╚════════════════════════════════════════════════════════════╝\n")
+    print(f"📥 {args.topic} → testdb.transactions (group '{args.group_id}', {args.workers} worker(s))")
+    print(f"📦 Up to {args.batch_size} records per upsert; offsets committed after each MySQL commit\n")
+
+    run_sinks(args.workers, args.duration, topic=args.topic, group_id=args.group_id, batch_size=args.batch_size,
+              poll_ms=args.poll_ms, bootstrap_servers=args.bootstrap_servers)
+
+if __name__ == "__main__":
+    main()
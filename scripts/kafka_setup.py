@@ -62,6 +62,11 @@ def create_topics():
                 num_partitions=3,
                 replication_factor=1
             ),
+            NewTopic(
+                name='ecommerce-transactions-dedup',  # dedupe_stream.py output; same partitions as its input
+                num_partitions=3,
+                replication_factor=1
+            ),
             NewTopic(
                 name='ecommerce-logs',
                 num_partitions=2,
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Load Generator - Capacity Testing
+Drives RealtimeStreamer from many workers at a target aggregate TPS to find the pipeline's breaking point
+
+Each worker (thread or process) owns a RealtimeStreamer, i.e. its own Kafka
+producer, MySQL connection and block of leased transaction IDs, and paces itself with a token bucket at its
+share of the target rate. Every transaction does a blocking Kafka send and a
+MySQL insert + commit, so the measured latency is the full dual-write path.
+Workers ship per-interval counts and latencies to the parent, which prints
+live achieved TPS, error rate and latency percentiles.
+"""
+
+import argparse
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+
+from rate_control import TokenBucket, RateSchedule
+from realtime_stream import RealtimeStreamer, PRODUCTS, REGIONS, PAYMENT_METHODS, percentile
+from id_allocator import DEFAULT_BLOCK_SIZE
+from partitioning import KEY_STRATEGIES
+from serializers import SERIALIZERS
+from sketches import KLLSketch
+
+PROFILES = ['constant', 'ramp', 'spike', 'soak']
+
+# Seconds between worker stat messages and between live report lines
+WORKER_FLUSH_INTERVAL = 0.5
+REPORT_INTERVAL = 1.0
+
+def build_profile(profile, tps, duration, ramp_seconds=30, spike_factor=5, spike_seconds=10):
+    """
+    Target aggregate TPS over time for a named load profile
+
+      constant - tps for the whole run
+      ramp     - 0 to tps over ramp_seconds, then hold
+      spike    - tps, with spike_factor * tps for spike_seconds in the middle of the run
+      soak     - tps held for a long run (same shape as constant)
+    """
+    if profile == 'ramp':
+        return RateSchedule([(0, 0), (ramp_seconds, tps), (max(duration, ramp_seconds), tps)])
+    if profile == 'spike':
+        start = max(duration - spike_seconds, 0) / 2
+        edge = 0.001  # Near-vertical edges on the piecewise-linear schedule
+        return RateSchedule([(0, tps), (start, tps), (start + edge, tps * spike_factor),
+                             (start + spike_seconds, tps * spike_factor), (start + spike_seconds + edge, tps)])
+    if profile in ('constant', 'soak'):
+        return RateSchedule([(0, tps)])
+    raise ValueError(f"Unknown profile '{profile}' (choose from {', '.join(PROFILES)})")
+
+def parse_mix(spec, names):
+    """
+    Weights for random choices from "name=weight,..."
+
+    Names left out of the spec get weight 0; None means uniform.
+    """
+    if not spec:
+        return None
+    weights = dict.fromkeys(names, 0.0)
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in weights:
+            raise ValueError(f"Unknown mix entry '{name}' (choose from {', '.join(names)})")
+        weights[name] = float(weight or 1)
+    if not any(weights.values()):
+        raise ValueError(f"Mix '{spec}' gives every option weight 0")
+    return list(weights.values())
+
+def run_worker(worker_id, workers, schedule_points, duration, mix, key_by, serializer, id_block_size,
+               results, stop):
+    """
+    Generate transactions at this worker's share of the scheduled rate
+
+    Runs in a thread or a child process. Sends (worker_id, count, errors,
+    latencies_ms) to `results` every WORKER_FLUSH_INTERVAL, then None when done.
+    """
+    logging.getLogger('realtime_stream').setLevel(logging.WARNING)
+    schedule = RateSchedule(schedule_points)
+    streamer = RealtimeStreamer(key_by, serializer, mix=mix, id_block_size=id_block_size)
+    try:
+        if not streamer.connect_kafka() or not streamer.connect_mysql():
+            results.put((worker_id, 0, 1, []))
+            return
+        limiter = TokenBucket(schedule.rate_at(0) / workers, max(1.0, max(r for _, r in schedule.points) / workers / 10))
+        count = errors = 0
+        latencies = []
+        start = last_flush = time.monotonic()
+        while not stop.is_set():
+            now = time.monotonic()
+            if now - start >= duration:
+                break
+            limiter.set_rate(schedule.rate_at(now - start) / workers)
+            if now - last_flush >= WORKER_FLUSH_INTERVAL:
+                results.put((worker_id, count, errors, latencies))
+                count = errors = 0
+                latencies = []
+                last_flush = now
+            if not limiter.acquire(timeout=0.1):
+                continue
+            began = time.perf_counter()
+            transaction = streamer.generate_transaction()
+            ok = streamer.send_to_kafka(transaction) and streamer.save_to_mysql(transaction)
+            latencies.append((time.perf_counter() - began) * 1000)
+            count += 1
+            errors += not ok
+        results.put((worker_id, count, errors, latencies))
+    finally:
+        streamer.cleanup()
+        results.put(None)
+
+def generate_load(tps=100, workers=4, mode='thread', profile='constant', duration=60, ramp_seconds=30,
+                  spike_factor=5, spike_seconds=10, mix=None, key_by=None, serializer='json',
+                  id_block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Run a load test and print live and final statistics
+
+    Args:
+        tps: Target aggregate transactions per second (the baseline for spike)
+        workers: Worker threads or processes, each with its own producer and DB connection
+        mode: 'thread' or 'process'
+        profile: One of PROFILES (see build_profile)
+        duration: Test length in seconds
+        mix: Optional weights {'products': [...], 'regions': [...], 'payment_methods': [...]}
+        key_by: Kafka message key strategy (see partitioning.py)
+        serializer: Kafka message format, 'json' or 'binary'
+        id_block_size: Transaction IDs each worker leases from MySQL at a time
+    """
+    schedule = build_profile(profile, tps, duration, ramp_seconds, spike_factor, spike_seconds)
+
+    print("╔════════════════════════════════════════════════════════════╗")
+    print("║          Load Generator                                    ║")
+    print("╚════════════════════════════════════════════════════════════╝\n")
+    print(f"🎯 Profile: {profile}, {tps:,.0f} TPS target, {duration:g}s")
+    print(f"🧵 Workers: {workers} {mode}s, each with its own Kafka producer and MySQL connection")
+    for name, weights in (mix or {}).items():
+        options = {'products': [p['name'] for p in PRODUCTS], 'regions': REGIONS, 'payment_methods': PAYMENT_METHODS}[name]
+        print(f"🎲 {name} mix: {', '.join(f'{o}={w:g}' for o, w in zip(options, weights) if w)}")
+    print(f"🔢 Transaction IDs leased in blocks of {id_block_size:,} per worker\n")
+
+    if mode == 'process':
+        results, stop = multiprocessing.Queue(), multiprocessing.Event()
+        spawn = multiprocessing.Process
+    else:
+        results, stop = queue.Queue(), threading.Event()
+        spawn = threading.Thread
+    runners = [
+        spawn(target=run_worker, args=(w, workers, schedule.points, duration, mix, key_by, serializer,
+                                       id_block_size, results, stop), daemon=True)
+        for w in range(workers)
+    ]
+
+    print(f"{'='*60}")
+    print("LOAD TEST STARTED")
+    print('='*60)
+    print("Press Ctrl+C to stop\n")
+
+    total = total_errors = 0
+    overall = KLLSketch()
+    interval_count = interval_errors = 0
+    interval_latencies = []
+    running = workers
+    start = last_report = time.monotonic()
+    for runner in runners:
+        runner.start()
+    try:
+        while running:
+            try:
+                message = results.get(timeout=0.1)
+            except queue.Empty:
+                message = False
+            if message is None:
+                running -= 1
+            elif message:
+                _, count, errors, latencies = message
+                interval_count += count
+                interval_errors += errors
+                interval_latencies.extend(latencies)
+
+            now = time.monotonic()
+            if now - last_report >= REPORT_INTERVAL or not running:
+                elapsed = now - last_report
+                target = schedule.rate_at(now - start)
+                achieved = interval_count / elapsed if elapsed else 0
+                interval_latencies.sort()
+                error_pct = interval_errors / interval_count * 100 if interval_count else 0
+                behind = " ⚠️  below target" if target and achieved < 0.9 * target else ""
+                print(f"[{now - start:6.1f}s] {achieved:8,.0f} / {target:,.0f} TPS | errors {error_pct:5.1f}% | "
+                      f"latency p50 {percentile(interval_latencies, 50):6.1f} ms, "
+                      f"p95 {percentile(interval_latencies, 95):6.1f} ms, "
+                      f"p99 {percentile(interval_latencies, 99):6.1f} ms{behind}")
+                total += interval_count
+                total_errors += interval_errors
+                overall.update(interval_latencies)
+                interval_count = interval_errors = 0
+                interval_latencies = []
+                last_report = now
+    except KeyboardInterrupt:
+        print(f"\n\n⚠️  Load test interrupted by user, stopping workers...")
+        stop.set()
+        for runner in runners:
+            runner.join(timeout=10)
+
+    elapsed = time.monotonic() - start
+    print(f"\n{'='*60}")
+    print("LOAD TEST SUMMARY")
+    print('='*60)
+    print(f"Transactions:   {total:,} in {elapsed:.1f}s ({total / elapsed if elapsed else 0:,.0f} TPS)")
+    print(f"Errors:         {total_errors:,} ({total_errors / total * 100 if total else 0:.2f}%)")
+    if overall.n:
+        print(f"Latency (ms):   p50 {overall.quantile(0.50):.1f}, p95 {overall.quantile(0.95):.1f}, "
+              f"p99 {overall.quantile(0.99):.1f}, max {overall.max:.1f} (approximate)")
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the Kafka + MySQL pipeline with RealtimeStreamer workers')
+    parser.add_argument('--tps', type=float, default=100, help='Target aggregate transactions per second (default: 100)')
+    parser.add_argument('--workers', type=int, default=4, help='Worker threads/processes (default: 4)')
+    parser.add_argument('--mode', choices=['thread', 'process'], default='thread', help='Worker type (default: thread)')
+    parser.add_argument('--profile', choices=PROFILES, default='constant', help='Load profile (default: constant)')
+    parser.add_argument('--duration', type=float, help='Test length in seconds (default: 60, soak: 3600)')
+    parser.add_argument('--ramp-seconds', type=float, default=30, help='Ramp profile: seconds to reach --tps (default: 30)')
+    parser.add_argument('--spike-factor', type=float, default=5, help='Spike profile: peak as a multiple of --tps (default: 5)')
+    parser.add_argument('--spike-seconds', type=float, default=10, help='Spike profile: spike length (default: 10)')
+    parser.add_argument('--product-mix', help='Product weights, e.g. "Laptop=3,Book=1" (others get 0)')
+    parser.add_argument('--region-mix', help='Region weights, e.g. "North=2,South=1"')
+    parser.add_argument('--payment-mix', help='Payment method weights, e.g. "Credit Card=3,Cash=1"')
+    parser.add_argument('--key-by', choices=KEY_STRATEGIES, default='none', help='Kafka message key (default: none)')
+    parser.add_argument('--serializer', choices=list(SERIALIZERS), default='json', help='Kafka message format (default: json)')
+    parser.add_argument('--id-block-size', type=int, default=DEFAULT_BLOCK_SIZE,
+                        help=f'Transaction IDs each worker leases from MySQL at a time (default: {DEFAULT_BLOCK_SIZE})')
+
+    args = parser.parse_args()
+    if args.id_block_size < 1:
+        parser.error("--id-block-size must be at least 1")
+    duration = args.duration or (3600 if args.profile == 'soak' else 60)
+
+    try:
+        mix = {
+            'products': parse_mix(args.product_mix, [p['name'] for p in PRODUCTS]),
+            'regions': parse_mix(args.region_mix, REGIONS),
+            'payment_methods': parse_mix(args.payment_mix, PAYMENT_METHODS)
+        }
+    except ValueError as e:
+        parser.error(str(e))
+    mix = {name: weights for name, weights in mix.items() if weights}
+
+    generate_load(args.tps, args.workers, args.mode, args.profile, duration, args.ramp_seconds,
+                  args.spike_factor, args.spike_seconds, mix, args.key_by, args.serializer, args.id_block_size)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+"""
+Application Log Parser
+Columnar parser for generate_logs.py output: 'YYYY-MM-DD HH:MM:SS.mmm [LEVEL] [Service] message'
+
+Files are read in large blocks and every line of a block is parsed at once
+with NumPy on the raw bytes, never as Python strings:
+  timestamp  digits and separators at fixed offsets, converted to epoch ms
+  level      one byte at a fixed offset picks it; its length places the service
+  service    the first bytes pick one of SERVICES; the rest is checked
+  template   the first bytes of the message pick one of the level's
+             MESSAGE_TEMPLATES; the template's leading literal is checked
+  txn_id,    numeric fields are read by walking the template from its leading
+  amount     literal (txn_id comes first wherever it appears)
+
+Result columns (one entry per line; codes index LEVELS, SERVICES, TEMPLATES):
+  timestamp datetime64[ms], level int8, service int8, template int16
+  (-1 = no known template), txn_id int64 (-1 = none), amount float64 (NaN = none)
+Lines that do not follow the format are counted and left out.
+"""
+
+import argparse
+import glob
+import os
+import re
+import string
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from generate_logs import LOG_LEVELS, MESSAGE_TEMPLATES, SERVICES, format_log_block, prepare_row_fields
+
+LEVELS = list(LOG_LEVELS)
+# Same order as generate_logs: levels in LOG_LEVELS order, then each level's templates
+TEMPLATES = [(level, template) for level in LEVELS for template in MESSAGE_TEMPLATES[level]]
+# Fields whose text is a number, so the template can be walked past them
+NUMERIC_FIELDS = {'txn_id', 'units', 'amount', 'stock', 'volume', 'delay'}
+EXTRACTED_FIELDS = ['txn_id', 'amount']
+
+BLOCK_BYTES = 32 * 1024 * 1024
+# Zero bytes after each block so fixed-offset reads past a short last line stay in bounds
+PADDING = 256
+
+# 'YYYY-MM-DD HH:MM:SS.mmm [' : digit and separator offsets
+DIGIT_OFFSETS = np.array([0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18, 20, 21, 22])
+SEPARATOR_OFFSETS = np.array([4, 7, 10, 13, 16, 19, 23, 24])
+SEPARATORS = np.frombuffer(b'-- ::. [', dtype=np.uint8)
+LEVEL_OFFSET = 25
+# Longest number read from a message (digits, '.' and decimals)
+NUMBER_WIDTH = 18
+
+def _template_plan(template):
+    """
+    (leading literal, [(field, literal bytes before it)]) for one template
+
+    The walk stops at the first text field: a number's length is found by
+    reading its digits, a product name's is not.
+    """
+    parts = list(string.Formatter().parse(template))
+    prefix = parts[0][0]
+    plan = []
+    gap = 0
+    for index, (literal, field, _, _) in enumerate(parts):
+        if index:
+            gap += len(literal)
+        if field is None:
+            break
+        if field not in NUMERIC_FIELDS:
+            break
+        plan.append((field, gap))
+        gap = 0
+    return prefix, plan
+
+def _rows(buf, positions, width):
+    """(len(positions), width) copy of the bytes starting at each position"""
+    # One opaque width-byte item per offset: a 1-D gather is far cheaper than 2-D fancy indexing
+    windows = np.ndarray((len(buf) - width + 1,), dtype=f'V{width}', buffer=buf, strides=(1,))
+    return windows[positions].view(np.uint8).reshape(-1, width)
+
+def _distinguishing_offsets(names):
+    """A few byte offsets whose values tell the names apart (greedy)"""
+    shortest = min(len(name) for name in names)
+    offsets = []
+    while len({tuple(name[o] for o in offsets) for name in names}) < len(names):
+        candidates = [o for o in range(shortest) if o not in offsets]
+        if not candidates:
+            raise ValueError(f"Cannot tell apart: {names}")
+        offsets.append(max(candidates, key=lambda o: len({tuple(name[p] for p in offsets + [o]) for name in names})))
+    return offsets
+
+class _Classifier:
+    """Maps the bytes at a position to one of a fixed set of names (picked by a few bytes, then checked in full)"""
+
+    def __init__(self, names):
+        self.names = [name.encode() for name in names]
+        self.lengths = np.array([len(name) for name in self.names])
+        # Compared eight bytes at a time
+        self.width = -(-int(self.lengths.max()) // 8) * 8
+        self.offsets = _distinguishing_offsets(self.names)
+        if len(self.offsets) > 2:
+            raise ValueError(f"Names need more than two distinguishing bytes: {names}")
+        self.table = np.full(256 ** len(self.offsets), -1, dtype=np.int16)
+        padded = np.zeros((len(self.names), self.width), dtype=np.uint8)
+        mask = np.zeros((len(self.names), self.width), dtype=np.uint8)
+        for code, name in enumerate(self.names):
+            padded[code, :len(name)] = np.frombuffer(name, dtype=np.uint8)
+            mask[code, :len(name)] = 0xFF
+            self.table[self._key(padded[code:code + 1])[0]] = code
+        self.padded = padded.view(np.uint64)
+        self.mask = mask.view(np.uint64)
+
+    def _key(self, window):
+        key = window[:, self.offsets[0]].astype(np.int32)
+        for offset in self.offsets[1:]:
+            key = key * 256 + window[:, offset]
+        return key
+
+    def classify(self, buf, positions):
+        """Index into names for each position, -1 where no name starts there"""
+        window = _rows(buf, positions, self.width)
+        codes = self.table[self._key(window)]
+        known = np.maximum(codes, 0)
+        differs = (window.view(np.uint64) ^ self.padded[known]) & self.mask[known]
+        return np.where((codes >= 0) & ~differs.any(axis=1), codes, -1)
+
+def _parse_numbers(buf, positions, width, decimals=False):
+    """
+    Decimal numbers starting at each position, one array step per digit column
+
+    Returns:
+        (values as int64 with the decimal point dropped, number of decimals,
+        byte lengths); length 0 where no digit starts there
+    """
+    window = _rows(buf, positions, width)
+    digits = window - np.uint8(48)  # Non-digits wrap around above 9
+    is_digit = digits <= 9
+    is_point = window == ord('.')
+    allowed = is_digit | is_point if decimals else is_digit
+    lengths = np.where(allowed.all(axis=1), width, np.argmin(allowed, axis=1))
+    if decimals:
+        # A trailing '.' ends the sentence, not the number
+        rows = np.arange(len(positions))
+        lengths -= (lengths > 0) & is_point[rows, np.maximum(lengths - 1, 0)]
+        lengths[~is_digit[:, 0]] = 0
+    values = np.zeros(len(positions), dtype=np.int64)
+    scale = np.zeros(len(positions), dtype=np.int64)
+    seen_point = np.zeros(len(positions), dtype=bool)
+    for column in range(int(lengths.max()) if len(lengths) else 0):
+        active = column < lengths
+        step = active & is_digit[:, column]
+        values = np.where(step, values * 10 + digits[:, column], values)
+        if decimals:
+            scale += step & seen_point
+            seen_point |= active & is_point[:, column]
+    return values, scale, lengths
+
+def _epoch_days(year, month, day):
+    """Days since 1970-01-01 of proleptic Gregorian dates (vectorized days_from_civil)"""
+    year = year - (month <= 2)
+    era = np.floor_divide(year, 400)
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month + np.where(month > 2, -3, 9)) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+class LogParser:
+    """Parses blocks of log lines into columns; build once and reuse"""
+
+    def __init__(self):
+        self.levels = _Classifier(LEVELS)
+        self.level_lengths = np.array([len(level) for level in LEVELS])
+        # Service name plus the '] ' before the message
+        self.services = _Classifier([f"{service}] " for service in SERVICES])
+        self.templates = {}
+        first = 0
+        for level in LEVELS:
+            plans = [_template_plan(template) for template in MESSAGE_TEMPLATES[level]]
+            self.templates[level] = (first, _Classifier([prefix for prefix, _ in plans]), plans)
+            first += len(plans)
+
+    def parse_block(self, data):
+        """
+        Columns for every line in data (bytes of whole lines)
+
+        Returns:
+            (dict of column arrays, number of lines that did not parse)
+        """
+        terminator = b'\n' if data and not data.endswith(b'\n') else b''
+        buf = np.frombuffer(data + terminator + bytes(PADDING), dtype=np.uint8)
+        size = len(buf) - PADDING
+        ends = np.flatnonzero(buf[:size] == 10)
+        starts = np.concatenate(([0], ends[:-1] + 1))
+        # Shortest possible line: timestamp, '[', a level and '] [', one service byte
+        valid = ends - starts > LEVEL_OFFSET + 4
+        starts, ends = starts[valid], ends[valid]
+        blank_or_short = len(valid) - len(starts)
+
+        stamp = _rows(buf, starts, LEVEL_OFFSET)
+        digits = stamp[:, DIGIT_OFFSETS] - np.uint8(48)
+        ok = (digits <= 9).all(axis=1) & (stamp[:, SEPARATOR_OFFSETS] == SEPARATORS).all(axis=1)
+
+        level = self.levels.classify(buf, starts + LEVEL_OFFSET)
+        ok &= level >= 0
+        after_level = starts + LEVEL_OFFSET + self.level_lengths[np.maximum(level, 0)]
+        ok &= (buf[after_level] == ord(']')) & (buf[after_level + 1] == ord(' ')) & (buf[after_level + 2] == ord('['))
+        service_start = after_level + 3
+        service = self.services.classify(buf, service_start)
+        ok &= service >= 0
+
+        rows = np.flatnonzero(ok)
+        digits, level, service = digits[rows].astype(np.int64), level[rows], service[rows]
+        message_start = service_start[rows] + self.services.lengths[service]
+        n = len(rows)
+
+        powers = 10 ** np.arange(3, -1, -1)
+        year = digits[:, 0:4] @ powers
+        month = digits[:, 4] * 10 + digits[:, 5]
+        day = digits[:, 6] * 10 + digits[:, 7]
+        seconds = ((digits[:, 8] * 10 + digits[:, 9]) * 3600 + (digits[:, 10] * 10 + digits[:, 11]) * 60
+                   + digits[:, 12] * 10 + digits[:, 13])
+        millis = digits[:, 14] * 100 + digits[:, 15] * 10 + digits[:, 16]
+        timestamp = (_epoch_days(year, month, day) * 86400 + seconds) * 1000 + millis
+
+        template = np.full(n, -1, dtype=np.int16)
+        txn_id = np.full(n, -1, dtype=np.int64)
+        amount = np.full(n, np.nan)
+        for level_code, name in enumerate(LEVELS):
+            first, classifier, plans = self.templates[name]
+            level_rows = np.flatnonzero(level == level_code)
+            if not len(level_rows):
+                continue
+            local = classifier.classify(buf, message_start[level_rows])
+            template[level_rows] = np.where(local >= 0, first + local, -1)
+            for local_id, (prefix, plan) in enumerate(plans):
+                if not plan:
+                    continue
+                template_rows = level_rows[local == local_id]
+                position = message_start[template_rows] + len(prefix)
+                for field, gap in plan:
+                    position = position + gap
+                    values, scale, lengths = _parse_numbers(buf, position, NUMBER_WIDTH, decimals=field == 'amount')
+                    if field == 'txn_id':
+                        txn_id[template_rows] = np.where(lengths > 0, values, -1)
+                    elif field == 'amount':
+                        amount[template_rows] = np.where(lengths > 0, values / 10.0 ** scale, np.nan)
+                    position = position + lengths
+
+        columns = {
+            'timestamp': timestamp.astype('datetime64[ms]'),
+            'level': level.astype(np.int8),
+            'service': service.astype(np.int8),
+            'template': template,
+            'txn_id': txn_id,
+            'amount': amount
+        }
+        return columns, blank_or_short + len(ok) - n
+
+def iter_blocks(path, block_bytes=BLOCK_BYTES):
+    """Chunks of whole lines from a file, about block_bytes each"""
+    with open(path, 'rb', buffering=0) as f:
+        rest = b''
+        while True:
+            data = f.read(block_bytes)
+            if not data:
+                break
+            data = rest + data
+            cut = data.rfind(b'\n') + 1
+            if cut == 0:
+                rest = data
+                continue
+            rest = data[cut:]
+            yield data[:cut]
+        if rest:
+            yield rest
+
+def parse_files(paths, block_bytes=BLOCK_BYTES, parser=None):
+    """
+    Parse log files into one set of columns
+
+    Returns:
+        (dict of column arrays, number of lines that did not parse)
+    """
+    parser = parser or LogParser()
+    parts, invalid = [], 0
+    for path in paths:
+        for block in iter_blocks(path, block_bytes):
+            columns, bad = parser.parse_block(block)
+            parts.append(columns)
+            invalid += bad
+    if not parts:
+        return parser.parse_block(b'')
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}, invalid
+
+def to_dataframe(columns):
+    """DataFrame of parsed columns with level/service/template names as categoricals"""
+    template_names = [template for _, template in TEMPLATES]
+    return pd.DataFrame({
+        'timestamp': columns['timestamp'],
+        'level': pd.Categorical.from_codes(columns['level'], LEVELS),
+        'service': pd.Categorical.from_codes(columns['service'], SERVICES),
+        'template': pd.Categorical.from_codes(columns['template'], template_names),
+        'txn_id': columns['txn_id'],
+        'amount': columns['amount']
+    })
+
+LINE_RE = re.compile(r'^(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d\.\d{3}) \[(\w+)\] \[(\w+)\] (.*)$')
+
+def _template_regex(template):
+    pattern = ''
+    for literal, field, _, _ in string.Formatter().parse(template):
+        pattern += re.escape(literal)
+        if field is not None:
+            pattern += rf'(?P<{field}>\d+(?:\.\d+)?)' if field in NUMERIC_FIELDS else f'(?P<{field}>.+?)'
+    return re.compile(pattern + '$')
+
+def parse_lines_regex(lines):
+    """Reference parser: one regex per line, then each of the level's template regexes"""
+    regexes = [(level, _template_regex(template)) for level, template in TEMPLATES]
+    rows = []
+    for line in lines:
+        match = LINE_RE.match(line.rstrip('\n'))
+        if not match:
+            continue
+        stamp, level, service, message = match.groups()
+        template, txn_id, amount = -1, -1, float('nan')
+        for template_id, (template_level, regex) in enumerate(regexes):
+            if template_level != level:
+                continue
+            fields = regex.match(message)
+            if fields:
+                template = template_id
+                txn_id = int(fields.groupdict().get('txn_id') or -1)
+                amount = float(fields.groupdict().get('amount') or 'nan')
+                break
+        rows.append((datetime.strptime(stamp, '%Y-%m-%d %H:%M:%S.%f'), level, service, template, txn_id, amount))
+    return rows
+
+def benchmark(lines=2_000_000, csv_file=None, block_bytes=BLOCK_BYTES, reference_lines=100_000):
+    """Time the columnar parser on generated lines and check it against the regex reference"""
+    if not csv_file:
+        data_dir = Path("/shared-data") if os.path.exists("/shared-data") else Path("shared-data")
+        csv_file = data_dir / "Online Sales Data.csv"
+    fields = prepare_row_fields(pd.read_csv(csv_file))
+    rng = np.random.default_rng(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.log')
+        print(f"📝 Generating {lines:,} lines...")
+        with open(path, 'w') as f:
+            for start in range(0, lines, 500_000):
+                f.write(format_log_block(fields, min(500_000, lines - start), datetime(2025, 11, 5), rng))
+        size_mb = os.path.getsize(path) / 1024 ** 2
+
+        parser = LogParser()
+        parse_files([path], block_bytes, parser)  # Warm the page cache
+        start = time.perf_counter()
+        columns, invalid = parse_files([path], block_bytes, parser)
+        elapsed = time.perf_counter() - start
+
+        with open(path) as f:
+            sample = [next(f) for _ in range(min(reference_lines, lines))]
+        start = time.perf_counter()
+        reference = parse_lines_regex(sample)
+        reference_elapsed = time.perf_counter() - start
+
+    n = len(columns['timestamp'])
+    print(f"\n{'='*60}")
+    print("BENCHMARK")
+    print('='*60)
+    print(f"Columnar:  {n:,} lines ({size_mb:,.0f} MB) in {elapsed:.2f}s → "
+          f"{n / elapsed / 1e6:.2f}M lines/s, {size_mb / elapsed:,.0f} MB/s ({invalid} unparsed)")
+    print(f"Regex:     {len(sample):,} lines in {reference_elapsed:.2f}s → "
+          f"{len(sample) / reference_elapsed / 1e6:.2f}M lines/s")
+    print(f"Speedup:   {(n / elapsed) / (len(sample) / reference_elapsed):.0f}x")
+
+    m = len(reference)
+    expected = pd.DataFrame(reference, columns=['timestamp', 'level', 'service', 'template', 'txn_id', 'amount'])
+    actual = to_dataframe({name: values[:m] for name, values in columns.items()})
+    mismatches = sum(int((actual[c].astype(str) != expected[c].astype(str)).sum())
+                     for c in ['level', 'service', 'txn_id'])
+    mismatches += int((actual['template'].cat.codes.to_numpy() != expected['template'].to_numpy()).sum())
+    mismatches += int((actual['timestamp'].to_numpy() != expected['timestamp'].to_numpy().astype('datetime64[ms]')).sum())
+    mismatches += int((~np.isclose(actual['amount'], expected['amount'], equal_nan=True)).sum())
+    print(f"{'✅' if not mismatches else '❌'} {m:,} lines checked against the regex parser: {mismatches} mismatches")
+
+def main():
+    parser = argparse.ArgumentParser(description='Parse application logs into columns')
+    parser.add_argument('paths', nargs='*', help='Log files or globs (default: logs/incoming/*.log)')
+    parser.add_argument('--output', help='Write the columns to this Parquet file')
+    parser.add_argument('--block-mb', type=float, default=BLOCK_BYTES / 1024 ** 2,
+                        help=f'Bytes read and parsed at once, in MB (default: {BLOCK_BYTES // 1024 ** 2})')
+    parser.add_argument('--benchmark', type=int, nargs='?', const=2_000_000, metavar='LINES',
+                        help='Time the parser on generated lines (default: 2,000,000) and verify it')
+    parser.add_argument('--csv', help='Transactions CSV for --benchmark lines (default: shared-data/Online Sales Data.csv)')
+    args = parser.parse_args()
+    block_bytes = int(args.block_mb * 1024 ** 2)
+
+    print("╔════════════════════════════════════════════════════════════╗")
+    print("║          Application Log Parser                            ║")
+    print("╚════════════════════════════════════════════════════════════╝\n")
+
+    if args.benchmark:
+        benchmark(args.benchmark, args.csv, block_bytes)
+        return
+
+    paths = sorted({p for pattern in (args.paths or ['logs/incoming/*.log']) for p in glob.glob(pattern)})
+    if not paths:
+        print("❌ No log files found")
+        return
+    start = time.perf_counter()
+    columns, invalid = parse_files(paths, block_bytes)
+    elapsed = time.perf_counter() - start
+    df = to_dataframe(columns)
+
+    print(f"✅ Parsed {len(df):,} lines from {len(paths)} file(s) in {elapsed:.3f}s "
+          f"({len(df) / max(elapsed, 1e-9):,.0f} lines/s); {invalid:,} unparsed")
+    if df.empty:
+        return
+    print(f"🕐 {df['timestamp'].min()} → {df['timestamp'].max()}")
+    print(f"\n{'='*60}")
+    print("LEVELS / SERVICES")
+    print('='*60)
+    print(df['level'].value_counts().to_string())
+    print(df['service'].value_counts().to_string())
+    print(f"\n{'='*60}")
+    print("TEMPLATES")
+    print('='*60)
+    counts = df['template'].value_counts()
+    for template, count in counts.items():
+        print(f"{count:>10,}  {template}")
+    print(f"{int(df['template'].isna().sum()):>10,}  (no known template)")
+    print(f"\n🔗 {int((df['txn_id'] >= 0).sum()):,} lines reference {df.loc[df['txn_id'] >= 0, 'txn_id'].nunique():,} transactions; "
+          f"amounts on {int(df['amount'].notna().sum()):,} lines total ${df['amount'].sum():,.2f}")
+
+    if args.output:
+        df.to_parquet(args.output, index=False)
+        print(f"💾 Columns written to {args.output}")
+
+if __name__ == "__main__":
+    main()
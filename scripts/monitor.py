@@ -2,13 +2,28 @@
 """
 Pipeline Monitor - Phase 8.1
 Real-time monitoring dashboard for the Big Data pipeline
+
+Consumer lag (end offset - committed offset per group and partition) comes
+from the Kafka admin client: one batched committed-offset fetch for all
+groups and one end-offset lookup per cycle. Produce and consume rates are
+the offset deltas between cycles, so a growing backlog shows at once.
 """
 
+import argparse
 import subprocess
 import time
 import os
 from datetime import datetime
 
+from kafka import KafkaAdminClient, KafkaConsumer
+from kafka.structs import TopicPartition
+
+try:
+    from kafka.admin import OffsetSpec
+except ImportError:
+    # kafka-python 2.x: no batched offset APIs on the admin client
+    OffsetSpec = None
+
 def run_command(command):
     """Execute shell command and return output"""
     try:
@@ -51,7 +66,136 @@ def get_hdfs_directories():
     result = run_command(cmd)
     return result
 
-def monitor_pipeline():
+class LagTracker:
+    """
+    Consumer lag per group and partition, and offset rates between samples
+
+    Args:
+        bootstrap_servers: Kafka brokers
+        groups: Consumer groups to watch (default: every consumer group)
+        topic_prefix: Topics whose produce rate is shown even with no consumer
+    """
+
+    def __init__(self, bootstrap_servers='localhost:9092', groups=None, topic_prefix='ecommerce'):
+        self.bootstrap_servers = bootstrap_servers
+        self.groups = groups
+        self.topic_prefix = topic_prefix
+        self.admin = None
+        self.consumer = None
+        self.partitions = None
+        self.previous = None
+
+    def connect(self):
+        if self.admin is None:
+            self.admin = KafkaAdminClient(bootstrap_servers=self.bootstrap_servers, request_timeout_ms=5000)
+            # Group-less consumer for topic metadata (and end offsets on kafka-python 2.x)
+            self.consumer = KafkaConsumer(bootstrap_servers=self.bootstrap_servers)
+        if self.partitions is None:
+            # Partition list of the watched topics, looked up once
+            self.partitions = {TopicPartition(topic, partition)
+                               for topic in self.consumer.topics() if topic.startswith(self.topic_prefix)
+                               for partition in self.consumer.partitions_for_topic(topic) or ()}
+
+    def _groups(self):
+        """Ids of the consumer groups known to the cluster"""
+        if OffsetSpec is not None:
+            groups = ((g['group_id'], g.get('protocol_type')) for g in self.admin.list_groups())
+        else:
+            # kafka-python 2.x: (group_id, protocol_type) tuples
+            groups = self.admin.list_consumer_groups()
+        return sorted(group for group, protocol in groups if protocol in ('consumer', ''))
+
+    def _committed(self, groups):
+        """{group: {TopicPartition: offset}} in one OffsetFetch for all groups (per coordinator)"""
+        if OffsetSpec is not None:
+            offsets = self.admin.list_group_offsets(groups)
+        else:
+            offsets = {group: self.admin.list_consumer_group_offsets(group) for group in groups}
+        return {group: {tp: meta.offset for tp, meta in tps.items() if meta.offset >= 0}
+                for group, tps in offsets.items()}
+
+    def _end_offsets(self, partitions):
+        """{TopicPartition: log end offset} in one ListOffsets per partition leader"""
+        if OffsetSpec is not None:
+            offsets = self.admin.list_partition_offsets({tp: OffsetSpec.LATEST for tp in partitions})
+            return {tp: result.offset for tp, result in offsets.items()}
+        return self.consumer.end_offsets(list(partitions))
+
+    def sample(self):
+        """
+        Lag and rates since the previous sample
+
+        Returns:
+            dict with 'topics' {topic: (end offset total, produce msg/s or None)}
+            and 'groups' {group: {'partitions': [(tp, committed, end, lag)],
+            'lag': total, 'consume_rate': msg/s or None, 'lag_rate': lag change/s or None}}
+        """
+        self.connect()
+        now = time.monotonic()
+        groups = self.groups or self._groups()
+        committed = self._committed(groups) if groups else {}
+        partitions = self.partitions | {tp for offsets in committed.values() for tp in offsets}
+        end = self._end_offsets(partitions) if partitions else {}
+
+        previous = self.previous
+        elapsed = now - previous['time'] if previous else None
+        topics = {}
+        for tp, offset in end.items():
+            topics[tp.topic] = topics.get(tp.topic, 0) + offset
+        report = {'topics': {}, 'groups': {}}
+        for topic, total in sorted(topics.items()):
+            before = previous['topics'].get(topic) if previous else None
+            report['topics'][topic] = (total, (total - before) / elapsed if before is not None else None)
+        for group in groups:
+            offsets = committed.get(group, {})
+            rows = [(tp, offset, end[tp], max(end[tp] - offset, 0))
+                    for tp, offset in sorted(offsets.items()) if tp in end]
+            lag = sum(row[3] for row in rows)
+            consumed = sum(offsets.values())
+            before = previous['groups'].get(group) if previous else None
+            report['groups'][group] = {
+                'partitions': rows,
+                'lag': lag,
+                'consume_rate': (consumed - before[0]) / elapsed if before else None,
+                'lag_rate': (lag - before[1]) / elapsed if before else None
+            }
+        self.previous = {'time': now, 'topics': topics,
+                         'groups': {g: (sum(committed.get(g, {}).values()), r['lag'])
+                                    for g, r in report['groups'].items()}}
+        return report
+
+    def close(self):
+        if self.consumer:
+            self.consumer.close()
+        if self.admin:
+            self.admin.close()
+
+def _rate(value):
+    return f"{value:,.1f}/s" if value is not None else "-"
+
+def print_consumer_lag(tracker):
+    """Consumer lag section: produce rate per topic, lag and consume rate per group"""
+    try:
+        report = tracker.sample()
+    except Exception as e:
+        # Reconnect next cycle
+        tracker.close()
+        tracker.admin = tracker.consumer = tracker.partitions = None
+        print(f"❌ Could not read offsets: {e}")
+        return
+    for topic, (total, rate) in report['topics'].items():
+        print(f"📥 {topic:<32} produced {_rate(rate):>12}  ({total:,} messages)")
+    if not report['groups']:
+        print("No consumer groups with committed offsets")
+    for group, info in report['groups'].items():
+        trend = ""
+        if info['lag_rate'] is not None and info['lag_rate'] > 0:
+            trend = f"  ⚠️  growing {_rate(info['lag_rate'])}"
+        print(f"👥 {group:<32} consumed {_rate(info['consume_rate']):>12}  lag {info['lag']:,}{trend}")
+        for tp, committed, end, lag in info['partitions']:
+            print(f"    {tp.topic}[{tp.partition}]  committed {committed:,}  end {end:,}  lag {lag:,}")
+
+def monitor_pipeline(interval=5, lag_tracker=None):
     """Main monitoring loop"""
     
     print("Starting Pipeline Monitor...")
@@ -103,6 +247,14 @@ def monitor_pipeline():
                 print("No e-commerce topics found")
             print("")
             
+            # Consumer Lag
+            if lag_tracker:
+                print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+                print("KAFKA CONSUMER LAG")
+                print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+                print_consumer_lag(lag_tracker)
+                print("")
+            
             # HDFS Status
             print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
             print("HDFS DATA LAKE")
@@ -139,14 +291,29 @@ def monitor_pipeline():
             
             print("")
             print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
-            print("Refreshing in 5 seconds... (Press Ctrl+C to exit)")
+            print(f"Refreshing in {interval:g} seconds... (Press Ctrl+C to exit)")
             print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
             
-            time.sleep(5)
+            time.sleep(interval)
             
     except KeyboardInterrupt:
         print("\n\n👋 Monitor stopped by user")
         print("✅ Pipeline monitoring ended\n")
+    finally:
+        if lag_tracker:
+            lag_tracker.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Live monitor for the Big Data pipeline')
+    parser.add_argument('--interval', type=float, default=5, help='Seconds between refreshes (default: 5)')
+    parser.add_argument('--group', action='append',
+                        help='Consumer group to show lag for, e.g. flume-consumer-group; repeatable (default: all)')
+    parser.add_argument('--no-lag', action='store_true', help='Skip the consumer lag section')
+    parser.add_argument('--bootstrap-servers', default='localhost:9092', help='Kafka brokers (default: localhost:9092)')
+    args = parser.parse_args()
+
+    lag_tracker = None if args.no_lag else LagTracker(args.bootstrap_servers, args.group)
+    monitor_pipeline(args.interval, lag_tracker)
 
 if __name__ == "__main__":
-    monitor_pipeline()
+    main()
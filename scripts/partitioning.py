@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Transaction Partitioning
+Message keys for transaction events and partition-skew reporting
+
+Kafka's default partitioner hashes the message key (murmur2), so every
+event with the same key lands on the same partition. Keying by region or
+product category lets a consumer-group member keep that key's state in
+local memory; keying by transaction_id spreads load evenly with no locality.
+"""
+
+from collections import Counter
+
+KEY_STRATEGIES = ['none', 'region', 'product_category', 'transaction_id']
+
+# Record fields that hold each key, in order of preference. RealtimeStreamer
+# events name the category field 'category'; CSV replay events 'product_category'.
+KEY_FIELDS = {
+    'region': ('region',),
+    'product_category': ('product_category', 'category'),
+    'transaction_id': ('transaction_id',)
+}
+
+def record_key(record, strategy):
+    """
+    Message key for a transaction event
+
+    Returns:
+        The key as a string, or None for strategy 'none' (round-robin/sticky partitioning)
+    """
+    if not strategy or strategy == 'none':
+        return None
+    if strategy not in KEY_FIELDS:
+        raise ValueError(f"Unknown key strategy '{strategy}' (choose from {', '.join(KEY_STRATEGIES)})")
+    for field in KEY_FIELDS[strategy]:
+        if field in record:
+            return str(record[field])
+    raise KeyError(f"Record has no field for key strategy '{strategy}'")
+
+def encode_key(key):
+    """Producer key_serializer; unkeyed sends pass None through"""
+    return key.encode('utf-8') if key is not None else None
+
+class PartitionStats:
+    """
+    Record counts per partition, and per key within each partition
+
+    Per-key counts are only worth keeping for low-cardinality keys; with
+    track_keys=False (e.g. transaction_id keys) only partition totals are kept.
+    """
+
+    def __init__(self, track_keys=True):
+        self.track_keys = track_keys
+        self.partitions = Counter()
+        self.keys = {}
+
+    def record(self, partition, key=None):
+        self.partitions[partition] += 1
+        if key is not None and self.track_keys:
+            self.keys.setdefault(partition, Counter())[key] += 1
+
+    def merge(self, other):
+        """Add the counts of another PartitionStats (e.g. from a worker process)"""
+        self.partitions.update(other.partitions)
+        for partition, keys in other.keys.items():
+            self.keys.setdefault(partition, Counter()).update(keys)
+        return self
+
+    def skew(self, num_partitions=None):
+        """Largest partition's share relative to a perfectly even spread (1.0 = even)"""
+        num_partitions = num_partitions or len(self.partitions)
+        total = sum(self.partitions.values())
+        if not total or not num_partitions:
+            return 0.0
+        return max(self.partitions.values()) / (total / num_partitions)
+
+    def report(self, num_partitions=None):
+        """Lines describing the partition spread, for printing or logging"""
+        partitions = sorted(set(self.partitions) | set(range(num_partitions or 0)))
+        total = sum(self.partitions.values())
+        lines = []
+        for partition in partitions:
+            count = self.partitions[partition]
+            share = count / total * 100 if total else 0
+            line = f"  partition {partition}: {count:,} records ({share:.1f}%)"
+            keys = self.keys.get(partition)
+            if keys:
+                top = ', '.join(f"{k} ({n:,})" for k, n in keys.most_common(3))
+                more = f" +{len(keys) - 3} more" if len(keys) > 3 else ""
+                line += f" - {len(keys):,} key{'s' if len(keys) != 1 else ''}: {top}{more}"
+            lines.append(line)
+        lines.append(f"  skew (max / mean): {self.skew(len(partitions)):.2f}")
+        return lines
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Dataset Profile Cache
+Shares DatasetProfiles between the setup stages so the source CSVs are scanned once
+
+Each cached profile is keyed by the file's path and stored together with a
+fingerprint (size, mtime and a hash of the first and last bytes). On lookup:
+  hit     - fingerprint unchanged, the cached profile is returned as is
+  append  - the old content is an unchanged prefix of the file, so only the
+            new tail is profiled and merged into the cached profile
+  miss    - anything else, the whole file is profiled again
+"""
+
+import hashlib
+import os
+import pickle
+from pathlib import Path
+
+from dataset_profile import profile_csv
+
+CACHE_VERSION = 1
+FINGERPRINT_BYTES = 64 * 1024
+
+def default_cache_dir():
+    """Hidden cache directory next to the datasets"""
+    data_dir = Path("/shared-data") if os.path.exists("/shared-data") else Path("shared-data")
+    return data_dir / ".profile_cache"
+
+def _hash_range(f, start, end):
+    f.seek(start)
+    return hashlib.sha1(f.read(end - start)).hexdigest()
+
+def fingerprint(path):
+    """Size, mtime and head/tail content hashes of a file"""
+    stat = os.stat(path)
+    size = stat.st_size
+    with open(path, 'rb') as f:
+        head_end = min(FINGERPRINT_BYTES, size)
+        tail_start = max(size - FINGERPRINT_BYTES, 0)
+        f.seek(max(size - 1, 0))
+        last_byte = f.read(1)
+        return {
+            'size': size,
+            'mtime': stat.st_mtime,
+            'head_hash': _hash_range(f, 0, head_end),
+            'tail_hash': _hash_range(f, tail_start, size),
+            'ends_with_newline': last_byte == b'\n'
+        }
+
+def _is_append(path, old, new):
+    """True if the file only grew past the previously profiled content"""
+    if new['size'] <= old['size'] or not old['ends_with_newline']:
+        return False
+    with open(path, 'rb') as f:
+        if old['size'] >= FINGERPRINT_BYTES and _hash_range(f, 0, FINGERPRINT_BYTES) != old['head_hash']:
+            return False
+        old_tail_start = max(old['size'] - FINGERPRINT_BYTES, 0)
+        return _hash_range(f, old_tail_start, old['size']) == old['tail_hash']
+
+def _entry_path(path, cache_dir):
+    key = hashlib.sha1(str(Path(path).resolve()).encode('utf-8')).hexdigest()
+    return Path(cache_dir) / f"{key}.pkl"
+
+def _load_entry(entry_path):
+    try:
+        with open(entry_path, 'rb') as f:
+            entry = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    return entry if entry.get('version') == CACHE_VERSION else None
+
+def _save_entry(entry_path, entry):
+    entry_path.parent.mkdir(parents=True, exist_ok=True)
+    # Write then rename so a concurrent reader never sees a partial entry
+    tmp_path = entry_path.with_suffix('.tmp')
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, entry_path)
+
+def load_profile(path, workers=None, cache_dir=None):
+    """
+    Return the profile of a CSV file, reusing or extending a cached one
+
+    Args:
+        path: CSV file
+        workers: Profiler worker processes for any bytes that must be scanned
+        cache_dir: Cache directory (default: shared-data/.profile_cache)
+
+    Returns:
+        (DatasetProfile, status) where status is 'hit', 'append' or 'miss'
+    """
+    cache_dir = cache_dir or default_cache_dir()
+    entry_path = _entry_path(path, cache_dir)
+    current = fingerprint(path)
+    entry = _load_entry(entry_path)
+
+    if entry and entry['fingerprint'] == current:
+        return entry['profile'], 'hit'
+
+    if entry and _is_append(path, entry['fingerprint'], current):
+        profile = entry['profile']
+        profile.merge(profile_csv(path, workers=workers, start=entry['fingerprint']['size']))
+        status = 'append'
+    else:
+        profile = profile_csv(path, workers=workers)
+        status = 'miss'
+
+    try:
+        _save_entry(entry_path, {'version': CACHE_VERSION, 'fingerprint': current, 'profile': profile})
+    except OSError:
+        pass  # A read-only data directory just means no caching
+    return profile, status
+
+def describe_status(status):
+    """One-line progress message for a cache lookup"""
+    return {
+        'hit': "♻️  Using cached profile (file unchanged)",
+        'append': "♻️  Cached profile extended with newly appended rows",
+        'miss': "✓ Profiled full file and cached the result"
+    }[status]
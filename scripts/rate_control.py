@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Rate Control
+Token bucket and rate schedules for reproducible load against Kafka/MySQL
+"""
+
+import time
+
+class TokenBucket:
+    """
+    Token bucket limiter
+
+    Tokens refill continuously at `rate` per second up to `burst`. Refill is
+    computed from the monotonic clock, so time spent sending counts towards
+    the next token and the long-run rate does not drift with broker latency.
+    The bucket starts empty, so a run never opens with an unpaced burst.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1.0, rate / 10))
+        if self.burst < 1:
+            # Tokens could never reach 1, so acquire() would sleep forever
+            raise ValueError(f"burst must be at least 1 (got {burst})")
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def set_rate(self, rate):
+        """Change the refill rate, keeping tokens earned so far"""
+        self._refill(time.monotonic())
+        self.rate = float(rate)
+
+    def acquire(self, n=1, timeout=None):
+        """
+        Take n tokens, sleeping until they are available
+
+        Returns False if they could not be taken within `timeout` seconds
+        (always the case while the rate is 0), True otherwise.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            now = time.monotonic()
+            self._refill(now)
+            if self.tokens >= n:
+                self.tokens -= n
+                return True
+            wait = (n - self.tokens) / self.rate if self.rate > 0 else 0.05
+            if deadline is not None:
+                if now >= deadline:
+                    return False
+                wait = min(wait, deadline - now)
+            time.sleep(wait)
+
+class RateSchedule:
+    """
+    Piecewise-linear rate over time
+
+    Spec format: "t0:rate0,t1:rate1,..." with t in seconds from the start,
+    e.g. "0:100,60:5000,300:5000" ramps from 100 to 5000 msgs/sec over the
+    first minute and holds. The last rate is held after the last point.
+    """
+
+    def __init__(self, points):
+        self.points = sorted((float(t), float(r)) for t, r in points)
+        if not self.points:
+            raise ValueError("A rate schedule needs at least one point")
+
+    @classmethod
+    def parse(cls, spec):
+        points = []
+        for part in spec.split(','):
+            t, _, r = part.strip().partition(':')
+            if not r:
+                raise ValueError(f"Bad schedule point '{part}' (expected seconds:rate)")
+            points.append((t, r))
+        return cls(points)
+
+    def rate_at(self, elapsed):
+        points = self.points
+        if elapsed <= points[0][0]:
+            return points[0][1]
+        for (t0, r0), (t1, r1) in zip(points, points[1:]):
+            if elapsed < t1:
+                return r0 + (r1 - r0) * (elapsed - t0) / (t1 - t0)
+        return points[-1][1]
+
+    def duration(self):
+        return self.points[-1][0]
@@ -6,12 +6,18 @@ Continuously generates and streams data to Kafka for real-time dashboard updates
 import pandas as pd
 import mysql.connector
 from kafka import KafkaProducer
-import json
 import time
 import random
+import argparse
+import threading
 from datetime import datetime, timedelta
 import logging
 
+from partitioning import KEY_STRATEGIES, PartitionStats, record_key, encode_key
+from serializers import SERIALIZERS, get_serializer
+from id_allocator import BlockIdAllocator, DEFAULT_BLOCK_SIZE, FIRST_ID
+from tracing import Tracer
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -36,29 +42,95 @@ PRODUCTS = [
 REGIONS = ["North", "South", "East", "West", "Central"]
 PAYMENT_METHODS = ["Credit Card", "Debit Card", "PayPal", "Cash"]
 
+MYSQL_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': 'rootpassword',
+    'database': 'testdb'
+}
+
+INSERT_SQL = """
+    INSERT INTO transactions 
+    (transaction_id, product_name, product_category, units_sold, unit_price, 
+     total_revenue, payment_method, region, date)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+# Seconds between throughput/latency log lines in micro-batch mode
+REPORT_INTERVAL = 5.0
+
+# Lease attempts (and seconds between them) once IDs have been leased from MySQL
+LEASE_RETRIES = 3
+LEASE_RETRY_DELAY = 1.0
+
+def mysql_row(transaction):
+    """Values for INSERT_SQL from a generated transaction"""
+    return (
+        transaction['transaction_id'],
+        transaction['product_name'],
+        transaction['category'],  # Maps to product_category
+        transaction['quantity'],   # Maps to units_sold
+        transaction['unit_price'],
+        transaction['total_amount'], # Maps to total_revenue
+        transaction['payment_method'],
+        transaction['region'],
+        transaction['timestamp'].split()[0]  # Extract date from timestamp
+    )
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q / 100 * len(sorted_values)))]
+
 class RealtimeStreamer:
-    def __init__(self):
+    def __init__(self, key_by=None, serializer='json', first_transaction_id=None, mix=None,
+                 id_block_size=DEFAULT_BLOCK_SIZE, tracer=None):
         self.kafka_producer = None
+        self.serializer = serializer
         self.mysql_conn = None
-        self.transaction_id = self.get_last_transaction_id() + 1
+        # Message key strategy (see partitioning.py); None sends unkeyed
+        self.key_by = key_by if key_by != 'none' else None
+        self.partition_stats = PartitionStats(track_keys=self.key_by in ('region', 'product_category'))
+        # Updated from the producer's network thread in micro-batch mode
+        self.kafka_lock = threading.Lock()
+        self.kafka_acked = 0
+        self.kafka_failed = 0
+        # IDs come from blocks leased from MySQL (see id_allocator.py), so any
+        # number of streamers can run at once; a fixed first ID skips MySQL
+        self.transaction_id = first_transaction_id
+        self.id_allocator = None if first_transaction_id else BlockIdAllocator(self._connect, block_size=id_block_size)
+        # Optional weights for products/regions/payment methods: {'products': [...], 'regions': [...], 'payment_methods': [...]}
+        self.mix = mix or {}
+        # Optional end-to-end latency tracing (see tracing.py)
+        self.tracer = tracer
         
-    def get_last_transaction_id(self):
-        """Get the last transaction ID from MySQL"""
-        try:
-            conn = mysql.connector.connect(
-                host='localhost',
-                user='root',
-                password='rootpassword',
-                database='testdb'
-            )
-            cursor = conn.cursor()
-            cursor.execute("SELECT MAX(transaction_id) FROM transactions")
-            result = cursor.fetchone()
-            conn.close()
-            return int(result[0]) if result[0] is not None else 1000
-        except Exception as e:
-            logger.warning(f"Could not get last transaction ID: {e}")
-            return 1000
+    @staticmethod
+    def _connect():
+        return mysql.connector.connect(**MYSQL_CONFIG)
+    
+    def next_transaction_id(self):
+        """Next unique transaction ID"""
+        if self.id_allocator:
+            for attempt in range(LEASE_RETRIES):
+                try:
+                    return self.id_allocator.next_id()
+                except Exception as e:
+                    if self.id_allocator.leases:
+                        # IDs below the sequence are taken: never rewind, retry the lease (it reconnects) or give up
+                        logger.warning(f"Could not lease transaction IDs (attempt {attempt + 1}/{LEASE_RETRIES}): {e}")
+                        if attempt == LEASE_RETRIES - 1:
+                            raise
+                        time.sleep(LEASE_RETRY_DELAY)
+                        continue
+                    logger.warning(f"Could not lease transaction IDs: {e}")
+                    # MySQL unreachable from the start: fall back to a local counter, as before the allocator existed
+                    self.id_allocator = None
+                    self.transaction_id = FIRST_ID
+                    break
+        transaction_id = self.transaction_id
+        self.transaction_id += 1
+        return transaction_id
     
     def connect_kafka(self):
         """Initialize Kafka producer with retry logic"""
@@ -70,7 +142,8 @@ class RealtimeStreamer:
                 logger.info(f"Connecting to Kafka (attempt {attempt + 1}/{max_retries})...")
                 self.kafka_producer = KafkaProducer(
                     bootstrap_servers=['localhost:9092'],
-                    value_serializer=lambda v: json.dumps(v).encode('utf-8'),
+                    value_serializer=get_serializer(self.serializer),
+                    key_serializer=encode_key,
                     acks='all',
                     retries=3,
                     request_timeout_ms=30000,
@@ -89,12 +162,7 @@ class RealtimeStreamer:
     def connect_mysql(self):
         """Initialize MySQL connection"""
         try:
-            self.mysql_conn = mysql.connector.connect(
-                host='localhost',
-                user='root',
-                password='rootpassword',
-                database='testdb'
-            )
+            self.mysql_conn = self._connect()
             logger.info("✅ Connected to MySQL")
             return True
         except Exception as e:
@@ -103,32 +171,41 @@ class RealtimeStreamer:
     
     def generate_transaction(self):
         """Generate a realistic transaction"""
-        product = random.choice(PRODUCTS)
+        product = self._choose(PRODUCTS, 'products')
         quantity = random.randint(1, 5)
         unit_price = round(random.uniform(*product["price_range"]), 2)
         total_amount = round(quantity * unit_price, 2)
         
         transaction = {
-            "transaction_id": self.transaction_id,
+            "transaction_id": self.next_transaction_id(),
             "product_name": product["name"],
             "category": product["category"],
             "quantity": quantity,
             "unit_price": unit_price,
             "total_amount": total_amount,
-            "payment_method": random.choice(PAYMENT_METHODS),
-            "region": random.choice(REGIONS),
+            "payment_method": self._choose(PAYMENT_METHODS, 'payment_methods'),
+            "region": self._choose(REGIONS, 'regions'),
             "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
+        if self.tracer:
+            self.tracer.start(transaction)
         
-        self.transaction_id += 1
         return transaction
     
+    def _choose(self, options, mix_name):
+        weights = self.mix.get(mix_name)
+        return random.choices(options, weights=weights)[0] if weights else random.choice(options)
+    
     def send_to_kafka(self, transaction):
         """Send transaction to Kafka"""
         try:
-            future = self.kafka_producer.send('ecommerce-transactions', transaction)
-            future.get(timeout=10)
-            logger.info(f"📤 Sent to Kafka: Transaction #{transaction['transaction_id']}")
+            key = record_key(transaction, self.key_by)
+            future = self.kafka_producer.send('ecommerce-transactions', transaction, key=key)
+            metadata = future.get(timeout=10)
+            self.partition_stats.record(metadata.partition, key)
+            if self.tracer:
+                self.tracer.record('kafka_ack', transaction)
+            logger.info(f"📤 Sent to Kafka: Transaction #{transaction['transaction_id']} (partition {metadata.partition})")
             return True
         except Exception as e:
             logger.error(f"❌ Failed to send to Kafka: {e}")
@@ -138,25 +215,10 @@ class RealtimeStreamer:
         """Save transaction to MySQL"""
         try:
             cursor = self.mysql_conn.cursor()
-            sql = """
-                INSERT INTO transactions 
-                (transaction_id, product_name, product_category, units_sold, unit_price, 
-                 total_revenue, payment_method, region, date)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            values = (
-                transaction['transaction_id'],
-                transaction['product_name'],
-                transaction['category'],  # Maps to product_category
-                transaction['quantity'],   # Maps to units_sold
-                transaction['unit_price'],
-                transaction['total_amount'], # Maps to total_revenue
-                transaction['payment_method'],
-                transaction['region'],
-                transaction['timestamp'].split()[0]  # Extract date from timestamp
-            )
-            cursor.execute(sql, values)
+            cursor.execute(INSERT_SQL, mysql_row(transaction))
             self.mysql_conn.commit()
+            if self.tracer:
+                self.tracer.record('mysql_commit', transaction)
             logger.info(f"💾 Saved to MySQL: Transaction #{transaction['transaction_id']}")
             return True
         except Exception as e:
@@ -164,6 +226,127 @@ class RealtimeStreamer:
             self.mysql_conn.rollback()
             return False
     
+    def _on_kafka_ack(self, key, metadata):
+        with self.kafka_lock:
+            self.kafka_acked += 1
+            self.partition_stats.record(metadata.partition, key)
+    
+    def _on_kafka_trace(self, transaction, metadata):
+        self.tracer.record('kafka_ack', transaction)
+    
+    def _on_kafka_error(self, transaction_id, exc):
+        with self.kafka_lock:
+            self.kafka_failed += 1
+        logger.error(f"❌ Kafka delivery failed for transaction #{transaction_id}: {exc}")
+    
+    def send_batch_to_kafka(self, transactions):
+        """Queue a batch on the producer without waiting for acks (counted in callbacks)"""
+        try:
+            for transaction in transactions:
+                key = record_key(transaction, self.key_by)
+                future = self.kafka_producer.send('ecommerce-transactions', transaction, key=key)
+                future.add_callback(self._on_kafka_ack, key)
+                if self.tracer and 'trace_id' in transaction:
+                    future.add_callback(self._on_kafka_trace, transaction)
+                future.add_errback(self._on_kafka_error, transaction['transaction_id'])
+            return True
+        except Exception as e:
+            logger.error(f"❌ Failed to send batch to Kafka: {e}")
+            return False
+    
+    def save_batch_to_mysql(self, transactions):
+        """Save a batch with one multi-row INSERT and one commit"""
+        try:
+            cursor = self.mysql_conn.cursor()
+            # mysql-connector rewrites executemany() of an INSERT ... VALUES into a single multi-row statement
+            cursor.executemany(INSERT_SQL, [mysql_row(t) for t in transactions])
+            self.mysql_conn.commit()
+            if self.tracer:
+                self.tracer.record_batch('mysql_commit', transactions)
+            return True
+        except Exception as e:
+            logger.error(f"❌ Failed to save batch of {len(transactions)} to MySQL: {e}")
+            self.mysql_conn.rollback()
+            return False
+    
+    def stream_batches(self, batch_size=500, batch_ms=100, interval=0, duration=None):
+        """
+        Stream data in micro-batches
+        
+        Transactions are collected until batch_size records or batch_ms
+        milliseconds, then sent to Kafka without blocking and written to
+        MySQL with one multi-row INSERT and one commit. Kafka acks arrive in
+        callbacks and are only waited for at shutdown (flush).
+        
+        Args:
+            batch_size: Most transactions per batch
+            batch_ms: Longest time a batch stays open, in milliseconds
+            interval: Seconds between generated transactions (0 = as fast as possible)
+            duration: Total duration in seconds (None = infinite)
+        """
+        logger.info("🚀 Starting micro-batched real-time streaming...")
+        logger.info(f"📦 Batches of up to {batch_size} transactions or {batch_ms} ms")
+        logger.info(f"⏱️  Duration: {f'{duration} seconds' if duration else 'Infinite (Press Ctrl+C to stop)'}")
+        
+        if not self.connect_kafka():
+            logger.error("Cannot proceed without Kafka connection")
+            return
+        
+        if not self.connect_mysql():
+            logger.error("Cannot proceed without MySQL connection")
+            return
+        
+        start_time = time.time()
+        last_report = time.monotonic()
+        transaction_count = 0
+        failed_count = 0
+        reported_count = 0
+        latencies = []
+        
+        try:
+            while not (duration and (time.time() - start_time) >= duration):
+                # Collect one batch
+                batch = []
+                opened = time.monotonic()
+                deadline = opened + batch_ms / 1000
+                while len(batch) < batch_size and time.monotonic() < deadline:
+                    batch.append(self.generate_transaction())
+                    if interval:
+                        time.sleep(interval)
+                
+                # Latency: batch opened -> durably committed in MySQL
+                kafka_success = self.send_batch_to_kafka(batch)
+                mysql_success = self.save_batch_to_mysql(batch)
+                latencies.append((time.monotonic() - opened) * 1000)
+                if kafka_success and mysql_success:
+                    transaction_count += len(batch)
+                else:
+                    failed_count += len(batch)
+                
+                now = time.monotonic()
+                if now - last_report >= REPORT_INTERVAL:
+                    latencies.sort()
+                    with self.kafka_lock:
+                        acked, kafka_failed = self.kafka_acked, self.kafka_failed
+                    logger.info(f"📊 {(transaction_count - reported_count) / (now - last_report):,.0f} TPS | "
+                                f"{len(latencies)} batches, avg {(transaction_count - reported_count) / len(latencies):,.0f} txns | "
+                                f"latency p50 {percentile(latencies, 50):.1f} ms, p99 {percentile(latencies, 99):.1f} ms | "
+                                f"Kafka acked {acked:,}, failed {kafka_failed:,} | MySQL failed {failed_count:,}")
+                    latencies = []
+                    reported_count = transaction_count
+                    last_report = now
+                
+        except KeyboardInterrupt:
+            logger.info("\n⚠️  Streaming stopped by user (Ctrl+C)")
+        except Exception as e:
+            logger.error(f"❌ Error during streaming: {e}")
+        finally:
+            self.cleanup()
+            elapsed = time.time() - start_time
+            logger.info(f"📊 Total transactions streamed: {transaction_count:,} ({transaction_count / elapsed if elapsed else 0:,.0f} TPS)")
+            logger.info(f"📊 Kafka acked {self.kafka_acked:,}, failed {self.kafka_failed:,}")
+            logger.info(f"⏱️  Total time: {int(elapsed)} seconds")
+    
     def stream_data(self, interval=3, duration=None):
         """
         Stream data continuously
@@ -227,15 +410,50 @@ class RealtimeStreamer:
         """Clean up connections"""
         if self.kafka_producer:
             self.kafka_producer.flush()
+            if self.partition_stats.partitions:
+                partitions = self.kafka_producer.partitions_for('ecommerce-transactions') or ()
+                logger.info(f"📊 Partition spread (key: {self.key_by or 'none'}):")
+                for line in self.partition_stats.report(len(partitions)):
+                    logger.info(line)
             self.kafka_producer.close()
             logger.info("🔌 Kafka producer closed")
         
         if self.mysql_conn:
             self.mysql_conn.close()
             logger.info("🔌 MySQL connection closed")
+        
+        if self.id_allocator:
+            self.id_allocator.close()
+        
+        # After the flush above, so every traced Kafka ack is in
+        if self.tracer:
+            self.tracer.close()
+            for line in self.tracer.summary():
+                logger.info(line)
 
 def main():
     """Main execution function"""
+    parser = argparse.ArgumentParser(description='Generate and stream transactions to Kafka and MySQL')
+    parser.add_argument('--key-by', choices=KEY_STRATEGIES, default='none',
+                        help='Kafka message key, so each key stays on one partition (default: none)')
+    parser.add_argument('--serializer', choices=list(SERIALIZERS), default='json',
+                        help='Kafka message format: json, or compact schema-based binary (default: json)')
+    parser.add_argument('--interval', type=float, help='Seconds between transactions (default: 3, or 0 in micro-batch mode)')
+    parser.add_argument('--duration', type=float, help='Stop after this many seconds (default: run until Ctrl+C)')
+    parser.add_argument('--id-block-size', type=int, default=DEFAULT_BLOCK_SIZE,
+                        help=f'Transaction IDs leased from MySQL per round trip (default: {DEFAULT_BLOCK_SIZE})')
+    parser.add_argument('--trace', type=float, nargs='?', const=1.0, metavar='SAMPLE',
+                        help='Trace end-to-end latency of this fraction of transactions (default when given: 1.0); '
+                             'report with scripts/tracing.py')
+    batching = parser.add_argument_group('micro-batch mode')
+    batching.add_argument('--batch-size', type=int, help='Micro-batch up to N transactions per Kafka burst and MySQL commit')
+    batching.add_argument('--batch-ms', type=float, default=100, help='Longest time a micro-batch stays open (default: 100)')
+    args = parser.parse_args()
+    if args.id_block_size < 1:
+        parser.error("--id-block-size must be at least 1")
+    if args.trace is not None and not 0 < args.trace <= 1:
+        parser.error("--trace sample must be in (0, 1]")
+    
     print("=" * 70)
     print("🌊 REAL-TIME DATA STREAMING")
     print("=" * 70)
@@ -249,10 +467,16 @@ def main():
     print()
     
     # Create streamer
-    streamer = RealtimeStreamer()
+    tracer = Tracer(sample_rate=args.trace) if args.trace else None
+    streamer = RealtimeStreamer(key_by=args.key_by, serializer=args.serializer, id_block_size=args.id_block_size,
+                                tracer=tracer)
     
-    # Stream data (3 seconds per transaction, infinite duration)
-    streamer.stream_data(interval=3, duration=None)
+    if args.batch_size:
+        # Micro-batches: non-blocking Kafka sends, one INSERT + commit per batch
+        streamer.stream_batches(args.batch_size, args.batch_ms, args.interval or 0, args.duration)
+    else:
+        # Stream data (3 seconds per transaction by default, infinite duration)
+        streamer.stream_data(interval=3 if args.interval is None else args.interval, duration=args.duration)
 
 if __name__ == "__main__":
     main()
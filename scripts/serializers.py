@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Transaction Event Serializers
+Pluggable Kafka value serializers: JSON (default) and a compact schema-based binary format
+
+Binary layout (all integers little-endian):
+  header    magic byte 0xB7, schema version (1 byte)
+  fixed     one struct per schema: categorical fields as 1-byte dictionary
+            codes, numerics as fixed-width ints/doubles, dates as days and
+            timestamps as microseconds (ISO) or seconds (SQL-style) since the epoch
+  variable  free-text fields and any categorical value missing from the
+            dictionary (code 255), each as a 2-byte length + UTF-8 bytes;
+            binary_serialize() sends a record with a longer value as JSON
+
+The schema version identifies both the field layout and its dictionaries,
+so a dictionary can only grow by adding a new version; old versions stay
+decodable. JSON messages start with '{', so deserialize() accepts both
+formats on the same topic while producers migrate.
+"""
+
+import json
+import struct
+import time
+import argparse
+import os
+from datetime import datetime, timedelta, date
+from functools import lru_cache
+from pathlib import Path
+
+MAGIC = 0xB7
+ESCAPE = 255
+# Longest text value the 2-byte length prefix can describe
+MAX_STRING_BYTES = 0xFFFF
+EPOCH = datetime(1970, 1, 1)
+EPOCH_DATE = date(1970, 1, 1)
+
+CATEGORIES = ['Electronics', 'Home Appliances', 'Clothing', 'Books', 'Beauty Products', 'Sports', 'Home']
+REGIONS = ['North America', 'Europe', 'Asia', 'North', 'South', 'East', 'West', 'Central']
+PAYMENT_METHODS = ['Credit Card', 'Debit Card', 'PayPal', 'Cash']
+EVENT_TYPES = ['NEW_ORDER']
+PRODUCT_NAMES = ['Laptop', 'Smartphone', 'Headphones', 'T-Shirt', 'Jeans', 'Sneakers',
+                 'Coffee Maker', 'Blender', 'Desk Lamp', 'Book']
+
+# Field type -> struct code in the fixed section (None: variable section)
+FIELD_CODES = {
+    'cat': 'B',
+    'u32': 'I',
+    'u64': 'Q',
+    'f64': 'd',
+    'date': 'i',
+    'timestamp': 'q',
+    'datetime': 'q',
+    'str': None
+}
+
+# Schema version -> [(field, type, dictionary)]
+SCHEMAS = {
+    # CSV replay events (stream_to_kafka.py)
+    1: [
+        ('transaction_id', 'str', None),
+        ('date', 'date', None),
+        ('product_category', 'cat', CATEGORIES),
+        ('product_name', 'str', None),
+        ('units_sold', 'u32', None),
+        ('unit_price', 'f64', None),
+        ('total_revenue', 'f64', None),
+        ('region', 'cat', REGIONS),
+        ('payment_method', 'cat', PAYMENT_METHODS),
+        ('streaming_timestamp', 'timestamp', None),
+        ('record_number', 'u64', None),
+        ('event_type', 'cat', EVENT_TYPES)
+    ],
+    # Generated events (realtime_stream.py)
+    2: [
+        ('transaction_id', 'u64', None),
+        ('product_name', 'cat', PRODUCT_NAMES),
+        ('category', 'cat', CATEGORIES),
+        ('quantity', 'u32', None),
+        ('unit_price', 'f64', None),
+        ('total_amount', 'f64', None),
+        ('payment_method', 'cat', PAYMENT_METHODS),
+        ('region', 'cat', REGIONS),
+        ('timestamp', 'datetime', None)
+    ],
+    # Generated events with trace stamps (realtime_stream.py --trace, see tracing.py)
+    3: [
+        ('transaction_id', 'u64', None),
+        ('product_name', 'cat', PRODUCT_NAMES),
+        ('category', 'cat', CATEGORIES),
+        ('quantity', 'u32', None),
+        ('unit_price', 'f64', None),
+        ('total_amount', 'f64', None),
+        ('payment_method', 'cat', PAYMENT_METHODS),
+        ('region', 'cat', REGIONS),
+        ('timestamp', 'datetime', None),
+        ('trace_id', 'str', None),
+        ('origin_ts', 'f64', None)
+    ]
+}
+
+def _to_micros(value):
+    return (datetime.fromisoformat(value) - EPOCH) // timedelta(microseconds=1)
+
+def _from_micros(micros):
+    return (EPOCH + timedelta(microseconds=micros)).isoformat()
+
+def _to_seconds(value):
+    return (datetime.strptime(value, '%Y-%m-%d %H:%M:%S') - EPOCH) // timedelta(seconds=1)
+
+def _from_seconds(seconds):
+    return (EPOCH + timedelta(seconds=seconds)).strftime('%Y-%m-%d %H:%M:%S')
+
+@lru_cache(maxsize=4096)
+def _to_days(value):
+    return (date.fromisoformat(value) - EPOCH_DATE).days
+
+@lru_cache(maxsize=4096)
+def _from_days(days):
+    return (EPOCH_DATE + timedelta(days=days)).isoformat()
+
+# Conversions between record values and fixed-section integers
+_ENCODERS = {'date': _to_days, 'timestamp': _to_micros, 'datetime': _to_seconds}
+_DECODERS = {'date': _from_days, 'timestamp': _from_micros, 'datetime': _from_seconds}
+
+class BinarySchema:
+    """Encoder/decoder for one schema version"""
+
+    def __init__(self, version, fields):
+        self.version = version
+        self.fields = fields
+        self.field_names = [name for name, _, _ in fields]
+        self.names = frozenset(self.field_names)
+        self.fixed = [(name, kind, values) for name, kind, values in fields if FIELD_CODES[kind]]
+        self.variable = [name for name, kind, _ in fields if not FIELD_CODES[kind]]
+        self.struct = struct.Struct('<BB' + ''.join(FIELD_CODES[kind] for _, kind, _ in self.fixed))
+        self.codes = {name: {v: i for i, v in enumerate(values)} for name, kind, values in fields if kind == 'cat'}
+        self.encoders = [_ENCODERS.get(kind) for _, kind, _ in self.fixed]
+        self.decoders = [_DECODERS.get(kind) for _, kind, _ in self.fixed]
+
+    def encode(self, record):
+        fixed = [MAGIC, self.version]
+        variable = [(name, record[name]) for name in self.variable]
+        for (name, kind, _), encoder in zip(self.fixed, self.encoders):
+            value = record[name]
+            if kind == 'cat':
+                code = self.codes[name].get(value)
+                if code is None:
+                    code = ESCAPE
+                    variable.append((name, value))
+                value = code
+            elif encoder:
+                value = encoder(value)
+            fixed.append(value)
+        parts = [self.struct.pack(*fixed)]
+        for name, value in variable:
+            data = str(value).encode('utf-8')
+            if len(data) > MAX_STRING_BYTES:
+                raise OverflowError(f"'{name}' is {len(data):,} bytes, the binary format holds at most "
+                                    f"{MAX_STRING_BYTES:,} per field")
+            parts.append(len(data).to_bytes(2, 'little'))
+            parts.append(data)
+        return b''.join(parts)
+
+    def decode(self, data):
+        values = self.struct.unpack_from(data)
+        pos = self.struct.size
+        end = len(data)
+        strings = []
+        while pos < end:
+            length = data[pos] | data[pos + 1] << 8
+            strings.append(data[pos + 2:pos + 2 + length].decode('utf-8'))
+            pos += 2 + length
+        strings = iter(strings)
+        record = {name: next(strings) for name in self.variable}
+        for (name, kind, dictionary), decoder, value in zip(self.fixed, self.decoders, values[2:]):
+            if kind == 'cat':
+                value = next(strings) if value == ESCAPE else dictionary[value]
+            elif decoder:
+                value = decoder(value)
+            record[name] = value
+        return {name: record[name] for name in self.field_names}
+
+_SCHEMAS = {version: BinarySchema(version, fields) for version, fields in SCHEMAS.items()}
+
+def schema_for(record):
+    """Schema whose fields exactly match the record's keys"""
+    keys = record.keys()
+    for schema in _SCHEMAS.values():
+        if schema.names == keys:
+            return schema
+    raise ValueError(f"No binary schema matches fields {sorted(keys)}")
+
+def binary_serialize(record):
+    """Binary message, or JSON if a text field is too long for it (deserialize() reads both)"""
+    schema = schema_for(record)
+    try:
+        return schema.encode(record)
+    except OverflowError:
+        return json_serialize(record)
+
+def json_serialize(record):
+    return json.dumps(record).encode('utf-8')
+
+def deserialize(data):
+    """Decode a message produced by either serializer"""
+    if data[:1] == b'{':
+        return json.loads(data.decode('utf-8'))
+    if data[0] != MAGIC:
+        raise ValueError("Not a JSON or binary transaction message")
+    schema = _SCHEMAS.get(data[1])
+    if schema is None:
+        raise ValueError(f"Unknown binary schema version {data[1]}")
+    return schema.decode(data)
+
+SERIALIZERS = {
+    'json': json_serialize,
+    'binary': binary_serialize
+}
+
+def get_serializer(name):
+    """Producer value_serializer by name ('json' or 'binary')"""
+    if name not in SERIALIZERS:
+        raise ValueError(f"Unknown serializer '{name}' (choose from {', '.join(SERIALIZERS)})")
+    return SERIALIZERS[name]
+
+def benchmark(records, repeat=3):
+    """
+    Compare bytes/record and encode/decode throughput of each serializer
+
+    Returns:
+        dict of name -> (bytes per record, encodes/sec, decodes/sec)
+    """
+    results = {}
+    for name, serialize in SERIALIZERS.items():
+        encode_best = decode_best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            encoded = [serialize(r) for r in records]
+            encode_best = min(encode_best, time.perf_counter() - start)
+            start = time.perf_counter()
+            for data in encoded:
+                deserialize(data)
+            decode_best = min(decode_best, time.perf_counter() - start)
+        size = sum(len(d) for d in encoded) / len(records)
+        results[name] = (size, len(records) / encode_best, len(records) / decode_best)
+    return results
+
+def _sample_records(csv_file, count):
+    """CSV replay events as stream_to_kafka.py sends them, repeated up to count"""
+    import pandas as pd
+    from stream_to_kafka import iter_transactions
+    df = pd.read_csv(csv_file)
+    df = pd.concat([df] * (count // len(df) + 1)).head(count)
+    return list(iter_transactions(df))
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark transaction event serializers')
+    parser.add_argument('csv_file', nargs='?', help='CSV file of transactions')
+    parser.add_argument('--records', type=int, default=100_000, help='Records to encode (default: 100000)')
+    args = parser.parse_args()
+
+    if not args.csv_file:
+        data_dir = Path("/shared-data") if os.path.exists("/shared-data") else Path("shared-data")
+        args.csv_file = str(data_dir / "transactions_realtime.csv")
+
+    print("╔════════════════════════════════════════════════════════════╗")
+    print("║          Serializer Benchmark                              ║")
+    print("╚════════════════════════════════════════════════════════════╝\n")
+
+    records = _sample_records(args.csv_file, args.records)
+    for record in records[:1000]:
+        assert deserialize(binary_serialize(record)) == record, "binary round trip mismatch"
+    print(f"✓ {len(records):,} records from {args.csv_file} (binary round trip verified)\n")
+
+    results = benchmark(records)
+    json_size = results['json'][0]
+    print(f"{'Serializer':<12}{'Bytes/rec':>12}{'vs JSON':>10}{'Encode/s':>14}{'Decode/s':>14}")
+    print('-' * 62)
+    for name, (size, enc, dec) in results.items():
+        print(f"{name:<12}{size:>12.1f}{size / json_size * 100:>9.0f}%{enc:>14,.0f}{dec:>14,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Probabilistic Sketches
+Small, mergeable summaries used to profile and monitor large datasets in constant memory
+"""
+
+import heapq
+import math
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import random
+
+def hash64(values):
+    """Stable 64-bit hash of an array of values (same result in every process and run)"""
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    # Numbers hash as float64 so that int and float chunks of one column agree
+    series = series.astype('float64') if pd.api.types.is_numeric_dtype(series) else series.astype(str)
+    return pd.util.hash_pandas_object(series, index=False).to_numpy(dtype=np.uint64)
+
+def _bit_length(x):
+    """Vectorized int.bit_length() for a uint64 array"""
+    x = x.copy()
+    n = np.zeros(x.shape, dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        shifted = x >> np.uint64(shift)
+        mask = shifted != 0
+        n[mask] += shift
+        x = np.where(mask, shifted, x)
+    return n + (x != 0)
+
+def _double_hash(hashes, count, modulo):
+    """count indexes below modulo per hash (rows), as h1 + i * h2 from the two halves of one 64-bit hash"""
+    low = hashes & np.uint64(0xFFFFFFFF)
+    high = (hashes >> np.uint64(32)) | np.uint64(1)
+    rows = np.arange(count, dtype=np.uint64)[:, None]
+    return ((low + rows * high) % np.uint64(modulo)).astype(np.int64)
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct-count sketch
+
+    With precision p the sketch uses 2**p one-byte registers and has a
+    relative standard error of about 1.04 / sqrt(2**p) (1.6% for p=12).
+    """
+
+    def __init__(self, precision=12):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, values):
+        """Add an array of values (nulls are ignored)"""
+        series = values if isinstance(values, pd.Series) else pd.Series(values)
+        series = series.dropna()
+        if series.empty:
+            return
+        self.update_hashes(hash64(series))
+
+    def update_hashes(self, hashes):
+        """Add pre-computed 64-bit hashes"""
+        p = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - p)).astype(np.int64)
+        rest = hashes & np.uint64((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - _bit_length(rest) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def merge(self, other):
+        """Merge another sketch with the same precision into this one"""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        """Estimated number of distinct values"""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+class KLLSketch:
+    """
+    KLL quantile sketch
+
+    Keeps a stack of compactors; items at level h stand for 2**h inputs.
+    Space is O(k) and rank error is roughly 1.7 / k with high probability.
+    """
+
+    def __init__(self, k=200, seed=None):
+        self.k = k
+        self.levels = [np.empty(0, dtype=np.float64)]
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._rng = random.Random(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2.0 / 3.0) ** depth)), 2)
+
+    def _compress(self):
+        while sum(len(items) for items in self.levels) > sum(self._capacity(h) for h in range(len(self.levels))):
+            for h, items in enumerate(self.levels):
+                if len(items) < self._capacity(h):
+                    continue
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=np.float64))
+                items = np.sort(items)
+                # An odd item out stays behind so that total weight is preserved
+                keep = items[:1] if len(items) % 2 else items[:0]
+                items = items[len(keep):]
+                promoted = items[self._rng.randint(0, 1)::2]
+                self.levels[h] = keep
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+                break
+
+    def update(self, values):
+        """Add an array of numeric values (NaNs are ignored)"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.n += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other):
+        """Merge another sketch into this one"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def quantile(self, q):
+        """Approximate q-quantile (0 <= q <= 1)"""
+        if not self.n:
+            return float('nan')
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 1 << h, dtype=np.int64) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        cumulative = np.cumsum(weights[order])
+        position = np.searchsorted(cumulative, q * cumulative[-1])
+        return float(items[order][min(position, len(items) - 1)])
+
+class CountMinSketch:
+    """
+    Count-min sketch of weighted frequencies
+
+    A depth x width table of sums; a key's estimate is the smallest of its
+    depth counters, so it never underestimates and overestimates by at most
+    e / width of the total weight with probability 1 - exp(-depth).
+    Sketches of the same shape add and subtract exactly.
+    """
+
+    def __init__(self, width=2048, depth=4):
+        if width < 1 or depth < 1:
+            raise ValueError("width and depth must be at least 1")
+        self.width = width
+        self.depth = depth
+        self.counts = np.zeros((depth, width), dtype=np.float64)
+        self.total = 0.0
+
+    @classmethod
+    def from_error(cls, epsilon, delta):
+        """Smallest sketch whose error is below epsilon * total with probability 1 - delta"""
+        return cls(int(math.ceil(math.e / epsilon)), int(math.ceil(math.log(1 / delta))))
+
+    def update(self, values, weights=1.0):
+        """Add an array of keys, each with its weight (default 1)"""
+        self.update_hashes(hash64(values), weights)
+
+    def update_hashes(self, hashes, weights=1.0):
+        weights = np.broadcast_to(np.asarray(weights, dtype=np.float64), hashes.shape)
+        for row, index in zip(self.counts, _double_hash(hashes, self.depth, self.width)):
+            np.add.at(row, index, weights)
+        self.total += float(weights.sum())
+
+    def estimate(self, values):
+        """Estimated total weight of each key in the array"""
+        return self.estimate_hashes(hash64(values))
+
+    def estimate_hashes(self, hashes):
+        index = _double_hash(hashes, self.depth, self.width)
+        return self.counts[np.arange(self.depth)[:, None], index].min(axis=0)
+
+    def _check_shape(self, other):
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Cannot combine count-min sketches of different shapes")
+
+    def merge(self, other):
+        """Add another sketch of the same shape into this one"""
+        self._check_shape(other)
+        self.counts += other.counts
+        self.total += other.total
+        return self
+
+    def subtract(self, other):
+        """Remove a sketch that was previously merged into this one"""
+        self._check_shape(other)
+        self.counts -= other.counts
+        self.total -= other.total
+        return self
+
+class TopK:
+    """
+    Approximate heaviest keys of a weighted stream (count-min sketch + min-heap)
+
+    The sketch estimates every key's weight; a min-heap keeps the k keys with
+    the largest estimates seen so far, so memory is fixed whatever the number
+    of distinct keys. A key enters the heap once its estimate passes the
+    current minimum. Weights must be non-negative.
+    """
+
+    def __init__(self, k=10, width=2048, depth=4):
+        self.k = k
+        self.sketch = CountMinSketch(width, depth)
+        # Heap entries go stale when a member's estimate grows; members holds the current one
+        self.heap = []
+        self.members = {}
+
+    def update(self, keys, weights=1.0):
+        """Add an array of keys with their weights (repeated keys are summed first)"""
+        totals = pd.Series(np.broadcast_to(np.asarray(weights, dtype=np.float64), len(keys)),
+                           index=pd.Index(keys)).groupby(level=0, sort=False).sum()
+        if not totals.empty:
+            self.update_hashes(totals.index, hash64(pd.Series(totals.index)), totals.to_numpy())
+
+    def update_hashes(self, keys, hashes, weights):
+        """Add distinct keys with their pre-computed hashes and weights"""
+        self.sketch.update_hashes(hashes, weights)
+        for key, estimate in zip(keys, self.sketch.estimate_hashes(hashes).tolist()):
+            self._offer(key, estimate)
+
+    def _offer(self, key, estimate):
+        heap, members = self.heap, self.members
+        if key not in members:
+            if len(members) >= self.k:
+                # Drop stale entries so heap[0] is the real minimum
+                while members.get(heap[0][1]) != heap[0][0]:
+                    heapq.heappop(heap)
+                if estimate <= heap[0][0]:
+                    return
+                del members[heapq.heappop(heap)[1]]
+        members[key] = estimate
+        heapq.heappush(heap, (estimate, key))
+        if len(heap) > 4 * self.k:
+            self.heap = [(value, member) for member, value in members.items()]
+            heapq.heapify(self.heap)
+
+    def top(self, n=None):
+        """[(key, estimated weight)] of up to n heaviest keys, heaviest first"""
+        if not self.members:
+            return []
+        keys = list(self.members)
+        estimates = self.sketch.estimate(pd.Series(keys))
+        ranked = sorted(zip(keys, estimates.tolist()), key=lambda item: item[1], reverse=True)
+        return ranked[:n or self.k]
+
+class BloomFilter:
+    """
+    Bloom filter set-membership sketch
+
+    contains() has no false negatives; its false-positive rate grows with
+    the fill, reaching fp_rate at `capacity` insertions.
+    """
+
+    def __init__(self, bits, hashes, capacity=None):
+        if bits < 8 or hashes < 1:
+            raise ValueError("A Bloom filter needs at least 8 bits and 1 hash")
+        self.bits = bits // 8 * 8
+        self.hashes = hashes
+        self.array = np.zeros(self.bits // 8, dtype=np.uint8)
+        self.count = 0
+        # Default: where half the bits are set, the optimum for this many hashes
+        self.capacity = capacity or int(self.bits * math.log(2) / hashes)
+
+    @classmethod
+    def for_capacity(cls, capacity, fp_rate):
+        """Smallest filter holding `capacity` keys at the given false-positive rate"""
+        bits = int(math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+        return cls(max(bits, 8), max(int(round(-math.log2(fp_rate))), 1), capacity)
+
+    @classmethod
+    def for_memory(cls, nbytes, fp_rate):
+        """Filter of nbytes sized for fp_rate; capacity follows from the two"""
+        bits = int(nbytes) * 8
+        hashes = max(int(round(-math.log2(fp_rate))), 1)
+        # Keys at which (1 - exp(-hashes * n / bits)) ** hashes reaches fp_rate
+        return cls(bits, hashes, max(int(-bits / hashes * math.log(1 - fp_rate ** (1 / hashes))), 1))
+
+    def add(self, values):
+        self.add_hashes(hash64(values))
+
+    def add_hashes(self, hashes):
+        positions = _double_hash(hashes, self.hashes, self.bits).ravel()
+        np.bitwise_or.at(self.array, positions >> 3, (1 << (positions & 7)).astype(np.uint8))
+        self.count += len(hashes)
+
+    def contains(self, values):
+        """Boolean array: True where the value may have been added"""
+        return self.contains_hashes(hash64(values))
+
+    def contains_hashes(self, hashes):
+        positions = _double_hash(hashes, self.hashes, self.bits)
+        return ((self.array[positions >> 3] >> (positions & 7).astype(np.uint8)) & 1).astype(bool).all(axis=0)
+
+    def false_positive_rate(self):
+        """Current false-positive rate from the fraction of bits set"""
+        fill = np.unpackbits(self.array).mean()
+        return float(fill ** self.hashes)
+
+class RotatingBloomFilter:
+    """
+    Time-partitioned Bloom filters: "seen within roughly the last retention seconds"
+
+    Keys go into the newest of `generations` equal filters, which is retired
+    after retention / generations seconds or once it holds its capacity; the
+    oldest filter is then cleared and reused. Memory stays at nbytes, and
+    each filter gets fp_rate / generations so a lookup across all of them
+    stays within fp_rate.
+    """
+
+    def __init__(self, nbytes, fp_rate=0.001, retention=3600.0, generations=4):
+        if generations < 1:
+            raise ValueError("generations must be at least 1")
+        self.fp_rate = fp_rate
+        self.period = retention / generations
+        self.filters = [BloomFilter.for_memory(nbytes // generations, fp_rate / generations)
+                        for _ in range(generations)]
+        self.current = 0
+        self.started = None
+        self.rotations = 0
+
+    @property
+    def capacity(self):
+        """Keys each generation holds at the target false-positive rate"""
+        return self.filters[0].capacity
+
+    def _rotate(self, now):
+        if self.started is None:
+            self.started = now
+        elif now - self.started >= self.period or self.filters[self.current].count >= self.capacity:
+            self.current = (self.current + 1) % len(self.filters)
+            oldest = self.filters[self.current]
+            oldest.array[:] = 0
+            oldest.count = 0
+            self.started = now
+            self.rotations += 1
+
+    def check_and_add(self, hashes, now):
+        """
+        Boolean array: True where a key may have been seen before (including
+        earlier in the same array); all keys are then added.
+        """
+        self._rotate(now)
+        seen = np.zeros(len(hashes), dtype=bool)
+        for bloom in self.filters:
+            if bloom.count:
+                seen |= bloom.contains_hashes(hashes)
+        # Repeats inside the batch are certain duplicates of their first occurrence
+        _, first = np.unique(hashes, return_index=True)
+        repeat = np.ones(len(hashes), dtype=bool)
+        repeat[first] = False
+        self.filters[self.current].add_hashes(hashes)
+        return seen | repeat
+
+    def nbytes(self):
+        return sum(bloom.array.nbytes for bloom in self.filters)
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'wb') as f:
+            np.savez(f, arrays=np.stack([bloom.array for bloom in self.filters]),
+                     counts=np.array([bloom.count for bloom in self.filters]),
+                     hashes=self.filters[0].hashes, period=self.period, current=self.current,
+                     started=np.nan if self.started is None else self.started, rotations=self.rotations)
+
+    def load(self, path):
+        """Restore state saved by save(); False if there is none or it was saved with other settings"""
+        try:
+            with np.load(path) as state:
+                arrays = state['arrays']
+                if (arrays.shape != (len(self.filters), len(self.filters[0].array))
+                        or int(state['hashes']) != self.filters[0].hashes or float(state['period']) != self.period):
+                    return False
+                for bloom, array, count in zip(self.filters, arrays, state['counts']):
+                    bloom.array[:] = array
+                    bloom.count = int(count)
+                self.current = int(state['current'])
+                started = float(state['started'])
+                self.started = None if np.isnan(started) else started
+                self.rotations = int(state['rotations'])
+        except (OSError, KeyError, ValueError):
+            return False
+        return True
@@ -2,95 +2,233 @@
 """
 Data Splitter - Phase 1.2
 Splits Online Sales Data into historical (MySQL) and real-time (Kafka) portions
+
+Supported strategies:
+  time      - chronological split by ratio or at a cut date (default)
+  hash      - stable hash-by-Transaction ID sampling into two portions
+  region    - one shard per Region
+  category  - one shard per Product Category
+Shards are written in parallel worker processes as CSV or Parquet.
 """
 
 import pandas as pd
+import argparse
 import os
+import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-def split_data(split_ratio=0.7):
+from profile_cache import load_profile
+
+STRATEGIES = ['time', 'hash', 'region', 'category']
+FORMATS = ['csv', 'parquet']
+
+# Hash buckets for the 'hash' strategy; --ratio is honoured to 1/HASH_BUCKETS
+HASH_BUCKETS = 10_000
+
+# Column used for each sharding strategy
+SHARD_COLUMNS = {
+    'region': 'Region',
+    'category': 'Product Category'
+}
+
+def shard_slug(value):
+    """Turn a category value into a safe file name fragment ('unknown' for a missing value)"""
+    if pd.isna(value):
+        return 'unknown'
+    return re.sub(r'[^a-z0-9]+', '_', str(value).lower()).strip('_') or 'unknown'
+
+def count_shard_rows(path):
+    """
+    Count the records in a shard written by split_data()
+
+    CSV shards are profiled through the shared profile cache, so the next
+    stage (generate_mysql_schema.py) reuses the profile without rescanning.
+    Parquet shards report their row count from the file footer.
+    """
+    path = Path(path)
+    if path.suffix == '.parquet':
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).metadata.num_rows
+    profile, _ = load_profile(path)
+    return profile.rows
+
+def write_shard(df, path, fmt='csv'):
+    """
+    Write a single shard to disk
+
+    Runs inside a worker process; returns (file name, record count).
+    """
+    if fmt == 'parquet':
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    return Path(path).name, len(df)
+
+def hash_buckets(df, buckets=HASH_BUCKETS):
+    """Stable bucket per Transaction ID (independent of row order and run)"""
+    keys = df['Transaction ID'].astype(str)
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy() % buckets
+
+def plan_shards(df, strategy, split_ratio, cut_date=None):
+    """
+    Decide which rows go to which shard
+
+    Returns:
+        dict of shard name -> DataFrame
+    """
+    if strategy == 'time':
+        if 'Date' in df.columns:
+            df = df.sort_values('Date', kind='stable').reset_index(drop=True)
+        if cut_date is not None:
+            if 'Date' not in df.columns:
+                raise ValueError("--cut-date needs a Date column in the input")
+            mask = df['Date'] < pd.Timestamp(cut_date)
+            return {'historical': df[mask], 'realtime': df[~mask]}
+        split_point = int(len(df) * split_ratio)
+        return {'historical': df.iloc[:split_point], 'realtime': df.iloc[split_point:]}
+
+    if strategy == 'hash':
+        mask = hash_buckets(df) < int(round(split_ratio * HASH_BUCKETS))
+        return {'historical': df[mask], 'realtime': df[~mask]}
+
+    column = SHARD_COLUMNS[strategy]
+    shards = {}
+    for value, group in df.groupby(column, sort=True, dropna=False):
+        name = f"{strategy}_{shard_slug(value)}"
+        # Values with the same slug (say 'Unknown' and a missing value) share a shard
+        shards[name] = pd.concat([shards[name], group]).sort_index() if name in shards else group
+    return shards
+
+def split_data(split_ratio=0.7, strategy='time', fmt='csv', workers=None,
+               cut_date=None, input_file=None, output_dir=None):
     """
-    Split the sales data into historical and real-time portions
-    
+    Split the sales data into historical and real-time portions (or shards)
+
     Args:
         split_ratio: Percentage of data for historical (default 0.7 for 70%)
+        strategy: One of 'time', 'hash', 'region', 'category'
+        fmt: Output format, 'csv' or 'parquet'
+        workers: Worker processes used to write shards (default: one per shard, capped at CPU count)
+        cut_date: For the 'time' strategy, split at this date instead of by ratio
+        input_file: Source CSV (default: shared-data/Online Sales Data.csv)
+        output_dir: Directory for the shards (default: the data directory)
     """
-    
+
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy}' (choose from {', '.join(STRATEGIES)})")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}' (choose from {', '.join(FORMATS)})")
+
     # Dataset paths
     data_dir = Path("/shared-data") if os.path.exists("/shared-data") else Path("shared-data")
-    input_file = data_dir / "Online Sales Data.csv"
-    
-    output_historical = data_dir / "transactions_historical.csv"
-    output_realtime = data_dir / "transactions_realtime.csv"
-    
+    input_file = Path(input_file) if input_file else data_dir / "Online Sales Data.csv"
+    output_dir = Path(output_dir) if output_dir else data_dir
+
     print("╔════════════════════════════════════════════════════════════╗")
     print("║              Data Splitting Process                        ║")
     print("╚════════════════════════════════════════════════════════════╝\n")
-    
+
     # Check if file exists
     if not input_file.exists():
         print(f"❌ Error: Input file not found at {input_file}")
         return
-    
+
+    if fmt == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print("❌ Error: Parquet output requires pyarrow (pip3 install pyarrow)")
+            return
+
     # Read the dataset
     print(f"📖 Loading dataset from {input_file.name}...")
     df = pd.read_csv(input_file)
     print(f"✓ Loaded {len(df):,} records\n")
-    
+
     # Convert date column to datetime for proper sorting
     if 'Date' in df.columns:
         df['Date'] = pd.to_datetime(df['Date'])
-        # Sort by date to split chronologically
-        df = df.sort_values('Date').reset_index(drop=True)
-        print("✓ Data sorted by date")
-    
-    # Calculate split point
+        if strategy == 'time':
+            print("✓ Data sorted by date")
+
     total_rows = len(df)
-    split_point = int(total_rows * split_ratio)
-    
-    # Split the data
-    df_historical = df.iloc[:split_point].copy()
-    df_realtime = df.iloc[split_point:].copy()
-    
+    shards = plan_shards(df, strategy, split_ratio, cut_date)
+
     print(f"\n{'='*60}")
     print("SPLIT SUMMARY")
     print('='*60)
+    print(f"Strategy:           {strategy}")
     print(f"Total Records:      {total_rows:,}")
-    print(f"Historical (MySQL): {len(df_historical):,} records ({split_ratio*100:.0f}%)")
-    print(f"Real-time (Kafka):  {len(df_realtime):,} records ({(1-split_ratio)*100:.0f}%)")
-    
-    if 'Date' in df.columns:
-        print(f"\nDate Ranges:")
-        print(f"Historical: {df_historical['Date'].min()} to {df_historical['Date'].max()}")
-        print(f"Real-time:  {df_realtime['Date'].min()} to {df_realtime['Date'].max()}")
-    
+    if strategy in ('time', 'hash'):
+        df_historical, df_realtime = shards['historical'], shards['realtime']
+        hist_pct = len(df_historical) / total_rows * 100 if total_rows else 0
+        print(f"Historical (MySQL): {len(df_historical):,} records ({hist_pct:.0f}%)")
+        print(f"Real-time (Kafka):  {len(df_realtime):,} records ({100 - hist_pct:.0f}%)")
+
+        if 'Date' in df.columns and len(df_historical) and len(df_realtime):
+            print(f"\nDate Ranges:")
+            print(f"Historical: {df_historical['Date'].min()} to {df_historical['Date'].max()}")
+            print(f"Real-time:  {df_realtime['Date'].min()} to {df_realtime['Date'].max()}")
+    else:
+        for name, shard in shards.items():
+            print(f"  {name:40s}: {len(shard):,} records")
+
     # Save the split files
     print(f"\n{'='*60}")
     print("SAVING FILES")
     print('='*60)
-    
-    print(f"💾 Saving historical data to {output_historical.name}...")
-    df_historical.to_csv(output_historical, index=False)
-    print(f"✓ Saved {len(df_historical):,} records")
-    
-    print(f"\n💾 Saving real-time data to {output_realtime.name}...")
-    df_realtime.to_csv(output_realtime, index=False)
-    print(f"✓ Saved {len(df_realtime):,} records")
-    
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    outputs = {name: output_dir / f"transactions_{name}.{fmt}" for name in shards}
+    # An empty input yields no region/category shards; the pool still needs one worker
+    workers = workers or max(1, min(len(shards), os.cpu_count() or 1))
+    print(f"💾 Writing {len(shards)} {fmt.upper()} shard(s) with {workers} worker process(es)...")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(write_shard, shard, outputs[name], fmt)
+            for name, shard in shards.items()
+        ]
+        for future in futures:
+            filename, count = future.result()
+            print(f"✓ Saved {count:,} records to {filename}")
+
     # Verify files
     print(f"\n{'='*60}")
     print("VERIFICATION")
     print('='*60)
-    verify_historical = pd.read_csv(output_historical)
-    verify_realtime = pd.read_csv(output_realtime)
-    print(f"✓ Historical file verified: {len(verify_historical):,} records")
-    print(f"✓ Real-time file verified:  {len(verify_realtime):,} records")
-    print(f"✓ Total matches original:  {len(verify_historical) + len(verify_realtime) == total_rows}")
-    
+    verified_total = 0
+    for name, path in outputs.items():
+        count = count_shard_rows(path)
+        verified_total += count
+        print(f"✓ {path.name} verified: {count:,} records")
+    print(f"✓ Total matches original:  {verified_total == total_rows}")
+
     print("\n✅ Data splitting completed successfully!\n")
     print("Next steps:")
     print("  1. Run generate_mysql_schema.py to create SQL schema")
     print("  2. Run load_mysql_data.py to load historical data to MySQL")
 
+def main():
+    parser = argparse.ArgumentParser(description='Split sales data into historical/real-time portions or shards')
+    parser.add_argument('--strategy', choices=STRATEGIES, default='time', help='Split strategy (default: time)')
+    parser.add_argument('--ratio', type=float, default=0.7, help='Historical fraction for time/hash splits (default: 0.7)')
+    parser.add_argument('--cut-date', help='Split at this date (YYYY-MM-DD) instead of by ratio (time strategy)')
+    parser.add_argument('--format', dest='fmt', choices=FORMATS, default='csv', help='Output format (default: csv)')
+    parser.add_argument('--workers', type=int, help='Worker processes for writing shards')
+    parser.add_argument('--input', help='Source CSV file')
+    parser.add_argument('--output-dir', help='Output directory for shards')
+
+    args = parser.parse_args()
+    if not 0 <= args.ratio <= 1:
+        parser.error("--ratio must be between 0 and 1")
+
+    try:
+        split_data(args.ratio, args.strategy, args.fmt, args.workers,
+                   args.cut_date, args.input, args.output_dir)
+    except ValueError as e:
+        parser.error(str(e))
+
 if __name__ == "__main__":
-    split_data()
+    main()
@@ -7,14 +7,106 @@ Streams real-time transactions from CSV to Kafka topic
 import pandas as pd
 from kafka import KafkaProducer
 from kafka.errors import KafkaError
-import json
 import time
 import argparse
+import csv
+import io
 import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
 from datetime import datetime
 
-def stream_to_kafka(csv_file, topic='ecommerce-transactions', delay=2, batch_size=1):
+from rate_control import TokenBucket, RateSchedule
+from partitioning import KEY_STRATEGIES, PartitionStats, record_key, encode_key
+from serializers import SERIALIZERS, get_serializer
+from replay_checkpoint import ReplayCheckpoint
+
+# Seconds between progress lines in pipelined mode
+PROGRESS_INTERVAL = 1.0
+
+# CSV bytes parsed at a time by a sharded-mode worker
+SHARD_BLOCK_BYTES = 4 * 1024 * 1024
+
+CSV_COLUMNS = ['Transaction ID', 'Date', 'Product Category', 'Product Name', 'Units Sold',
+               'Unit Price', 'Total Revenue', 'Region', 'Payment Method']
+
+def iter_transactions(df):
+    """
+    Yield one transaction record per CSV row
+    
+    Reads whole columns once instead of building a Series per row.
+    """
+    columns = [df[name].tolist() for name in CSV_COLUMNS]
+    for idx, row in enumerate(zip(*columns)):
+        yield make_transaction(row, idx + 1)
+
+def make_transaction(row, record_number):
+    """Transaction event from one row's values, in CSV_COLUMNS order"""
+    txn_id, date, category, product, units, price, revenue, region, payment = row
+    return {
+        'transaction_id': str(txn_id),
+        'date': str(date),
+        'product_category': str(category),
+        'product_name': str(product),
+        'units_sold': int(units),
+        'unit_price': float(price),
+        'total_revenue': float(revenue),
+        'region': str(region),
+        'payment_method': str(payment),
+        # Add streaming metadata
+        'streaming_timestamp': datetime.now().isoformat(),
+        'record_number': record_number,
+        'event_type': 'NEW_ORDER'
+    }
+
+class DeliveryTracker:
+    """
+    Counts deliveries reported by producer callbacks
+    
+    Callbacks run on the producer's network thread; the counters are
+    guarded by a lock so the main thread can read a consistent snapshot.
+    """
+
+    def __init__(self, track_keys=True, track_records=False):
+        self.lock = threading.Lock()
+        self.sent = 0
+        self.acked = 0
+        self.failed = 0
+        self.partitions = PartitionStats(track_keys)
+        self.last_error = None
+        # Acked record numbers, for checkpointing (see ReplayCheckpoint.update)
+        self.acked_records = set() if track_records else None
+
+    def track(self, future, record_number, key=None):
+        """Attach callbacks to a send() future"""
+        with self.lock:
+            self.sent += 1
+        future.add_callback(self._on_success, key, record_number)
+        future.add_errback(self._on_error, record_number)
+
+    def _on_success(self, key, record_number, metadata):
+        with self.lock:
+            self.acked += 1
+            self.partitions.record(metadata.partition, key)
+            if self.acked_records is not None:
+                self.acked_records.add(record_number)
+
+    def _on_error(self, record_number, exc):
+        with self.lock:
+            self.failed += 1
+            self.last_error = f"record {record_number}: {exc}"
+
+    def snapshot(self):
+        with self.lock:
+            return self.sent, self.acked, self.failed
+
+def stream_to_kafka(csv_file, topic='ecommerce-transactions', delay=2, batch_size=1, pipelined=False,
+                    linger_ms=20, producer_batch_size=256 * 1024, compression=None, max_in_flight=5,
+                    rate=None, burst=None, ramp=None, speedup=None, loop=False, key_by=None,
+                    serializer='json', workers=None, checkpoint=None, restart=False):
     """
     Stream transactions from CSV to Kafka
     
@@ -23,11 +115,47 @@ def stream_to_kafka(csv_file, topic='ecommerce-transactions', delay=2, batch_siz
         topic: Kafka topic name
         delay: Seconds between batches
         batch_size: Records to send before sleeping
+        pipelined: Send without waiting for each ack (high-throughput mode).
+            Acks are counted in callbacks and one flush at the end waits
+            for every outstanding record; delay/batch_size are not used.
+        linger_ms: Producer linger.ms (pipelined mode)
+        producer_batch_size: Producer batch.size in bytes (pipelined mode)
+        compression: Producer compression type: gzip, snappy, lz4 or zstd (pipelined mode)
+        max_in_flight: Max in-flight requests per connection (pipelined mode)
+        rate: Target msgs/sec; paces pipelined sends with a token bucket (implies pipelined)
+        burst: Token bucket size, i.e. most records sent back to back (default: rate/10)
+        ramp: Rate schedule "seconds:rate,..." (e.g. "0:100,60:5000"); overrides rate over time
+        speedup: Replay in event time (the Date column) this many times faster than
+            real time, e.g. 1, 60 or 3600 (implies pipelined)
+        loop: With speedup, repeat the dataset forever with timestamps shifted past its end
+        key_by: Message key: 'region', 'product_category', 'transaction_id' or None/'none'
+            (unkeyed). Records with the same key always land on the same partition.
+        serializer: Message value format, 'json' or 'binary' (see serializers.py)
+        workers: Stream the file from this many processes, each with its own producer
+            and byte range (sharded mode, implies pipelined; not combined with
+            rate control or event-time replay)
+        checkpoint: State file for resumable replay (implies pipelined). The last
+            contiguously acked record and its byte offset are saved every few
+            seconds; the next run seeks straight to that offset.
+        restart: Ignore an existing checkpoint and replay from the first row
     """
     
     # Kafka configuration
     KAFKA_BOOTSTRAP_SERVERS = os.getenv('KAFKA_BOOTSTRAP_SERVERS', 'localhost:9092')
     
+    schedule = RateSchedule.parse(ramp) if ramp else None
+    limiter = None
+    if speedup or checkpoint or (workers and workers > 1):
+        pipelined = True
+    # main() rejects rate control with --speedup/--workers; a checkpointed replay is still paced
+    if (rate or schedule) and not speedup:
+        pipelined = True
+        if schedule:
+            # Size the default burst for the peak of the ramp, not its start
+            burst = burst or max(1.0, max(r for _, r in schedule.points) / 10)
+            rate = schedule.rate_at(0)
+        limiter = TokenBucket(rate, burst)
+    
     print("╔════════════════════════════════════════════════════════════╗")
     print("║          Kafka Transaction Streamer                        ║")
     print("╚════════════════════════════════════════════════════════════╝\n")
@@ -35,29 +163,60 @@ def stream_to_kafka(csv_file, topic='ecommerce-transactions', delay=2, batch_siz
     print(f"📡 Kafka Bootstrap: {KAFKA_BOOTSTRAP_SERVERS}")
     print(f"📌 Topic: {topic}")
     print(f"📊 Source: {csv_file}")
-    print(f"⏱️  Delay: {delay} seconds/batch")
-    print(f"📦 Batch size: {batch_size} records\n")
+    print(f"🧾 Format: {serializer}")
+    print(f"🔑 Key: {key_by if key_by and key_by != 'none' else 'none (unkeyed)'}")
+    if pipelined:
+        print(f"🚀 Pipelined: linger.ms={linger_ms}, batch.size={producer_batch_size:,} bytes, "
+              f"compression={compression or 'none'}, max in-flight={max_in_flight}")
+        if schedule:
+            print(f"🎚️  Rate ramp: {' → '.join(f'{r:,.0f}/s @ {t:g}s' for t, r in schedule.points)}, "
+                  f"burst {limiter.burst:,.0f}")
+        elif limiter:
+            print(f"🎚️  Rate limit: {rate:,.0f} msgs/sec, burst {limiter.burst:,.0f}")
+        if speedup:
+            print(f"⏩ Event-time replay: {speedup:g}x real time{', looping with shifted dates' if loop else ''}")
+        print()
+    else:
+        print(f"⏱️  Delay: {delay} seconds/batch")
+        print(f"📦 Batch size: {batch_size} records\n")
     
     # Check if file exists
     if not os.path.exists(csv_file):
         print(f"❌ Error: File not found: {csv_file}")
         return
     
-    # Read the CSV
-    print(f"📖 Loading data from CSV...")
-    df = pd.read_csv(csv_file)
-    total_records = len(df)
-    print(f"✓ Loaded {total_records:,} records\n")
+    producer_config = build_producer_config(KAFKA_BOOTSTRAP_SERVERS, serializer, key_by, pipelined, linger_ms,
+                                            producer_batch_size, compression, max_in_flight)
+    
+    if workers and workers > 1:
+        stream_sharded(csv_file, topic, workers, producer_config, key_by)
+        return
+    
+    replay = None
+    if checkpoint:
+        # Resumable replay reads the file directly from the saved offset
+        replay = ReplayCheckpoint(checkpoint, csv_file, csv_data_start(csv_file), restart)
+        if replay.resumed:
+            print(f"♻️  Resuming after record {replay.record_number:,} (byte offset {replay.offset:,}) from {checkpoint}")
+        total_records = count_rows(csv_file, replay.offset)
+        print(f"✓ {total_records:,} records left to send\n")
+        transactions = replay.wrap(iter_csv_records(csv_file, replay.offset, replay.record_number + 1))
+    else:
+        # Read the CSV
+        print(f"📖 Loading data from CSV...")
+        df = pd.read_csv(csv_file)
+        total_records = len(df)
+        print(f"✓ Loaded {total_records:,} records\n")
+        transactions = iter_transactions(df)
+    
+    records_sent = 0
+    tracker = DeliveryTracker(track_keys=key_by in ('region', 'product_category'), track_records=replay is not None)
+    start_time = time.time()
     
     try:
         # Create Kafka producer
         print("🔌 Connecting to Kafka...")
-        producer = KafkaProducer(
-            bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS,
-            value_serializer=lambda v: json.dumps(v).encode('utf-8'),
-            acks='all',
-            retries=3
-        )
+        producer = KafkaProducer(**producer_config)
         print("✓ Connected to Kafka\n")
         
         print(f"{'='*60}")
@@ -65,47 +224,37 @@ def stream_to_kafka(csv_file, topic='ecommerce-transactions', delay=2, batch_siz
         print('='*60)
         print("Press Ctrl+C to stop\n")
         
-        records_sent = 0
-        
-        # Stream records
-        for idx, row in df.iterrows():
-            # Create transaction record with metadata
-            transaction = {
-                'transaction_id': str(row['Transaction ID']),
-                'date': str(row['Date']),
-                'product_category': str(row['Product Category']),
-                'product_name': str(row['Product Name']),
-                'units_sold': int(row['Units Sold']),
-                'unit_price': float(row['Unit Price']),
-                'total_revenue': float(row['Total Revenue']),
-                'region': str(row['Region']),
-                'payment_method': str(row['Payment Method']),
-                # Add streaming metadata
-                'streaming_timestamp': datetime.now().isoformat(),
-                'record_number': idx + 1,
-                'event_type': 'NEW_ORDER'
-            }
-            
-            # Send to Kafka
-            future = producer.send(topic, value=transaction)
-            
-            try:
-                record_metadata = future.get(timeout=10)
-                records_sent += 1
+        if speedup:
+            stream_event_time(producer, topic, event_time_bursts(df), speedup, loop, tracker, key_by)
+            records_sent = tracker.snapshot()[1]
+        elif pipelined:
+            stream_pipelined(producer, topic, transactions, total_records, tracker, limiter, schedule, key_by, replay)
+            records_sent = tracker.snapshot()[1]
+        else:
+            # Stream records
+            for transaction in transactions:
+                # Send to Kafka
+                key = record_key(transaction, key_by)
+                future = producer.send(topic, key=key, value=transaction)
+                tracker.track(future, transaction['record_number'], key)
                 
-                # Print progress
-                if records_sent % batch_size == 0 or records_sent == total_records:
-                    progress_pct = (records_sent / total_records) * 100
-                    print(f"✓ Sent {records_sent:,}/{total_records:,} records ({progress_pct:.1f}%) - "
-                          f"Partition: {record_metadata.partition}, "
-                          f"Offset: {record_metadata.offset}")
+                try:
+                    record_metadata = future.get(timeout=10)
+                    records_sent += 1
                     
-                    # Sleep between batches
-                    if records_sent < total_records:
-                        time.sleep(delay)
+                    # Print progress
+                    if records_sent % batch_size == 0 or records_sent == total_records:
+                        progress_pct = (records_sent / total_records) * 100
+                        print(f"✓ Sent {records_sent:,}/{total_records:,} records ({progress_pct:.1f}%) - "
+                              f"Partition: {record_metadata.partition}, "
+                              f"Offset: {record_metadata.offset}")
+                        
+                        # Sleep between batches
+                        if records_sent < total_records:
+                            time.sleep(delay)
                 
-            except KafkaError as e:
-                print(f"❌ Failed to send record {idx}: {e}")
+                except KafkaError as e:
+                    print(f"❌ Failed to send record {transaction['record_number'] - 1}: {e}")
         
         # Ensure all messages are sent
         producer.flush()
@@ -114,19 +263,438 @@ def stream_to_kafka(csv_file, topic='ecommerce-transactions', delay=2, batch_siz
         print("STREAMING COMPLETED")
         print('='*60)
         print(f"✅ Successfully streamed {records_sent:,} records to topic '{topic}'")
-        print(f"📊 Total time: {records_sent * delay / 60:.1f} minutes (estimated)")
-        
+        if pipelined:
+            elapsed = time.time() - start_time
+            _, _, failed = tracker.snapshot()
+            print(f"📊 Total time: {elapsed:.1f}s ({records_sent / elapsed if elapsed else 0:,.0f} msgs/sec)")
+            if failed:
+                print(f"❌ {failed:,} records failed (last: {tracker.last_error})")
+        else:
+            print(f"📊 Total time: {records_sent * delay / 60:.1f} minutes (estimated)")
+        print("📊 Partition spread:")
+        for line in tracker.partitions.report(len(producer.partitions_for(topic) or ())):
+            print(line)
+    
     except KeyboardInterrupt:
+        if pipelined:
+            records_sent = tracker.snapshot()[1]
         print(f"\n\n⚠️  Streaming interrupted by user")
-        print(f"📊 Sent {records_sent:,}/{total_records:,} records before stopping")
-        
+        if loop:
+            print(f"📊 Sent {records_sent:,} records ({records_sent / total_records if total_records else 0:.1f} passes) before stopping")
+        else:
+            print(f"📊 Sent {records_sent:,}/{total_records:,} records before stopping")
+    
     except Exception as e:
         print(f"\n❌ Error: {e}")
-        
+    
     finally:
         if 'producer' in locals():
             producer.close()
             print("\n🔌 Kafka producer closed")
+        if replay:
+            # close() flushed everything still in flight, so save the final position
+            with tracker.lock:
+                replay.update(tracker.acked_records)
+            replay.save()
+            print(f"💾 Checkpoint: record {replay.record_number:,}, byte offset {replay.offset:,} ({checkpoint})")
+
+def build_producer_config(bootstrap_servers, serializer='json', key_by=None, pipelined=False, linger_ms=20,
+                          producer_batch_size=256 * 1024, compression=None, max_in_flight=5):
+    """
+    KafkaProducer keyword arguments
+    
+    Only module-level functions are used as serializers, so the config can
+    be pickled and handed to sharded-mode worker processes.
+    """
+    producer_config = {
+        'bootstrap_servers': bootstrap_servers,
+        'value_serializer': get_serializer(serializer),
+        'acks': 'all',
+        'retries': 3
+    }
+    if key_by and key_by != 'none':
+        producer_config['key_serializer'] = encode_key
+    if pipelined:
+        producer_config.update({
+            'linger_ms': linger_ms,
+            'batch_size': producer_batch_size,
+            'compression_type': compression,
+            'max_in_flight_requests_per_connection': max_in_flight
+        })
+    return producer_config
+
+def stream_pipelined(producer, topic, transactions, total_records, tracker, limiter=None, schedule=None, key_by=None,
+                     checkpoint=None):
+    """
+    Send every transaction without blocking on acks
+    
+    Progress comes from the tracker's delivery counters. The final flush
+    waits for all outstanding records, so with acks='all' every counted
+    record is durably written before this returns.
+    
+    With a limiter each send first takes a token; with a schedule the
+    limiter's rate follows it. Progress lines then also compare the rate
+    achieved over the last interval with the target.
+    
+    With a checkpoint the acked position is saved every CHECKPOINT_INTERVAL.
+    """
+    start = last_report = time.monotonic()
+    last_sent = 0
+    for transaction in transactions:
+        if limiter:
+            while not limiter.acquire(timeout=0.1):
+                # Rate is 0 for now; keep following the schedule
+                if schedule:
+                    limiter.set_rate(schedule.rate_at(time.monotonic() - start))
+        key = record_key(transaction, key_by)
+        future = producer.send(topic, key=key, value=transaction)
+        tracker.track(future, transaction['record_number'], key)
+        
+        now = time.monotonic()
+        if schedule:
+            limiter.set_rate(schedule.rate_at(now - start))
+        if now - last_report >= PROGRESS_INTERVAL:
+            target = None
+            if limiter:
+                # Average target over the interval (exact for a linear ramp segment)
+                target = (schedule.rate_at(last_report - start) + schedule.rate_at(now - start)) / 2 if schedule else limiter.rate
+            last_sent = report_progress(tracker, total_records, target, now - last_report, last_sent)
+            last_report = now
+            if checkpoint and checkpoint.due():
+                with tracker.lock:
+                    checkpoint.update(tracker.acked_records)
+                checkpoint.save()
+    
+    producer.flush()
+    report_progress(tracker, total_records)
+    if limiter:
+        elapsed = time.monotonic() - start
+        print(f"🎚️  Achieved {tracker.snapshot()[0] / elapsed if elapsed else 0:,.0f} msgs/sec overall "
+              f"(final target {limiter.rate:,.0f} msgs/sec)")
+
+def event_time_bursts(df):
+    """
+    Group transactions by event time (the Date column), earliest first
+    
+    Returns:
+        list of (Timestamp, [transaction, ...]); rows without a valid date are dropped
+    """
+    event_times = pd.to_datetime(df['Date'], errors='coerce')
+    df = df.assign(_event_time=event_times).dropna(subset=['_event_time'])
+    df = df.sort_values('_event_time', kind='stable')
+    transactions = iter_transactions(df)
+    return [
+        (event_time, list(islice(transactions, count)))
+        for event_time, count in df['_event_time'].value_counts(sort=False).sort_index().items()
+    ]
+
+def _format_event_time(ts):
+    """Dates stay YYYY-MM-DD like the CSV; anything finer keeps its time of day"""
+    return ts.strftime('%Y-%m-%d') if ts == ts.normalize() else ts.isoformat(sep=' ')
+
+def stream_event_time(producer, topic, bursts, speedup, loop, tracker, key_by=None):
+    """
+    Replay transactions at their original inter-arrival times, sped up
+    
+    Every record sharing an event time is due at the same wall-clock
+    instant and goes out as one burst of non-blocking sends. Gaps between
+    event times are slept through at 1/speedup of their real length; if
+    sending falls behind, the following bursts go out immediately until
+    the replay catches up, so the schedule never drifts.
+    
+    With loop, each pass is shifted forward by the dataset's span plus its
+    smallest gap, so event times keep increasing. Later passes also get a
+    "-L<pass>" suffix on transaction_id so keys stay unique downstream.
+    """
+    if not bursts:
+        return
+    first = bursts[0][0]
+    gaps = [b[0] - a[0] for a, b in zip(bursts, bursts[1:])]
+    period = bursts[-1][0] - first + (min(gaps) if gaps else pd.Timedelta(days=1))
+    
+    start = last_report = time.monotonic()
+    record_number = 0
+    loop_number = 0
+    while True:
+        shift = period * loop_number
+        for event_time, transactions in bursts:
+            due = start + (event_time - first + shift).total_seconds() / speedup
+            while True:
+                now = time.monotonic()
+                if now - last_report >= PROGRESS_INTERVAL:
+                    report_event_time(tracker, event_time + shift, loop_number, now - due)
+                    last_report = now
+                if now >= due:
+                    break
+                time.sleep(min(due - now, PROGRESS_INTERVAL))
+            
+            streaming_timestamp = datetime.now().isoformat()
+            for transaction in transactions:
+                record_number += 1
+                message = dict(transaction, streaming_timestamp=streaming_timestamp, record_number=record_number)
+                if loop_number:
+                    message['transaction_id'] = f"{transaction['transaction_id']}-L{loop_number}"
+                    message['date'] = _format_event_time(event_time + shift)
+                key = record_key(message, key_by)
+                future = producer.send(topic, key=key, value=message)
+                tracker.track(future, record_number, key)
+        
+        loop_number += 1
+        if not loop:
+            break
+    
+    producer.flush()
+    report_event_time(tracker, bursts[-1][0] + period * (loop_number - 1), loop_number - 1, 0)
+
+def report_event_time(tracker, event_time, loop_number, lag):
+    sent, acked, failed = tracker.snapshot()
+    behind = f", {lag:.1f}s behind schedule" if lag > 1 else ""
+    print(f"✓ Acked {acked:,} records - event time {_format_event_time(event_time)} "
+          f"(pass {loop_number + 1}){behind} - in flight: {sent - acked - failed:,}, failed: {failed:,}")
+
+def _align_to_line(f, pos, data_start, size):
+    """First line start at or after pos"""
+    if pos <= data_start:
+        return data_start
+    if pos >= size:
+        return size
+    f.seek(pos - 1)
+    if f.read(1) != b'\n':
+        f.readline()
+        return min(f.tell(), size)
+    return pos
+
+def _count_lines(f, start, end):
+    """Lines in [start, end) of an open binary file, counting a final line without a newline"""
+    f.seek(start)
+    rows = 0
+    remaining = end - start
+    last = b''
+    while remaining > 0:
+        block = f.read(min(SHARD_BLOCK_BYTES, remaining))
+        if not block:
+            break
+        rows += block.count(b'\n')
+        remaining -= len(block)
+        last = block[-1:]
+    if end > start and last != b'\n':
+        rows += 1  # Final line without a trailing newline
+    return rows
+
+def csv_data_start(csv_file):
+    """Byte offset of the first row after the header"""
+    with open(csv_file, 'rb') as f:
+        f.readline()
+        return f.tell()
+
+def count_rows(csv_file, start):
+    """Rows from byte offset `start` (a line start) to the end of the file"""
+    with open(csv_file, 'rb') as f:
+        return _count_lines(f, start, os.path.getsize(csv_file))
+
+def iter_csv_records(csv_file, offset, record_number=1):
+    """
+    Yield (end offset, transaction) for each row from byte offset `offset`
+    
+    The end offset is where the next row starts, i.e. the resume point once
+    this row is acknowledged. Nothing before `offset` is read or parsed.
+    """
+    with open(csv_file, 'rb') as f:
+        columns = next(csv.reader([f.readline().decode('utf-8')]))
+        index = [columns.index(name) for name in CSV_COLUMNS]
+        f.seek(max(offset, f.tell()))
+        offset = f.tell()
+        while True:
+            block = f.read(SHARD_BLOCK_BYTES)
+            if not block:
+                break
+            if not block.endswith(b'\n'):
+                block += f.readline()
+            lines = block.splitlines(keepends=True)
+            for line, row in zip(lines, csv.reader(line.decode('utf-8') for line in lines)):
+                offset += len(line)
+                if row:
+                    yield offset, make_transaction([row[i] for i in index], record_number)
+                    record_number += 1
+
+def plan_shards(csv_file, workers):
+    """
+    Cut a CSV file into line-aligned byte ranges, one per worker
+    
+    Lines are counted per range (a fast newline count, no parsing), so each
+    worker knows the record_number of its first row and numbering matches
+    a single-process replay.
+    
+    Returns:
+        (header columns, [(start, end, first record_number, rows), ...])
+    """
+    size = os.path.getsize(csv_file)
+    with open(csv_file, 'rb') as f:
+        header = f.readline()
+        data_start = f.tell()
+        span = size - data_start
+        bounds = [_align_to_line(f, data_start + span * i // workers, data_start, size) for i in range(workers + 1)]
+        shards = []
+        first_record = 1
+        for start, end in zip(bounds, bounds[1:]):
+            rows = _count_lines(f, start, end)
+            shards.append((start, end, first_record, rows))
+            first_record += rows
+    columns = next(csv.reader([header.decode('utf-8')]))
+    return columns, shards
+
+def iter_shard_rows(csv_file, columns, start, end):
+    """Yield each row in [start, end) as values in CSV_COLUMNS order (C csv parser, no pandas)"""
+    index = [columns.index(name) for name in CSV_COLUMNS]
+    with open(csv_file, 'rb') as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = f.read(min(SHARD_BLOCK_BYTES, remaining))
+            remaining -= len(block)
+            if remaining > 0 and not block.endswith(b'\n'):
+                tail = f.readline()
+                remaining -= len(tail)
+                block += tail
+            for row in csv.reader(io.StringIO(block.decode('utf-8'))):
+                if row:
+                    yield [row[i] for i in index]
+
+_worker_counters = None
+
+def _init_shard_worker(counters):
+    global _worker_counters
+    _worker_counters = counters
+
+def _stream_shard(csv_file, topic, columns, shard, worker, producer_config, key_by):
+    """
+    Stream one byte range with its own producer
+    
+    Runs inside a worker process. Sent/acked/failed counts are published to
+    the shared counters array (3 slots per worker) for the parent to report.
+    
+    Returns:
+        (PartitionStats, failed count, last error)
+    """
+    start, end, record_number, _ = shard
+    tracker = DeliveryTracker(track_keys=key_by in ('region', 'product_category'))
+    producer = KafkaProducer(**producer_config)
+    slot = worker * 3
+
+    def publish():
+        _worker_counters[slot:slot + 3] = list(tracker.snapshot())
+    
+    last_publish = time.monotonic()
+    try:
+        for row in iter_shard_rows(csv_file, columns, start, end):
+            transaction = make_transaction(row, record_number)
+            key = record_key(transaction, key_by)
+            future = producer.send(topic, key=key, value=transaction)
+            tracker.track(future, record_number, key)
+            record_number += 1
+            if record_number % 1000 == 0:
+                now = time.monotonic()
+                if now - last_publish >= PROGRESS_INTERVAL / 4:
+                    publish()
+                    last_publish = now
+        producer.flush()
+    finally:
+        producer.close()
+        publish()
+    return tracker.partitions, tracker.failed, tracker.last_error
+
+def stream_sharded(csv_file, topic, workers, producer_config, key_by=None):
+    """
+    Stream a CSV file to Kafka from several processes at once
+    
+    Each worker parses its own line-aligned byte range with the csv module
+    and sends through its own pipelined producer, so a bulk backfill scales
+    with cores instead of one GIL-bound loop. The parent only aggregates:
+    it prints total and per-worker ack rates while the workers run.
+    Ordering is only kept within a shard (and, when keyed, per key within a shard).
+    """
+    print(f"🧩 Sharded mode: {workers} worker processes, one producer each")
+    columns, shards = plan_shards(csv_file, workers)
+    missing = [name for name in CSV_COLUMNS if name not in columns]
+    if missing:
+        print(f"❌ Error: CSV is missing columns: {', '.join(missing)}")
+        return
+    total_records = sum(shard[3] for shard in shards)
+    print(f"✓ Planned {total_records:,} records in {len(shards)} byte ranges\n")
+    
+    print(f"{'='*60}")
+    print("STREAMING STARTED")
+    print('='*60)
+    print("Press Ctrl+C to stop\n")
+    
+    counters = multiprocessing.Array('q', workers * 3, lock=False)
+    partitions = PartitionStats(track_keys=key_by in ('region', 'product_category'))
+    failed = 0
+    last_error = None
+    start = last_report = time.monotonic()
+    previous = [0] * workers
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_shard_worker, initargs=(counters,)) as pool:
+            futures = [
+                pool.submit(_stream_shard, csv_file, topic, columns, shard, worker, producer_config, key_by)
+                for worker, shard in enumerate(shards)
+            ]
+            while not all(future.done() for future in futures):
+                time.sleep(0.1)
+                now = time.monotonic()
+                if now - last_report >= PROGRESS_INTERVAL:
+                    previous = report_shards(counters, total_records, previous, now - last_report)
+                    last_report = now
+            for future in futures:
+                worker_partitions, worker_failed, worker_error = future.result()
+                partitions.merge(worker_partitions)
+                failed += worker_failed
+                last_error = worker_error or last_error
+    except KeyboardInterrupt:
+        print(f"\n\n⚠️  Streaming interrupted by user")
+        acked = sum(counters[w * 3 + 1] for w in range(workers))
+        print(f"📊 Sent {acked:,}/{total_records:,} records before stopping")
+        return
+    
+    elapsed = time.monotonic() - start
+    report_shards(counters, total_records, previous, time.monotonic() - last_report)
+    acked = sum(partitions.partitions.values())
+    print(f"\n{'='*60}")
+    print("STREAMING COMPLETED")
+    print('='*60)
+    print(f"✅ Successfully streamed {acked:,} records to topic '{topic}'")
+    print(f"📊 Total time: {elapsed:.1f}s ({acked / elapsed if elapsed else 0:,.0f} msgs/sec)")
+    if failed:
+        print(f"❌ {failed:,} records failed (last: {last_error})")
+    print("📊 Partition spread:")
+    for line in partitions.report():
+        print(line)
+
+def report_shards(counters, total_records, previous, interval):
+    """Print aggregate progress and per-worker ack rates; returns the acked counts"""
+    workers = len(counters) // 3
+    sent = sum(counters[w * 3] for w in range(workers))
+    acked = [counters[w * 3 + 1] for w in range(workers)]
+    failed = sum(counters[w * 3 + 2] for w in range(workers))
+    total_acked = sum(acked)
+    progress_pct = (total_acked / total_records) * 100 if total_records else 100
+    rates = [(a - p) / interval if interval else 0 for a, p in zip(acked, previous)]
+    print(f"✓ Acked {total_acked:,}/{total_records:,} records ({progress_pct:.1f}%) - "
+          f"{sum(rates):,.0f} msgs/sec, in flight: {sent - total_acked - failed:,}, failed: {failed:,}")
+    print(f"    per worker: {', '.join(f'{rate:,.0f}' for rate in rates)} msgs/sec")
+    return acked
+
+def report_progress(tracker, total_records, target=None, interval=None, last_sent=0):
+    """Print one progress line; returns the sent count for the next interval"""
+    sent, acked, failed = tracker.snapshot()
+    progress_pct = (acked / total_records) * 100 if total_records else 100
+    line = (f"✓ Acked {acked:,}/{total_records:,} records ({progress_pct:.1f}%) - "
+            f"in flight: {sent - acked - failed:,}, failed: {failed:,}")
+    if target is not None and interval:
+        achieved = (sent - last_sent) / interval
+        line += f" - rate {achieved:,.0f}/{target:,.0f} msgs/sec ({achieved / target * 100 if target else 0:.0f}% of target)"
+    print(line)
+    return sent
 
 def main():
     parser = argparse.ArgumentParser(description='Stream CSV data to Kafka')
@@ -134,15 +702,54 @@ def main():
     parser.add_argument('topic', nargs='?', default='ecommerce-transactions', help='Kafka topic name')
     parser.add_argument('--delay', type=float, default=2, help='Seconds between batches (default: 2)')
     parser.add_argument('--batch-size', type=int, default=1, help='Records per batch (default: 1)')
+    parser.add_argument('--serializer', choices=list(SERIALIZERS), default='json',
+                        help='Message format: json, or compact schema-based binary (default: json)')
+    parser.add_argument('--workers', type=int, help='Sharded mode: stream byte ranges of the CSV from N processes')
+    parser.add_argument('--checkpoint', help='State file for resumable replay; rerun with the same file to resume')
+    parser.add_argument('--restart', action='store_true', help='Ignore an existing --checkpoint and start from the first row')
+    parser.add_argument('--key-by', choices=KEY_STRATEGIES, default='none',
+                        help='Message key, so each key stays on one partition (default: none)')
+    
+    pipelined = parser.add_argument_group('pipelined mode (high throughput)')
+    pipelined.add_argument('--pipelined', action='store_true', help='Send without waiting for each ack')
+    pipelined.add_argument('--linger-ms', type=int, default=20, help='Producer linger.ms (default: 20)')
+    pipelined.add_argument('--producer-batch-bytes', type=int, default=256 * 1024, help='Producer batch.size (default: 262144)')
+    pipelined.add_argument('--compression', choices=['gzip', 'snappy', 'lz4', 'zstd'], help='Producer compression type')
+    pipelined.add_argument('--max-in-flight', type=int, default=5, help='Max in-flight requests per connection (default: 5)')
+    
+    limited = parser.add_argument_group('rate control (implies pipelined mode)')
+    limited.add_argument('--rate', type=float, help='Target messages per second')
+    limited.add_argument('--burst', type=float, help='Most messages sent back to back (default: rate/10)')
+    limited.add_argument('--ramp', help='Rate schedule "seconds:rate,...", e.g. "0:100,60:5000,300:5000"')
+    
+    replay = parser.add_argument_group('event-time replay (implies pipelined mode)')
+    replay.add_argument('--speedup', type=float, help='Replay Date inter-arrival times this many times faster (e.g. 1, 60, 3600)')
+    replay.add_argument('--loop', action='store_true', help='Repeat the dataset forever with dates shifted past its end')
     
     args = parser.parse_args()
     
+    if args.loop and not args.speedup:
+        parser.error('--loop requires --speedup')
+    if args.speedup and (args.rate or args.ramp):
+        parser.error('--speedup replays event time and cannot be combined with --rate or --ramp')
+    if args.rate is not None and args.rate <= 0:
+        parser.error('--rate must be positive (omit it for no limit)')
+    if args.burst is not None and args.burst < 1:
+        parser.error('--burst must be at least 1')
+    if args.workers and args.workers > 1 and (args.speedup or args.rate or args.ramp):
+        parser.error('--workers cannot be combined with --speedup, --rate or --ramp')
+    if args.checkpoint and (args.speedup or (args.workers and args.workers > 1)):
+        parser.error('--checkpoint cannot be combined with --speedup or --workers')
+    
     # Use default file if not provided
     if not args.csv_file:
         data_dir = Path("/shared-data") if os.path.exists("/shared-data") else Path("shared-data")
         args.csv_file = str(data_dir / "transactions_realtime.csv")
     
-    stream_to_kafka(args.csv_file, args.topic, args.delay, args.batch_size)
+    stream_to_kafka(args.csv_file, args.topic, args.delay, args.batch_size, args.pipelined,
+                    args.linger_ms, args.producer_batch_bytes, args.compression, args.max_in_flight,
+                    args.rate, args.burst, args.ramp, args.speedup, args.loop, args.key_by,
+                    args.serializer, args.workers, args.checkpoint, args.restart)
 
 if __name__ == "__main__":
     main()
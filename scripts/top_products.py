@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Streaming Top Products
+Approximate top-K products by revenue and units over sliding event-time windows, from the Kafka stream
+
+Each window ("5m", "1h", ... or "all") ranks products with a count-min
+sketch plus a min-heap (sketches.TopK), so memory is fixed whatever the
+product cardinality: per pane of --pane-seconds there is one sketch and a
+short candidate heap per metric, and each window keeps a running sum of its
+panes' sketches. Sliding forward subtracts the panes that leave a window;
+a query re-estimates the union of its panes' candidates against that sum.
+
+Estimates never undercount and overcount by at most e / --width of the
+window's total (with probability 1 - exp(-depth)).
+
+The service writes a JSON snapshot of every window's ranking for the
+dashboard; load_snapshot() / query_snapshot() read it back.
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from kafka import KafkaConsumer
+
+from serializers import deserialize
+from sketches import CountMinSketch, TopK, hash64
+from window_aggregator import event_view, format_time
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+TOPIC = 'ecommerce-transactions'
+METRICS = ['revenue', 'units']
+UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Seconds between throughput log lines
+REPORT_INTERVAL = 5.0
+
+def default_snapshot_path():
+    data_dir = Path("/shared-data") if os.path.exists("/shared-data") else Path("shared-data")
+    return data_dir / "top_products.json"
+
+def parse_window(text):
+    """Window length in seconds from '300', '5m', '1h', '7d'; None for 'all'"""
+    text = text.strip().lower()
+    if text == 'all':
+        return None
+    if text[-1:] in UNITS:
+        return int(text[:-1]) * UNITS[text[-1]]
+    return int(text)
+
+def window_label(seconds):
+    if seconds is None:
+        return 'all'
+    for suffix in ('d', 'h', 'm'):
+        if seconds % UNITS[suffix] == 0:
+            return f"{seconds // UNITS[suffix]}{suffix}"
+    return f"{seconds}s"
+
+class WindowedTopK:
+    """
+    Top-K products per window, ending at the newest event time seen
+
+    Args:
+        windows: Window lengths in seconds (multiples of pane_seconds);
+            None for one all-time ranking
+        pane_seconds: Granularity at which windows slide
+        k: Products returned per query
+        candidates: Heap size kept per pane (default 4 * k); a product has to
+            rank this high in some pane to be found in a window
+        width, depth: Count-min sketch shape
+    """
+
+    def __init__(self, windows=(300, 3600, None), pane_seconds=60, k=10, candidates=None, width=2048, depth=4):
+        self.spans = sorted(w for w in windows if w is not None)
+        if any(w <= 0 or w % pane_seconds for w in self.spans):
+            raise ValueError(f"Windows must be positive multiples of the pane length ({pane_seconds}s)")
+        self.windows = list(windows)
+        self.pane_seconds = pane_seconds
+        self.k = k
+        self.candidates = candidates or 4 * k
+        self.width = width
+        self.depth = depth
+        # pane start -> {metric: TopK}
+        self.panes = {}
+        # window -> {metric: sum of the sketches of the panes inside it}
+        self.sums = {w: {m: CountMinSketch(width, depth) for m in METRICS} for w in self.spans}
+        self.all_time = {m: TopK(k, width, depth) for m in METRICS} if None in windows else None
+        self.latest = None
+        self.events = 0
+        self.too_old = 0
+
+    def add(self, events):
+        """Add (event time, product, revenue, units) tuples"""
+        by_pane = {}
+        for event_time, product, revenue, units in events:
+            pane_start = int(event_time // self.pane_seconds * self.pane_seconds)
+            columns = by_pane.get(pane_start)
+            if columns is None:
+                columns = by_pane[pane_start] = ([], [], [])
+            columns[0].append(product)
+            columns[1].append(revenue)
+            columns[2].append(units)
+        if not by_pane:
+            return
+        newest = max(by_pane)
+        if self.latest is None or newest > self.latest:
+            self._slide(newest)
+
+        for pane_start, (products, revenue, units) in by_pane.items():
+            self.events += len(products)
+            # Sum per product and hash once; every sketch below shares the result
+            totals = pd.DataFrame({'revenue': revenue, 'units': units}, index=products).groupby(level=0, sort=False).sum()
+            keys = totals.index
+            hashes = hash64(pd.Series(keys))
+            weights = {m: totals[m].to_numpy(dtype=np.float64) for m in METRICS}
+            if self.all_time:
+                for metric in METRICS:
+                    self.all_time[metric].update_hashes(keys, hashes, weights[metric])
+            if not self.spans:
+                continue
+            if pane_start <= self.latest - self.spans[-1]:
+                self.too_old += len(products)
+                continue
+            pane = self.panes.get(pane_start)
+            if pane is None:
+                pane = self.panes[pane_start] = {m: TopK(self.candidates, self.width, self.depth) for m in METRICS}
+            for metric in METRICS:
+                pane[metric].update_hashes(keys, hashes, weights[metric])
+            for window in self.spans:
+                if pane_start > self.latest - window:
+                    for metric in METRICS:
+                        self.sums[window][metric].update_hashes(hashes, weights[metric])
+
+    def _slide(self, latest):
+        """Make `latest` the newest pane: subtract panes leaving each window, drop those past the longest"""
+        previous, self.latest = self.latest, latest
+        if previous is None:
+            return
+        for window in self.spans:
+            for pane_start, pane in self.panes.items():
+                if previous - window < pane_start <= latest - window:
+                    for metric in METRICS:
+                        self.sums[window][metric].subtract(pane[metric].sketch)
+        for pane_start in [p for p in self.panes if p <= latest - self.spans[-1]] if self.spans else []:
+            del self.panes[pane_start]
+
+    def query(self, window=None, metric='revenue', k=None):
+        """
+        Top products of a window (seconds, or None for all-time) ranked by metric
+
+        Returns:
+            list of {'product', 'revenue', 'units'} dicts (estimates), heaviest first
+        """
+        if window is None:
+            if self.all_time is None:
+                raise ValueError("No all-time window is tracked")
+            candidates = set(self.all_time[metric].members)
+            sketches = {m: self.all_time[m].sketch for m in METRICS}
+        else:
+            if window not in self.sums:
+                raise ValueError(f"Window {window_label(window)} is not tracked")
+            candidates = set()
+            for pane_start, pane in self.panes.items():
+                if pane_start > self.latest - window:
+                    candidates.update(pane[metric].members)
+            sketches = self.sums[window]
+        if not candidates:
+            return []
+        products = sorted(candidates)
+        # Subtracting panes can leave float residue around zero
+        estimates = {m: sketches[m].estimate(products).clip(min=0) for m in METRICS}
+        ranked = sorted(range(len(products)), key=lambda i: estimates[metric][i], reverse=True)
+        return [{'product': products[i], 'revenue': round(float(estimates['revenue'][i]), 2),
+                 'units': int(round(estimates['units'][i]))} for i in ranked[:k or self.k]]
+
+    def snapshot(self):
+        """Every window's rankings, for write_snapshot()"""
+        return {
+            'updated': time.time(),
+            'latest_event': format_time(self.latest + self.pane_seconds) if self.latest is not None else None,
+            'events': self.events,
+            'k': self.k,
+            'windows': {window_label(w): {m: self.query(w, m) for m in METRICS} for w in self.windows}
+        }
+
+    def memory_bytes(self):
+        """Bytes held by sketch counters (the heaps add at most a few entries per candidate)"""
+        sketches = [topk.sketch for pane in self.panes.values() for topk in pane.values()]
+        sketches += [sketch for sums in self.sums.values() for sketch in sums.values()]
+        sketches += [topk.sketch for topk in self.all_time.values()] if self.all_time else []
+        return sum(sketch.counts.nbytes for sketch in sketches)
+
+def write_snapshot(snapshot, path=None):
+    """Replace the snapshot file atomically so readers never see half of it"""
+    path = Path(path) if path else default_snapshot_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(snapshot, f)
+    os.replace(tmp, path)
+
+def load_snapshot(path=None, max_age=60):
+    """The latest snapshot, or None if there is none or it is older than max_age seconds"""
+    path = Path(path) if path else default_snapshot_path()
+    try:
+        with open(path) as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if max_age is not None and time.time() - snapshot.get('updated', 0) > max_age:
+        return None
+    return snapshot
+
+def query_snapshot(snapshot, window='all', metric='revenue', k=10):
+    """Top products of a snapshot window ('5m', '1h', 'all', ...), or [] if it has none"""
+    return snapshot['windows'].get(window, {}).get(metric, [])[:k]
+
+class TopProductsService:
+    """
+    Feeds a WindowedTopK from the transaction stream and writes snapshots
+
+    Uses no consumer group: rankings live in memory, so a restart rebuilds
+    them from the start of the topic (--from-beginning) or from new events.
+    """
+
+    def __init__(self, tracker, snapshot_path=None, snapshot_interval=5.0, from_beginning=False,
+                 bootstrap_servers='localhost:9092'):
+        self.tracker = tracker
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        self.from_beginning = from_beginning
+        self.bootstrap_servers = bootstrap_servers
+        self.consumer = None
+        self.rejected = 0
+
+    def connect(self):
+        try:
+            self.consumer = KafkaConsumer(
+                TOPIC,
+                bootstrap_servers=self.bootstrap_servers,
+                auto_offset_reset='earliest' if self.from_beginning else 'latest',
+                enable_auto_commit=False,
+                value_deserializer=lambda v: v  # Decoded per record so one bad message can be skipped
+            )
+            logger.info(f"✅ Consuming {TOPIC} from the {'beginning' if self.from_beginning else 'latest offset'}")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Failed to connect to Kafka: {e}")
+            return False
+
+    def decode(self, records):
+        for record in records:
+            try:
+                event = deserialize(record.value)
+                event_time, _, revenue, units = event_view(event)
+                yield event_time, event['product_name'], revenue, units
+            except Exception as e:
+                self.rejected += 1
+                logger.warning(f"⚠️  Skipping {record.topic}[{record.partition}]@{record.offset}: {e}")
+
+    def run(self, duration=None):
+        if not self.connect():
+            return
+        tracker = self.tracker
+        start = last_snapshot = last_report = time.monotonic()
+        reported = 0
+        try:
+            while not (duration and time.monotonic() - start >= duration):
+                batch = self.consumer.poll(timeout_ms=500)
+                if batch:
+                    tracker.add(self.decode(r for records in batch.values() for r in records))
+
+                now = time.monotonic()
+                if now - last_snapshot >= self.snapshot_interval:
+                    write_snapshot(tracker.snapshot(), self.snapshot_path)
+                    last_snapshot = now
+                if now - last_report >= REPORT_INTERVAL:
+                    leaders = tracker.query(tracker.windows[0], 'revenue', 3)
+                    logger.info(f"📊 {(tracker.events - reported) / (now - last_report):,.0f} events/s | "
+                                f"{len(tracker.panes)} panes, {tracker.memory_bytes() / 1024 ** 2:.1f} MB | "
+                                f"top {window_label(tracker.windows[0])}: "
+                                f"{', '.join(p['product'] for p in leaders) or '-'} | "
+                                f"too old {tracker.too_old:,}, rejected {self.rejected:,}")
+                    reported = tracker.events
+                    last_report = now
+        except KeyboardInterrupt:
+            logger.info("\n⚠️  Tracker stopped by user (Ctrl+C)")
+        finally:
+            if self.consumer:
+                self.consumer.close()
+            write_snapshot(tracker.snapshot(), self.snapshot_path)
+            logger.info(f"📊 Total: {tracker.events:,} events, snapshot in "
+                        f"{self.snapshot_path or default_snapshot_path()}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Track approximate top products by revenue and units over windows')
+    parser.add_argument('--window', action='append', metavar='LENGTH',
+                        help='Window ending at the newest event: "300", "5m", "1h" or "all"; '
+                             'repeatable (default: 5m, 1h and all)')
+    parser.add_argument('--pane-seconds', type=int, default=60, help='Step at which windows slide (default: 60)')
+    parser.add_argument('-k', type=int, default=10, help='Products per ranking (default: 10)')
+    parser.add_argument('--width', type=int, default=2048, help='Count-min sketch width (default: 2048)')
+    parser.add_argument('--depth', type=int, default=4, help='Count-min sketch depth (default: 4)')
+    parser.add_argument('--snapshot-interval', type=float, default=5.0,
+                        help='Seconds between dashboard snapshots (default: 5)')
+    parser.add_argument('--output', help='Snapshot file (default: shared-data/top_products.json)')
+    parser.add_argument('--from-beginning', action='store_true', help='Rebuild rankings from the start of the topic')
+    parser.add_argument('--duration', type=float, help='Stop after this many seconds (default: run until Ctrl+C)')
+    parser.add_argument('--bootstrap-servers', default='localhost:9092', help='Kafka brokers (default: localhost:9092)')
+    args = parser.parse_args()
+
+    try:
+        windows = [parse_window(w) for w in (args.window or ['5m', '1h', 'all'])]
+        tracker = WindowedTopK(windows, args.pane_seconds, args.k, width=args.width, depth=args.depth)
+    except ValueError as e:
+        parser.error(str(e))
+
+    print("╔════════════════════════════════════════════════════════════╗")
+    print("║          Streaming Top Products                            ║")
+    print("╚════════════════════════════════════════════════════════════╝\n")
+    print(f"🏆 Top {args.k} by revenue and units over: {', '.join(window_label(w) for w in windows)}")
+    print(f"🧮 Count-min sketch {args.width} x {args.depth}, panes of {args.pane_seconds}s\n")
+
+    TopProductsService(tracker, args.output, args.snapshot_interval, args.from_beginning,
+                       args.bootstrap_servers).run(args.duration)
+
+if __name__ == "__main__":
+    main()
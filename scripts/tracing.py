@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+End-to-End Latency Tracing
+Trace stamps on generated transactions, per-stage latency histograms, and a collector per sink path
+
+A traced event carries `trace_id` and `origin_ts` (epoch seconds at
+generate_transaction()). Each stage that sees a traced event appends a span
+(trace_id, transaction_id, stage, origin_ts, ts) to a JSON-lines file in the
+trace directory and keeps a latency histogram for its own summary:
+
+  kafka_ack     RealtimeStreamer, when the broker acknowledges the send
+  mysql_commit  RealtimeStreamer, after the INSERT is committed
+  dashboard     dashboard.py, one stamp per MySQL load (not per event)
+
+The collector joins these with the Flume kafka-agent's HDFS files (events
+are written as is, so their trace fields survive; the file's modification
+time is when it became visible) and reports p50/p99 per path. Tracing is
+opt-in and sampled, so the cost is one uuid and a few dict entries per
+traced event.
+"""
+
+import argparse
+import bisect
+import json
+import os
+import random
+import subprocess
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+from sketches import KLLSketch
+
+STAGES = ['kafka_ack', 'mysql_commit']
+HDFS_DIR = '/user/flume/kafka-transactions'
+DASHBOARD_FILE = 'dashboard.jsonl'
+
+# Buffered spans are appended to the span file every FLUSH_SPANS spans
+FLUSH_SPANS = 1000
+
+def default_trace_dir():
+    data_dir = Path("/shared-data") if os.path.exists("/shared-data") else Path("shared-data")
+    return data_dir / "traces"
+
+class Tracer:
+    """
+    Stamps a sample of events and records per-stage spans and histograms
+
+    Thread-safe: Kafka acks are recorded from the producer's network thread.
+
+    Args:
+        trace_dir: Directory for span files (default: shared-data/traces)
+        sample_rate: Fraction of events to trace (1.0 = all)
+        source: Name of the emitting program, part of the span file name
+    """
+
+    def __init__(self, trace_dir=None, sample_rate=1.0, source='realtime_stream'):
+        self.trace_dir = Path(trace_dir) if trace_dir else default_trace_dir()
+        self.trace_dir.mkdir(parents=True, exist_ok=True)
+        self.path = self.trace_dir / f"spans-{source}-{os.getpid()}.jsonl"
+        self.sample_rate = sample_rate
+        self.lock = threading.Lock()
+        self.traced = 0
+        self.pending = []
+        self.latencies = {stage: [] for stage in STAGES}
+        self.histograms = {stage: KLLSketch() for stage in STAGES}
+
+    def start(self, event):
+        """Stamp the event if it is sampled; returns whether it is traced"""
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return False
+        event['trace_id'] = uuid.uuid4().hex[:16]
+        event['origin_ts'] = round(time.time(), 6)
+        with self.lock:
+            self.traced += 1
+        return True
+
+    def record(self, stage, event, ts=None):
+        """Record that a traced event reached `stage` (now, or at epoch seconds `ts`)"""
+        self.record_batch(stage, (event,), ts)
+
+    def record_batch(self, stage, events, ts=None):
+        ts = ts or time.time()
+        with self.lock:
+            for event in events:
+                if 'trace_id' not in event:
+                    continue
+                self.pending.append({
+                    'trace_id': event['trace_id'],
+                    'transaction_id': event['transaction_id'],
+                    'stage': stage,
+                    'origin_ts': event['origin_ts'],
+                    'ts': round(ts, 6)
+                })
+                self.latencies[stage].append((ts - event['origin_ts']) * 1000)
+            if len(self.pending) >= FLUSH_SPANS:
+                self._flush()
+
+    def _flush(self):
+        if self.pending:
+            with open(self.path, 'a') as f:
+                f.write(''.join(json.dumps(span) + '\n' for span in self.pending))
+            self.pending = []
+        for stage, latencies in self.latencies.items():
+            if latencies:
+                self.histograms[stage].update(latencies)
+                self.latencies[stage] = []
+
+    def close(self):
+        with self.lock:
+            self._flush()
+
+    def summary(self):
+        """Lines with each stage's latency from generation, for logging"""
+        lines = [f"⏱️  Traced {self.traced:,} transactions (sample {self.sample_rate:g}), spans in {self.path}"]
+        for stage, histogram in self.histograms.items():
+            if histogram.n:
+                lines.append(f"  generate → {stage:<13} p50 {histogram.quantile(0.5):8.1f} ms, "
+                             f"p99 {histogram.quantile(0.99):8.1f} ms, max {histogram.max:8.1f} ms "
+                             f"({histogram.n:,} traces)")
+        return lines
+
+def record_dashboard_load(query_ts, loaded_ts, rows, trace_dir=None):
+    """
+    Stamp one dashboard data load
+
+    query_ts is when the MySQL query started, so every row committed before
+    it is on screen by loaded_ts. A no-op until a Tracer has created the
+    trace directory, so an untraced pipeline writes nothing.
+    """
+    trace_dir = Path(trace_dir) if trace_dir else default_trace_dir()
+    if not trace_dir.is_dir():
+        return
+    with open(trace_dir / DASHBOARD_FILE, 'a') as f:
+        f.write(json.dumps({'query_ts': round(query_ts, 6), 'ts': round(loaded_ts, 6), 'rows': rows}) + '\n')
+
+def _read_jsonl(path):
+    records = []
+    with open(path) as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue  # Torn last line of a file still being written
+    return records
+
+def load_spans(trace_dir, since=None):
+    """All spans in the trace directory, optionally only events generated after epoch `since`"""
+    spans = []
+    for path in sorted(Path(trace_dir).glob('spans-*.jsonl')):
+        spans.extend(s for s in _read_jsonl(path) if since is None or s['origin_ts'] >= since)
+    return spans
+
+def dashboard_latencies(commits, loads):
+    """
+    Generation -> on the dashboard, for each committed event
+
+    An event is shown by the first load whose query started after its
+    commit. Returns (latencies in ms, events not shown yet).
+    """
+    loads = sorted((load['query_ts'], load['ts']) for load in loads)
+    query_times = [query_ts for query_ts, _ in loads]
+    latencies, waiting = [], 0
+    for span in commits:
+        i = bisect.bisect_left(query_times, span['ts'])
+        if i == len(loads):
+            waiting += 1
+        else:
+            latencies.append((loads[i][1] - span['origin_ts']) * 1000)
+    return latencies, waiting
+
+def _hdfs(*args):
+    result = subprocess.run(['docker', 'exec', 'namenode', 'hdfs', 'dfs', *args],
+                            capture_output=True, text=True, timeout=120)
+    return result.stdout
+
+def hdfs_latencies(since, hdfs_dir=HDFS_DIR):
+    """
+    Generation -> visible in HDFS, for traced events in the Flume output
+
+    Files still open (.tmp) are skipped; a closed file's modification time
+    is when its events became readable, so the roll interval shows up here.
+    """
+    listing = _hdfs('-ls', '-R', hdfs_dir)
+    files = [line.split()[-1] for line in listing.splitlines()
+             if line.startswith('-') and not line.endswith('.tmp')]
+    if not files:
+        return []
+    mtimes = [int(t) / 1000 for t in _hdfs('-stat', '%Y', *files).split()]
+    latencies = []
+    for path, mtime in zip(files, mtimes):
+        if mtime < since:
+            continue
+        for line in _hdfs('-cat', path).splitlines():
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(event, dict) and 'trace_id' in event and event['origin_ts'] >= since:
+                latencies.append((mtime - event['origin_ts']) * 1000)
+    return latencies
+
+def collect(trace_dir=None, since=None, hdfs=True):
+    """
+    End-to-end latencies per path
+
+    Returns:
+        dict of path name -> (latencies in ms, traces not arrived yet or None)
+    """
+    trace_dir = Path(trace_dir) if trace_dir else default_trace_dir()
+    spans = load_spans(trace_dir, since)
+    by_stage = {stage: [s for s in spans if s['stage'] == stage] for stage in STAGES}
+    paths = {
+        'Kafka ack': ([(s['ts'] - s['origin_ts']) * 1000 for s in by_stage['kafka_ack']], None),
+        'MySQL commit': ([(s['ts'] - s['origin_ts']) * 1000 for s in by_stage['mysql_commit']], None)
+    }
+    dashboard_file = trace_dir / DASHBOARD_FILE
+    if dashboard_file.exists():
+        paths['Dashboard'] = dashboard_latencies(by_stage['mysql_commit'], _read_jsonl(dashboard_file))
+    if hdfs and spans:
+        earliest = min(s['origin_ts'] for s in spans)
+        try:
+            paths['HDFS (Flume)'] = (hdfs_latencies(earliest), None)
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"⚠️  Could not read HDFS: {e}")
+    return paths
+
+def report(paths):
+    print(f"{'Path':<16}{'Traces':>10}{'p50 ms':>12}{'p99 ms':>12}{'max ms':>12}")
+    print('-' * 62)
+    slowest = None
+    for name, (latencies, waiting) in paths.items():
+        if not latencies:
+            print(f"{name:<16}{0:>10}{'-':>12}{'-':>12}{'-':>12}")
+            continue
+        values = np.asarray(latencies)
+        p50, p99 = np.percentile(values, [50, 99])
+        pending = f"  (+{waiting:,} not shown yet)" if waiting else ""
+        print(f"{name:<16}{len(values):>10,}{p50:>12,.1f}{p99:>12,.1f}{values.max():>12,.1f}{pending}")
+        if slowest is None or p99 > slowest[1]:
+            slowest = (name, p99)
+    if slowest:
+        print(f"\n🐢 Freshness is bounded by: {slowest[0]} (p99 {slowest[1]:,.1f} ms)")
+
+def main():
+    parser = argparse.ArgumentParser(description='Report end-to-end latency of traced transactions per sink')
+    parser.add_argument('--trace-dir', help='Span directory (default: shared-data/traces)')
+    parser.add_argument('--since', type=float, help='Only transactions generated in the last N minutes')
+    parser.add_argument('--no-hdfs', action='store_true', help='Skip reading the Flume output from HDFS')
+    args = parser.parse_args()
+
+    print("╔════════════════════════════════════════════════════════════╗")
+    print("║          End-to-End Latency Report                         ║")
+    print("╚════════════════════════════════════════════════════════════╝\n")
+
+    since = time.time() - args.since * 60 if args.since else None
+    paths = collect(args.trace_dir, since, hdfs=not args.no_hdfs)
+    if not any(latencies for latencies, _ in paths.values()):
+        print("❌ No traces found (run realtime_stream.py with --trace first)")
+        return
+    report(paths)
+
+if __name__ == "__main__":
+    main()
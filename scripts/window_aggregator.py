@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+"""
+Windowed Streaming Aggregator
+Consumes ecommerce-transactions and publishes per-window revenue/units/counts to ecommerce-analytics
+
+Windows are in event time (the transaction's own timestamp, or its Date for
+CSV replay events). Each window spec is tumbling (size) or sliding
+(size:slide, size a multiple of slide); events are added once per spec to a
+pane of `slide` seconds and a window's result is the sum of its panes, so a
+sliding window costs no more per event than a tumbling one.
+
+Event time and late data:
+  watermark         highest event time seen minus --max-delay; a window is
+                    published once the watermark passes its end
+  allowed lateness  an event for an already published window, up to
+                    --allowed-lateness behind the watermark, updates it and
+                    the window is published again with revision + 1
+  too late          older events are counted and dropped
+Panes are dropped once all their windows are past the allowed lateness, so
+memory is bounded by the number of open windows, not events.
+
+Result messages (JSON, keyed by window name):
+  {"window": "sliding_300s_60s", "start": ..., "end": ..., "revision": 0,
+   "count": 120, "revenue": 35210.5, "units": 301,
+   "by": {"category": {"Electronics": [40, 30120.0, 61], ...},
+          "region": {...}, "payment_method": {...}}}
+where each "by" entry is [count, revenue, units].
+
+Kafka offsets are committed at the lowest offset any open pane still needs,
+with the watermark, the consumer position and the revisions of open windows
+in the commit metadata. A restarted aggregator replays exactly the open
+windows, holds results back until it is past that position again, and then
+republishes them unchanged, with the revision they had at the last commit.
+Results published after that commit can come again with the same revision,
+so consumers should keep the latest result per (window, start).
+Run one instance: results cover the partitions it consumes.
+"""
+
+import argparse
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from kafka import KafkaConsumer, KafkaProducer, ConsumerRebalanceListener
+from kafka.structs import OffsetAndMetadata
+
+from partitioning import encode_key
+from serializers import deserialize, json_serialize
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+SOURCE_TOPIC = 'ecommerce-transactions'
+ANALYTICS_TOPIC = 'ecommerce-analytics'
+GROUP_ID = 'window-aggregator'
+DIMENSIONS = ['category', 'region', 'payment_method']
+
+# Seconds between offset commits and between throughput log lines
+COMMIT_INTERVAL = 5.0
+# Broker default offset.metadata.max.bytes; larger commit metadata is rejected
+METADATA_MAX_BYTES = 4096
+REPORT_INTERVAL = 5.0
+
+@lru_cache(maxsize=65536)
+def parse_event_time(value):
+    """
+    Epoch seconds of a 'YYYY-MM-DD[ HH:MM:SS]' string
+
+    Naive timestamps are read as UTC, so windows fall on the generator's
+    whole minutes and hours and format_time() gives back the same wall clock.
+    """
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp()
+
+def format_time(seconds):
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+def event_view(event):
+    """
+    (event time, (category, region, payment method), revenue, units) of either event shape
+
+    RealtimeStreamer events carry a timestamp; CSV replay events only a Date.
+    """
+    if 'quantity' in event:
+        return (parse_event_time(event['timestamp']), (event['category'], event['region'], event['payment_method']),
+                float(event['total_amount']), int(event['quantity']))
+    return (parse_event_time(event['date']), (event['product_category'], event['region'], event['payment_method']),
+            float(event['total_revenue']), int(event['units_sold']))
+
+class WindowSpec:
+    """A tumbling (slide == size) or sliding window, in seconds"""
+
+    def __init__(self, size, slide=None):
+        self.size = int(size)
+        self.slide = int(slide or size)
+        if self.size < 1 or self.slide < 1 or self.size % self.slide:
+            raise ValueError(f"Window size ({size}) must be a positive multiple of its slide ({slide})")
+        if self.slide == self.size:
+            self.name = f"tumbling_{self.size}s"
+        else:
+            self.name = f"sliding_{self.size}s_{self.slide}s"
+
+    @classmethod
+    def parse(cls, text):
+        """'60' (tumbling) or '300:60' (size:slide)"""
+        size, _, slide = text.partition(':')
+        return cls(int(size), int(slide) if slide else None)
+
+class Pane:
+    """Aggregates of one slide-length interval: (dimension index, value) -> [count, revenue, units]"""
+
+    __slots__ = ('stats', 'offsets')
+
+    def __init__(self):
+        self.stats = {}
+        # Lowest source offset per partition, for offset commits
+        self.offsets = {}
+
+class WindowAggregator:
+    """
+    Event-time window state for several window specs
+
+    Feed events with add(), then call advance() to publish: it returns the
+    results of windows that closed or were updated by late events.
+    """
+
+    def __init__(self, specs, max_delay=5.0, allowed_lateness=60.0):
+        self.specs = specs
+        self.max_delay = max_delay
+        self.allowed_lateness = allowed_lateness
+        self.watermark = float('-inf')
+        self.max_event_time = float('-inf')
+        self.panes = {spec.name: {} for spec in specs}
+        # Start of the earliest window of each spec not published yet
+        self.next_window = {spec.name: None for spec in specs}
+        self.revisions = {spec.name: {} for spec in specs}
+        # Revisions from the commit metadata, for windows replayed after a restart
+        self.restored = {spec.name: {} for spec in specs}
+        self.dirty = {spec.name: set() for spec in specs}
+        self.publishing = set()
+        self.events = 0
+        self.late_updates = 0
+        self.late_dropped = 0
+        self.published = 0
+
+    def add(self, event_time, dimensions, revenue, units, partition=None, offset=None):
+        self.events += 1
+        if event_time > self.max_event_time:
+            self.max_event_time = event_time
+        for spec in self.specs:
+            pane_start = int(event_time // spec.slide * spec.slide)
+            if pane_start + spec.size + self.allowed_lateness <= self.watermark:
+                self.late_dropped += 1
+                continue
+            panes = self.panes[spec.name]
+            pane = panes.get(pane_start)
+            if pane is None:
+                pane = panes[pane_start] = Pane()
+            stats = pane.stats
+            for key in enumerate(dimensions):
+                entry = stats.get(key)
+                if entry is None:
+                    stats[key] = [1, revenue, units]
+                else:
+                    entry[0] += 1
+                    entry[1] += revenue
+                    entry[2] += units
+            if partition is not None and offset < pane.offsets.get(partition, offset + 1):
+                pane.offsets[partition] = offset
+
+            # Earliest window this pane belongs to that is not past the allowed lateness
+            first_window = pane_start - spec.size + spec.slide
+            if self.watermark > float('-inf'):
+                horizon = self.watermark - self.allowed_lateness - spec.size
+                first_window = max(first_window, int(horizon // spec.slide * spec.slide) + spec.slide)
+            next_window = self.next_window[spec.name]
+            if next_window is None or (first_window < next_window and spec.name not in self.publishing):
+                # Nothing published yet: start from this pane's earliest window
+                self.next_window[spec.name] = first_window if next_window is None else min(next_window, first_window)
+            elif first_window < next_window:
+                # Windows already published get an updated revision at the next advance()
+                self.late_updates += 1
+                self.dirty[spec.name].update(range(first_window, min(next_window, pane_start + spec.slide), spec.slide))
+
+    def advance(self, watermark=None):
+        """
+        Move the watermark (default: max event time - max_delay) and collect results
+
+        Returns:
+            list of result dicts: revisions of windows updated by late events,
+            then newly closed windows in order
+        """
+        # Late revisions first, while every pane of those windows is still held
+        results = []
+        for spec in self.specs:
+            for window in sorted(self.dirty[spec.name]):
+                results.append(self._result(spec, window))
+            self.dirty[spec.name].clear()
+
+        self.watermark = max(self.watermark, self.max_event_time - self.max_delay if watermark is None else watermark)
+        for spec in self.specs:
+            panes = self.panes[spec.name]
+            start = self.next_window[spec.name]
+            if start is None:
+                continue
+            while start + spec.size <= self.watermark:
+                if any(s in panes for s in range(start, start + spec.size, spec.slide)):
+                    results.append(self._result(spec, start))
+                    self.publishing.add(spec.name)
+                    start += spec.slide
+                else:
+                    # Skip a gap in the data in one step
+                    later = [s for s in panes if s >= start]
+                    start = max(start + spec.slide, min(later) - spec.size + spec.slide) if later else \
+                        int((self.watermark - spec.size) // spec.slide * spec.slide) + spec.slide
+            self.next_window[spec.name] = start
+
+            # Panes whose last window is past the allowed lateness
+            horizon = self.watermark - self.allowed_lateness - spec.size
+            for pane_start in [s for s in panes if s <= horizon]:
+                del panes[pane_start]
+            revisions = self.revisions[spec.name]
+            for window in [w for w in revisions if w <= horizon]:
+                del revisions[window]
+            restored = self.restored[spec.name]
+            for window in [w for w in restored if w <= horizon]:
+                del restored[window]
+        self.published += len(results)
+        return results
+
+    def _result(self, spec, start):
+        panes = self.panes[spec.name]
+        totals = {}
+        for pane_start in range(start, start + spec.size, spec.slide):
+            pane = panes.get(pane_start)
+            if pane is None:
+                continue
+            for key, (count, revenue, units) in pane.stats.items():
+                entry = totals.get(key)
+                if entry is None:
+                    totals[key] = [count, revenue, units]
+                else:
+                    entry[0] += count
+                    entry[1] += revenue
+                    entry[2] += units
+        by = {dimension: {} for dimension in DIMENSIONS}
+        for (index, value), (count, revenue, units) in totals.items():
+            by[DIMENSIONS[index]][value] = [count, round(revenue, 2), units]
+        # Every event is in exactly one entry of each dimension
+        overall = by[DIMENSIONS[0]].values()
+        revision = self.restored[spec.name].pop(start, None)
+        if revision is None:
+            revision = self.revisions[spec.name].get(start, -1) + 1
+        self.revisions[spec.name][start] = revision
+        return {
+            'window': spec.name,
+            'start': format_time(start),
+            'end': format_time(start + spec.size),
+            'revision': revision,
+            'count': sum(e[0] for e in overall),
+            'revenue': round(sum(e[1] for e in overall), 2),
+            'units': sum(e[2] for e in overall),
+            'by': by
+        }
+
+    def open_revisions(self):
+        """Revisions above 0 of windows still open to late events: {window name: {start: revision}}"""
+        open_revisions = {}
+        for name in self.revisions:
+            windows = {**self.restored[name], **{s: r for s, r in self.revisions[name].items() if r > 0}}
+            if windows:
+                open_revisions[name] = windows
+        return open_revisions
+
+    def restore_revisions(self, revisions):
+        """Take revisions from open_revisions() of a previous run; replayed windows are republished with them"""
+        for name, windows in revisions.items():
+            if name not in self.restored:
+                continue
+            for start, revision in windows.items():
+                start = int(start)
+                self.restored[name][start] = max(revision, self.restored[name].get(start, 0))
+
+    def needed_offsets(self):
+        """Lowest source offset per partition that an open pane still needs"""
+        offsets = {}
+        for panes in self.panes.values():
+            for pane in panes.values():
+                for partition, offset in pane.offsets.items():
+                    if offset < offsets.get(partition, offset + 1):
+                        offsets[partition] = offset
+        return offsets
+
+    def open_panes(self):
+        return sum(len(panes) for panes in self.panes.values())
+
+def _offset_metadata(offset, metadata):
+    # kafka-python 2.x has (offset, metadata); 3.x adds leader_epoch
+    return OffsetAndMetadata(offset, metadata, *([-1] * (len(OffsetAndMetadata._fields) - 2)))
+
+def _commit_metadata(aggregator, position):
+    """Watermark, consumer position and open window revisions as JSON, the revisions left out if they do not fit"""
+    if aggregator.watermark == float('-inf'):
+        return ''
+    state = {'watermark': aggregator.watermark, 'position': position}
+    metadata = json.dumps({**state, 'revisions': aggregator.open_revisions()})
+    if len(metadata) > METADATA_MAX_BYTES:
+        logger.warning("⚠️  Too many revised windows for the commit metadata: "
+                       "after a restart they are republished from revision 0")
+        metadata = json.dumps(state)
+    return metadata
+
+class _RestoreWatermark(ConsumerRebalanceListener):
+    """Commits before partitions move and restores the committed watermark and revisions on assignment"""
+
+    def __init__(self, service):
+        self.service = service
+
+    def on_partitions_revoked(self, revoked):
+        if revoked:
+            self.service.commit()
+
+    def on_partitions_assigned(self, assigned):
+        for tp in assigned:
+            committed = self.service.consumer.committed(tp, metadata=True)
+            if committed and committed.metadata:
+                try:
+                    metadata = json.loads(committed.metadata)
+                    watermark = metadata['watermark']
+                except (ValueError, KeyError):
+                    continue
+                aggregator = self.service.aggregator
+                aggregator.watermark = max(aggregator.watermark, watermark)
+                aggregator.restore_revisions(metadata.get('revisions', {}))
+                if metadata.get('position', 0) > committed.offset:
+                    self.service.replay_until[tp] = metadata['position']
+        if self.service.aggregator.watermark > float('-inf'):
+            logger.info(f"↩️  Resuming at watermark {format_time(self.service.aggregator.watermark)}")
+
+class AggregatorService:
+    """
+    Kafka plumbing around a WindowAggregator
+
+    Args:
+        aggregator: WindowAggregator
+        idle_seconds: With no events for this long, the watermark advances
+            with the wall clock so the last windows are still published
+        bootstrap_servers: Kafka brokers
+        group_id: Consumer group (holds the committed offsets, watermark and revisions)
+    """
+
+    def __init__(self, aggregator, idle_seconds=10.0, bootstrap_servers='localhost:9092', group_id=GROUP_ID):
+        self.aggregator = aggregator
+        self.idle_seconds = idle_seconds
+        self.bootstrap_servers = bootstrap_servers
+        self.group_id = group_id
+        self.consumer = None
+        self.producer = None
+        self.rejected = 0
+        # Partition -> position at the last commit, while replaying up to it after a restart
+        self.replay_until = {}
+
+    def connect(self):
+        try:
+            self.consumer = KafkaConsumer(
+                bootstrap_servers=self.bootstrap_servers,
+                group_id=self.group_id,
+                enable_auto_commit=False,
+                auto_offset_reset='earliest',
+                value_deserializer=lambda v: v  # Decoded per record so one bad message can be skipped
+            )
+            self.consumer.subscribe([SOURCE_TOPIC], listener=_RestoreWatermark(self))
+            self.producer = KafkaProducer(
+                bootstrap_servers=self.bootstrap_servers,
+                value_serializer=json_serialize,
+                key_serializer=encode_key,
+                acks='all',
+                linger_ms=50
+            )
+            logger.info(f"✅ Consuming {SOURCE_TOPIC} (group '{self.group_id}'), publishing to {ANALYTICS_TOPIC}")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Failed to connect to Kafka: {e}")
+            return False
+
+    def publish(self, results):
+        for result in results:
+            self.producer.send(ANALYTICS_TOPIC, result, key=result['window'])
+
+    def commit(self):
+        """Commit, per partition, the lowest offset an open pane needs (results are flushed first)"""
+        self.producer.flush()
+        needed = self.aggregator.needed_offsets()
+        offsets = {}
+        for tp in self.consumer.assignment():
+            position = max(self.consumer.position(tp), self.replay_until.get(tp, 0))
+            offsets[tp] = _offset_metadata(needed.get(tp.partition, position), _commit_metadata(self.aggregator, position))
+        if offsets:
+            self.consumer.commit(offsets)
+
+    def replaying(self):
+        """True until every partition is back at its position of the last commit"""
+        assignment = self.consumer.assignment()
+        for tp, position in list(self.replay_until.items()):
+            if tp not in assignment or self.consumer.position(tp) >= position:
+                del self.replay_until[tp]
+        return bool(self.replay_until)
+
+    def run(self, duration=None):
+        if not self.connect():
+            return
+        aggregator = self.aggregator
+        start = last_commit = last_report = last_event = time.monotonic()
+        reported = 0
+        try:
+            while not (duration and time.monotonic() - start >= duration):
+                batch = self.consumer.poll(timeout_ms=500)
+                for tp, records in batch.items():
+                    for record in records:
+                        try:
+                            event_time, dimensions, revenue, units = event_view(deserialize(record.value))
+                        except Exception as e:
+                            self.rejected += 1
+                            logger.warning(f"⚠️  Skipping {tp.topic}[{tp.partition}]@{record.offset}: {e}")
+                            continue
+                        aggregator.add(event_time, dimensions, revenue, units, tp.partition, record.offset)
+
+                now = time.monotonic()
+                if batch:
+                    last_event = now
+                    # Windows closed before the restart wait for all of their replayed events
+                    if not self.replaying():
+                        self.publish(aggregator.advance())
+                elif now - last_event >= self.idle_seconds and aggregator.max_event_time > float('-inf'):
+                    self.replay_until.clear()
+                    idle_watermark = aggregator.max_event_time + (now - last_event) - aggregator.max_delay
+                    self.publish(aggregator.advance(idle_watermark))
+
+                if now - last_commit >= COMMIT_INTERVAL:
+                    self.commit()
+                    last_commit = now
+                if now - last_report >= REPORT_INTERVAL:
+                    watermark = format_time(aggregator.watermark) if aggregator.watermark > float('-inf') else '-'
+                    logger.info(f"📊 {(aggregator.events - reported) / (now - last_report):,.0f} events/s | "
+                                f"watermark {watermark} | {aggregator.open_panes():,} open panes | "
+                                f"published {aggregator.published:,} | late updates {aggregator.late_updates:,}, "
+                                f"dropped {aggregator.late_dropped:,} | rejected {self.rejected:,}")
+                    reported = aggregator.events
+                    last_report = now
+        except KeyboardInterrupt:
+            logger.info("\n⚠️  Aggregator stopped by user (Ctrl+C)")
+        finally:
+            self.cleanup()
+
+    def cleanup(self):
+        if self.consumer:
+            try:
+                self.commit()
+            except Exception as e:
+                logger.warning(f"Could not commit offsets on shutdown: {e}")
+            self.consumer.close(autocommit=False)
+        if self.producer:
+            self.producer.close()
+        logger.info(f"📊 Total: {self.aggregator.events:,} events, {self.aggregator.published:,} window results")
+
+def main():
+    parser = argparse.ArgumentParser(description='Publish event-time window aggregates of transactions to ecommerce-analytics')
+    parser.add_argument('--window', action='append', metavar='SIZE[:SLIDE]',
+                        help='Window in seconds: "60" tumbling, "300:60" sliding; repeatable (default: 60 and 300:60)')
+    parser.add_argument('--max-delay', type=float, default=5.0,
+                        help='Out-of-orderness the watermark waits for, in seconds (default: 5)')
+    parser.add_argument('--allowed-lateness', type=float, default=60.0,
+                        help='How long after publishing a window late events still update it (default: 60)')
+    parser.add_argument('--idle-seconds', type=float, default=10.0,
+                        help='Advance the watermark with the clock after this long without events (default: 10)')
+    parser.add_argument('--group-id', default=GROUP_ID, help=f'Consumer group (default: {GROUP_ID})')
+    parser.add_argument('--duration', type=float, help='Stop after this many seconds (default: run until Ctrl+C)')
+    parser.add_argument('--bootstrap-servers', default='localhost:9092', help='Kafka brokers (default: localhost:9092)')
+    args = parser.parse_args()
+
+    try:
+        specs = [WindowSpec.parse(w) for w in (args.window or ['60', '300:60'])]
+    except ValueError as e:
+        parser.error(str(e))
+    if len({spec.name for spec in specs}) < len(specs):
+        parser.error("Duplicate --window")
+
+    print("╔════════════════════════════════════════════════════════════╗")
+    print("║          Windowed Streaming Aggregator                     ║")
+    print("╚════════════════════════════════════════════════════════════╝\n")
+    print(f"🪟 Windows: {', '.join(spec.name for spec in specs)}")
+    print(f"⏱️  Watermark delay {args.max_delay:g}s, allowed lateness {args.allowed_lateness:g}s\n")
+
+    aggregator = WindowAggregator(specs, args.max_delay, args.allowed_lateness)
+    AggregatorService(aggregator, args.idle_seconds, args.bootstrap_servers, args.group_id).run(args.duration)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+"""Shared pytest setup: the pipeline scripts import each other as top-level modules"""
+
+import sys
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO / "scripts"))
+
+SALES_CSV = REPO / "shared-data" / "Online Sales Data.csv"
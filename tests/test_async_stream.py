@@ -0,0 +1,91 @@
+"""AsyncRealtimeStreamer against the in-process Kafka/MySQL fakes"""
+
+import asyncio
+import threading
+import time
+
+from async_stream import AsyncRealtimeStreamer, InMemoryKafkaProducer, InMemoryMySQLPool, TOPIC, stream
+from id_allocator import FIRST_ID, BlockIdAllocator
+from serializers import deserialize
+from test_id_allocator import FakeSequenceDB
+
+def test_every_transaction_acked_and_written():
+    streamer = asyncio.run(stream(count=500, db_batch_size=50, fake=True))
+
+    assert streamer.generated == 500
+    assert streamer.kafka_acked == 500 and streamer.kafka_failed == 0
+    assert streamer.mysql_written == 500 and streamer.mysql_failed == 0
+
+    sent = [deserialize(value)['transaction_id'] for topic, _, value, _ in streamer.producer.messages]
+    assert all(topic == TOPIC for topic, _, _, _ in streamer.producer.messages)
+    assert sorted(sent) == list(range(1001, 1501))
+    assert sorted(row[0] for row in streamer.pool.rows) == list(range(1001, 1501))
+
+def test_binary_serializer_and_keys():
+    streamer = asyncio.run(stream(count=200, key_by='region', serializer='binary', fake=True))
+
+    assert streamer.kafka_acked == 200
+    for _, key, value, _ in streamer.producer.messages:
+        assert key.decode('utf-8') == deserialize(value)['region']
+
+def test_slow_mysql_applies_backpressure_without_losing_rows():
+    async def run():
+        producer = InMemoryKafkaProducer(latency=0.001)
+        pool = InMemoryMySQLPool(maxsize=1, latency=0.005)
+        streamer = AsyncRealtimeStreamer(producer, pool, queue_size=20, db_writers=1, db_batch_size=5,
+                                         first_transaction_id=1001)
+        await streamer.run(count=300)
+        return streamer
+
+    streamer = asyncio.run(run())
+
+    assert streamer.kafka_acked == 300
+    assert streamer.mysql_written == 300
+    assert len(streamer.pool.rows) == 300
+
+def test_failed_deliveries_are_counted():
+    async def run():
+        producer = InMemoryKafkaProducer(latency=0.001, failure_rate=1.0)
+        streamer = AsyncRealtimeStreamer(producer, InMemoryMySQLPool(), first_transaction_id=1001)
+        await streamer.run(count=50)
+        return streamer
+
+    streamer = asyncio.run(run())
+
+    assert streamer.kafka_failed == 50 and streamer.kafka_acked == 0
+    assert streamer.mysql_written == 50
+
+def test_id_leases_run_off_the_event_loop():
+    lease_threads = []
+
+    async def run():
+        streamer = AsyncRealtimeStreamer(InMemoryKafkaProducer(latency=0.001), InMemoryMySQLPool())
+        allocator = streamer.generator.id_allocator = BlockIdAllocator(FakeSequenceDB().connect, block_size=100)
+        lease = allocator._lease
+
+        def slow_lease():
+            lease_threads.append(threading.current_thread())
+            time.sleep(0.05)
+            lease()
+
+        allocator._lease = slow_lease
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        ticker = asyncio.create_task(tick())
+        await streamer.run(count=300)
+        ticker.cancel()
+        return streamer, ticks
+
+    streamer, ticks = asyncio.run(run())
+
+    assert len(lease_threads) == 3
+    assert threading.main_thread() not in lease_threads
+    # The loop kept turning while each lease slept
+    assert ticks >= 15
+    assert sorted(row[0] for row in streamer.pool.rows) == list(range(FIRST_ID, FIRST_ID + 300))
@@ -0,0 +1,142 @@
+"""RotatingBloomFilter, Deduplicator and DedupeService's commit-after-ack rule"""
+
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+import dedupe_stream
+from dedupe_stream import DedupeService, Deduplicator
+from sketches import BloomFilter, RotatingBloomFilter, hash64
+
+def bloom(nbytes=1 << 16, retention=3600.0, generations=4):
+    return RotatingBloomFilter(nbytes, fp_rate=0.001, retention=retention, generations=generations)
+
+def hashes(values):
+    return hash64(pd.Series([str(v) for v in values], dtype=object))
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    bf = BloomFilter.for_capacity(10_000, 0.01)
+    bf.add_hashes(hashes(range(10_000)))
+    assert bf.contains_hashes(hashes(range(10_000))).all()
+    assert bf.contains_hashes(hashes(range(10_000, 60_000))).mean() < 0.02
+
+def test_check_and_add_flags_repeats_across_and_within_batches():
+    filters = bloom()
+    assert not filters.check_and_add(hashes([1, 2, 3]), now=0).any()
+    assert filters.check_and_add(hashes([3, 4, 4]), now=1).tolist() == [True, False, True]
+
+def test_ids_are_forgotten_after_the_retention():
+    filters = bloom(retention=40, generations=4)
+    filters.check_and_add(hashes([1]), now=0)
+    assert filters.check_and_add(hashes([1]), now=5).all()
+    for now in range(10, 60, 10):
+        filters.check_and_add(hashes([f"filler-{now}"]), now=now)
+    assert not filters.check_and_add(hashes([1]), now=60).any()
+
+def test_save_and_load_round_trip(tmp_path):
+    filters = bloom()
+    filters.check_and_add(hashes(range(100)), now=0)
+    filters.save(tmp_path / 'bloom.npz')
+
+    restored = bloom()
+    assert restored.load(tmp_path / 'bloom.npz')
+    assert restored.check_and_add(hashes(range(100)), now=1).all()
+    assert not bloom(nbytes=1 << 17).load(tmp_path / 'bloom.npz')
+
+class FakeVerifier:
+    def __init__(self, existing=(), reachable=True):
+        self.rows = {str(i) for i in existing}
+        self.reachable = reachable
+        self.queries = 0
+
+    def existing(self, ids):
+        self.queries += 1
+        return {i for i in ids if i in self.rows} if self.reachable else None
+
+def test_duplicates_are_dropped_and_new_ids_forwarded():
+    dedup = Deduplicator(bloom(), FakeVerifier())
+    assert dedup.filter([1, 2, 2, 3], now=0) == [True, True, False, True]
+    assert dedup.filter(['3', 4], now=1) == [False, True]
+    assert dedup.duplicates == 2
+
+def test_suspects_are_verified_against_mysql_after_the_recent_window():
+    verifier = FakeVerifier(existing=[1])
+    dedup = Deduplicator(bloom(), verifier, recent_seconds=10)
+    dedup.filter([1, 2], now=0)
+    verifier.rows.discard('2')  # 2 never reached MySQL: a replay of it must not be dropped
+    assert dedup.filter([1, 2], now=100) == [False, True]
+    assert verifier.queries == 1
+
+def test_unverifiable_suspects_are_forwarded():
+    dedup = Deduplicator(bloom(), FakeVerifier(reachable=False), recent_seconds=0)
+    dedup.filter([1], now=0)
+    assert dedup.filter([1], now=10) == [True]
+    assert dedup.unverified == 1
+
+def test_forgotten_ids_are_forwarded_again_without_a_verifier():
+    dedup = Deduplicator(bloom(), None)
+    dedup.filter([1, 2], now=0)
+    dedup.forget([2])
+    assert dedup.filter([1, 2], now=1) == [False, True]
+    assert dedup.filter([2], now=2) == [False]
+
+class FakeFuture:
+    def __init__(self, ok):
+        self.ok = ok
+        self.exception = None if ok else RuntimeError("request timed out")
+
+    def succeeded(self):
+        return self.ok
+
+class FakeProducer:
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.delivered = []
+
+    def send(self, topic, value, key=None, partition=None):
+        transaction_id = json.loads(value)['transaction_id']
+        ok = transaction_id not in self.failing
+        if ok:
+            self.delivered.append(transaction_id)
+        return FakeFuture(ok)
+
+    def flush(self):
+        pass
+
+class FakeConsumer:
+    def __init__(self):
+        self.seeks = []
+        self.commits = 0
+
+    def seek(self, tp, offset):
+        self.seeks.append((tp.partition, offset))
+
+    def commit(self):
+        self.commits += 1
+
+def records(ids, first_offset=0):
+    return [SimpleNamespace(topic='ecommerce-transactions', partition=0, offset=first_offset + i, key=None,
+                            value=json.dumps({'transaction_id': t}).encode()) for i, t in enumerate(ids)]
+
+def test_failed_sends_skip_the_commit_and_are_replayed(monkeypatch):
+    monkeypatch.setattr(dedupe_stream, 'deserialize', json.loads)
+    service = DedupeService(Deduplicator(bloom(), None), state_path='unused.npz')
+    service.producer, service.consumer = FakeProducer(failing={2}), FakeConsumer()
+
+    service.process(records([1, 2, 3], first_offset=10))
+    assert not service.commit()
+    assert service.consumer.commits == 0
+    assert service.consumer.seeks == [(0, 10)]
+
+    service.producer.failing.clear()
+    service.process(records([1, 2, 3], first_offset=10))
+    assert service.commit()
+    assert service.consumer.commits == 1
+    assert sorted(service.producer.delivered) == [1, 2, 3]
+    assert service.forwarded == 3
+
+def test_hash64_is_stable():
+    assert np.array_equal(hashes(['a', 'b']), hashes(['a', 'b']))
+    assert hashes(['a'])[0] != hashes(['b'])[0]
@@ -0,0 +1,130 @@
+"""BlockIdAllocator and RealtimeStreamer.next_transaction_id against a fake MySQL sequence"""
+
+import threading
+
+import pytest
+
+import realtime_stream
+from id_allocator import FIRST_ID, BlockIdAllocator
+
+class FakeSequenceDB:
+    """One id_sequences row shared by every connection; the n-th lease fails if n is in fail_leases"""
+
+    def __init__(self, max_transaction_id=None):
+        self.max_transaction_id = max_transaction_id
+        self.next_id = None
+        self.lock = threading.Lock()
+        self.leases = 0
+        self.fail_leases = set()
+        self.connections = 0
+
+    def connect(self):
+        self.connections += 1
+        return FakeConnection(self)
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.rowcount = 0
+        self.last_insert_id = None
+
+    def execute(self, sql, params=()):
+        db = self.db
+        with db.lock:
+            if sql.lstrip().startswith('UPDATE'):
+                if db.next_id is None:
+                    self.rowcount = 0
+                    return
+                db.leases += 1
+                if db.leases in db.fail_leases:
+                    raise RuntimeError("lost connection")
+                db.next_id += params[0]
+                self.last_insert_id = db.next_id
+                self.rowcount = 1
+            elif sql.lstrip().startswith('INSERT IGNORE') and db.next_id is None:
+                db.next_id = max((db.max_transaction_id or 0) + 1, params[1])
+
+    def fetchone(self):
+        return (self.last_insert_id,)
+
+    def close(self):
+        pass
+
+class FakeConnection:
+    def __init__(self, db):
+        self.db = db
+
+    def cursor(self):
+        return FakeCursor(self.db)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+def test_first_lease_seeds_after_existing_transactions():
+    db = FakeSequenceDB(max_transaction_id=5000)
+    allocator = BlockIdAllocator(db.connect, block_size=10)
+    assert [allocator.next_id() for _ in range(12)] == list(range(5001, 5013))
+    assert db.leases == 2
+
+def test_empty_database_starts_at_first_id():
+    allocator = BlockIdAllocator(FakeSequenceDB().connect, block_size=3)
+    assert allocator.next_id() == FIRST_ID
+
+def test_allocators_sharing_a_sequence_never_collide():
+    db = FakeSequenceDB()
+    allocators = [BlockIdAllocator(db.connect, block_size=7) for _ in range(4)]
+    ids = []
+
+    def worker(allocator):
+        for _ in range(250):
+            ids.append(allocator.next_id())
+
+    threads = [threading.Thread(target=worker, args=(a,)) for a in allocators for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(ids) == len(set(ids)) == 2000
+
+def test_failed_lease_reconnects_on_next_call():
+    db = FakeSequenceDB()
+    db.fail_leases = {2}
+    allocator = BlockIdAllocator(db.connect, block_size=2)
+    assert [allocator.next_id() for _ in range(2)] == [1001, 1002]
+    with pytest.raises(RuntimeError):
+        allocator.next_id()
+    assert allocator.next_id() == 1003
+    assert db.connections == 2
+
+def test_block_size_must_be_positive():
+    with pytest.raises(ValueError):
+        BlockIdAllocator(FakeSequenceDB().connect, block_size=0)
+
+def streamer_on(db, monkeypatch, block_size=3):
+    monkeypatch.setattr(realtime_stream, 'LEASE_RETRY_DELAY', 0)
+    streamer = realtime_stream.RealtimeStreamer(id_block_size=block_size)
+    streamer.id_allocator.connect = db.connect
+    return streamer
+
+def test_streamer_retries_a_failed_lease_without_rewinding(monkeypatch):
+    db = FakeSequenceDB(max_transaction_id=50000)
+    db.fail_leases = {2}
+    streamer = streamer_on(db, monkeypatch)
+    assert [streamer.next_transaction_id() for _ in range(6)] == list(range(50001, 50007))
+
+def test_streamer_raises_once_leases_keep_failing(monkeypatch):
+    db = FakeSequenceDB(max_transaction_id=50000)
+    db.fail_leases = set(range(2, 100))
+    streamer = streamer_on(db, monkeypatch)
+    assert [streamer.next_transaction_id() for _ in range(3)] == [50001, 50002, 50003]
+    with pytest.raises(RuntimeError):
+        streamer.next_transaction_id()
+
+def test_streamer_falls_back_to_local_ids_if_mysql_is_never_reachable(monkeypatch):
+    db = FakeSequenceDB()
+    db.fail_leases = set(range(1, 100))
+    streamer = streamer_on(db, monkeypatch)
+    assert [streamer.next_transaction_id() for _ in range(3)] == [FIRST_ID, FIRST_ID + 1, FIRST_ID + 2]
@@ -0,0 +1,89 @@
+"""MySQLSink batch handling with fake Kafka and MySQL connections"""
+
+from types import SimpleNamespace
+
+import mysql.connector
+from kafka.errors import CommitFailedError
+
+import kafka_mysql_sink
+from kafka_mysql_sink import MySQLSink
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def executemany(self, sql, rows):
+        for row in rows:
+            self.execute(sql, row)
+
+    def execute(self, sql, row):
+        if row[0] == 'bad':
+            raise mysql.connector.errors.DataError("Data too long for column 'region'")
+        self.conn.pending.append(row)
+
+class FakeConnection:
+    def __init__(self):
+        self.rows = []
+        self.pending = []
+
+    def is_connected(self):
+        return True
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.rows += self.pending
+        self.pending = []
+
+    def rollback(self):
+        self.pending = []
+
+    def close(self):
+        pass
+
+class FakeConsumer:
+    """Serves the same batch `polls` times, then stops the sink; the first commit hits a rebalance"""
+
+    def __init__(self, ids, polls=2):
+        self.ids = ids
+        self.polls = polls
+        self.commits = 0
+
+    def poll(self, timeout_ms=None, max_records=None):
+        if not self.polls:
+            raise KeyboardInterrupt
+        self.polls -= 1
+        return {0: [SimpleNamespace(topic='t', partition=0, offset=i, value=v) for i, v in enumerate(self.ids)]}
+
+    def commit(self):
+        self.commits += 1
+        if self.commits == 1:
+            raise CommitFailedError("group rebalanced")
+
+    def assignment(self):
+        return set()
+
+    def close(self, autocommit=True):
+        pass
+
+def run_sink(monkeypatch, ids, polls=2):
+    monkeypatch.setattr(kafka_mysql_sink, 'deserialize', lambda value: value)
+    monkeypatch.setattr(kafka_mysql_sink, 'event_row', lambda event: (event,))
+    sink = MySQLSink()
+    sink.consumer, sink.mysql_conn = FakeConsumer(ids, polls), FakeConnection()
+    conn = sink.mysql_conn
+    monkeypatch.setattr(sink, 'connect', lambda: True)
+    sink.run()
+    return sink, conn
+
+def test_rejected_rows_are_skipped_and_the_rest_written(monkeypatch):
+    sink, conn = run_sink(monkeypatch, ['a', 'bad', 'c'], polls=1)
+    assert conn.rows == [('a',), ('c',)]
+    assert (sink.written, sink.rejected, sink.retries) == (2, 1, 0)
+
+def test_commit_failure_during_rebalance_keeps_consuming(monkeypatch):
+    sink, conn = run_sink(monkeypatch, ['a', 'b'], polls=2)
+    assert sink.consumer.commits == 2
+    assert sink.batches == 2
+    assert conn.rows == [('a',), ('b',)] * 2
@@ -0,0 +1,59 @@
+"""Columnar LogParser against the regex reference parser"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import SALES_CSV
+from generate_logs import format_log_block, prepare_row_fields
+from log_parser import LogParser, iter_blocks, parse_files, parse_lines_regex, to_dataframe
+
+@pytest.fixture(scope='module')
+def lines():
+    fields = prepare_row_fields(pd.read_csv(SALES_CSV))
+    text = format_log_block(fields, 5000, datetime(2025, 11, 5), np.random.default_rng(7))
+    return text.splitlines(keepends=True)
+
+def assert_matches_reference(columns, lines):
+    expected = pd.DataFrame(parse_lines_regex(lines),
+                            columns=['timestamp', 'level', 'service', 'template', 'txn_id', 'amount'])
+    actual = to_dataframe(columns)
+    assert len(actual) == len(expected)
+    for column in ('level', 'service', 'txn_id'):
+        assert (actual[column].astype(str) == expected[column].astype(str)).all(), column
+    assert (actual['template'].cat.codes.to_numpy() == expected['template'].to_numpy()).all()
+    assert (actual['timestamp'].to_numpy() == expected['timestamp'].to_numpy().astype('datetime64[ms]')).all()
+    assert np.allclose(actual['amount'], expected['amount'], equal_nan=True)
+
+def test_parse_block_matches_regex_parser(lines):
+    columns, invalid = LogParser().parse_block(''.join(lines).encode())
+    assert invalid == 0
+    assert (columns['template'] >= 0).all()
+    assert_matches_reference(columns, lines)
+
+def test_block_boundaries_do_not_change_the_result(lines, tmp_path):
+    path = tmp_path / 'app.log'
+    path.write_text(''.join(lines))
+    assert b''.join(iter_blocks(path, block_bytes=4096)) == path.read_bytes()
+
+    columns, invalid = parse_files([path], block_bytes=4096)
+    assert invalid == 0
+    assert_matches_reference(columns, lines)
+
+def test_malformed_lines_are_counted_not_parsed(lines):
+    bad = ['\n', 'not a log line at all\n', '2025-11-05 10:00:00.000 [TRACE] [Nobody] hello\n']
+    columns, invalid = LogParser().parse_block(''.join(lines[:10] + bad).encode())
+    assert invalid == len(bad)
+    assert len(columns['timestamp']) == 10
+
+def test_last_line_without_newline(lines):
+    columns, invalid = LogParser().parse_block(''.join(lines[:3]).rstrip('\n').encode())
+    assert (len(columns['timestamp']), invalid) == (3, 0)
+    assert_matches_reference(columns, lines[:3])
+
+def test_empty_input():
+    columns, invalid = LogParser().parse_block(b'')
+    assert invalid == 0
+    assert all(len(values) == 0 for values in columns.values())
@@ -0,0 +1,49 @@
+"""ReplayCheckpoint resumes the same (possibly appended) file and restarts on a different one"""
+
+from replay_checkpoint import ReplayCheckpoint
+
+def save_progress(tmp_path, csv):
+    checkpoint = ReplayCheckpoint(tmp_path / 'state.json', csv, data_start=2)
+    checkpoint.record_number, checkpoint.offset = 2, 6
+    checkpoint.save()
+
+def test_resumes_after_append_to_small_file(tmp_path):
+    csv = tmp_path / 'transactions.csv'
+    csv.write_text('h\n1\n2\n')
+    save_progress(tmp_path, csv)
+    with open(csv, 'a') as f:
+        f.write('3\n')
+
+    checkpoint = ReplayCheckpoint(tmp_path / 'state.json', csv, data_start=2)
+    assert checkpoint.resumed
+    assert (checkpoint.record_number, checkpoint.offset) == (2, 6)
+
+def test_restarts_on_a_different_file(tmp_path):
+    csv = tmp_path / 'transactions.csv'
+    csv.write_text('h\n1\n2\n')
+    save_progress(tmp_path, csv)
+    csv.write_text('x\n1\n2\n3\n')
+
+    checkpoint = ReplayCheckpoint(tmp_path / 'state.json', csv, data_start=2)
+    assert not checkpoint.resumed
+    assert (checkpoint.record_number, checkpoint.offset) == (0, 2)
+
+def test_restart_flag_ignores_saved_state(tmp_path):
+    csv = tmp_path / 'transactions.csv'
+    csv.write_text('h\n1\n2\n')
+    save_progress(tmp_path, csv)
+    assert not ReplayCheckpoint(tmp_path / 'state.json', csv, data_start=2, restart=True).resumed
+
+def test_watermark_only_passes_contiguous_acks(tmp_path):
+    csv = tmp_path / 'transactions.csv'
+    csv.write_text('h\n1\n2\n3\n')
+    checkpoint = ReplayCheckpoint(tmp_path / 'state.json', csv, data_start=2)
+    sent = list(checkpoint.wrap([(4, {'record_number': 1}), (6, {'record_number': 2}), (8, {'record_number': 3})]))
+    assert len(sent) == 3
+
+    acked = {1, 3}
+    checkpoint.update(acked)
+    assert (checkpoint.record_number, checkpoint.offset, acked) == (1, 4, {3})
+    acked.add(2)
+    checkpoint.update(acked)
+    assert (checkpoint.record_number, checkpoint.offset, acked) == (3, 8, set())
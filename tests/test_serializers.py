@@ -0,0 +1,59 @@
+"""JSON and binary transaction messages round-trip through deserialize()"""
+
+import pandas as pd
+import pytest
+
+from conftest import SALES_CSV
+from realtime_stream import RealtimeStreamer
+from serializers import (MAX_STRING_BYTES, SERIALIZERS, binary_serialize, deserialize, get_serializer, json_serialize,
+                         schema_for)
+from stream_to_kafka import iter_transactions
+
+def generated_events(count=50):
+    streamer = RealtimeStreamer(first_transaction_id=1001)
+    return [streamer.generate_transaction() for _ in range(count)]
+
+def replay_events(count=50):
+    return list(iter_transactions(pd.read_csv(SALES_CSV).head(count)))
+
+def json_serialize_round_trip(event):
+    """What a consumer of the JSON format sees (tuples become lists, etc.)"""
+    return deserialize(json_serialize(event))
+
+@pytest.mark.parametrize('name', sorted(SERIALIZERS))
+@pytest.mark.parametrize('events', [generated_events, replay_events])
+def test_round_trip(name, events):
+    serialize = get_serializer(name)
+    for event in events():
+        assert deserialize(serialize(event)) == json_serialize_round_trip(event)
+
+def test_traced_events_use_their_own_schema():
+    event = dict(generated_events(1)[0], trace_id='abc123', origin_ts=1700000000.25)
+    assert deserialize(binary_serialize(event)) == event
+
+def test_unknown_category_values_are_escaped():
+    event = dict(generated_events(1)[0], region='Antarctica', product_name='Quantum Toaster')
+    assert deserialize(binary_serialize(event)) == event
+
+def test_long_text_falls_back_to_json():
+    event = dict(generated_events(1)[0], region='x' * MAX_STRING_BYTES)
+    assert deserialize(binary_serialize(event)) == event
+    assert binary_serialize(event)[:1] != b'{'
+
+    event['product_name'] = 'é' * 40_000
+    assert binary_serialize(event)[:1] == b'{'
+    assert deserialize(binary_serialize(event)) == event
+    with pytest.raises(OverflowError, match="'product_name' is 80,000 bytes"):
+        schema_for(event).encode(event)
+
+def test_binary_is_smaller_than_json():
+    event = generated_events(1)[0]
+    assert len(binary_serialize(event)) < len(json_serialize(event))
+
+def test_rejects_unknown_input():
+    with pytest.raises(ValueError):
+        get_serializer('avro')
+    with pytest.raises(ValueError):
+        binary_serialize({'unexpected': 1})
+    with pytest.raises(ValueError):
+        deserialize(b'\x00\x01garbage')
@@ -0,0 +1,158 @@
+"""Sketch error bounds against exact answers on seeded data, and merge equivalence"""
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sketches import CountMinSketch, HyperLogLog, KLLSketch, TopK
+
+@pytest.fixture(scope='module')
+def rng():
+    return np.random.default_rng(42)
+
+def chunks(values, n=4):
+    return np.array_split(values, n)
+
+def test_hyperloglog_within_error_bound(rng):
+    values = rng.integers(0, 50_000, size=200_000)
+    exact = len(np.unique(values))
+    sketch = HyperLogLog(precision=12)
+    sketch.update(values)
+    # Three standard errors of 1.04 / sqrt(4096)
+    assert abs(sketch.count() - exact) / exact < 3 * 1.04 / 64
+
+def test_hyperloglog_small_counts_are_near_exact():
+    sketch = HyperLogLog(precision=12)
+    sketch.update(np.arange(100))
+    assert abs(sketch.count() - 100) <= 2
+
+def test_hyperloglog_merged_chunks_equal_one_pass(rng):
+    values = rng.integers(0, 1_000_000, size=100_000)
+    whole = HyperLogLog(precision=10)
+    whole.update(values)
+    merged = HyperLogLog(precision=10)
+    for part in chunks(values):
+        chunk = HyperLogLog(precision=10)
+        chunk.update(part)
+        merged.merge(chunk)
+    assert np.array_equal(merged.registers, whole.registers)
+    assert merged.count() == whole.count()
+
+def test_hyperloglog_ignores_nulls_and_rejects_mismatched_merges():
+    sketch = HyperLogLog()
+    sketch.update([1.0, np.nan, None, 1.0])
+    assert sketch.count() == 1
+    with pytest.raises(ValueError):
+        sketch.merge(HyperLogLog(precision=10))
+    with pytest.raises(ValueError):
+        HyperLogLog(precision=3)
+
+def rank_error(sorted_values, estimate, q):
+    return abs(np.searchsorted(sorted_values, estimate, side='right') / len(sorted_values) - q)
+
+QUANTILES = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+def test_kll_quantiles_within_rank_error(rng):
+    values = rng.lognormal(3, 1, size=100_000)
+    ordered = np.sort(values)
+    sketch = KLLSketch(k=200, seed=1)
+    for part in chunks(values, 20):
+        sketch.update(part)
+    assert sketch.n == len(values)
+    assert (sketch.min, sketch.max) == (ordered[0], ordered[-1])
+    for q in QUANTILES:
+        assert rank_error(ordered, sketch.quantile(q), q) < 0.02, q
+
+def test_kll_merged_chunks_match_one_pass(rng):
+    values = rng.normal(100, 15, size=80_000)
+    ordered = np.sort(values)
+    whole = KLLSketch(k=200, seed=1)
+    whole.update(values)
+    merged = KLLSketch(k=200, seed=2)
+    for i, part in enumerate(chunks(values)):
+        chunk = KLLSketch(k=200, seed=10 + i)
+        chunk.update(part)
+        merged.merge(chunk)
+    assert (merged.n, merged.min, merged.max) == (whole.n, whole.min, whole.max)
+    for q in QUANTILES:
+        assert rank_error(ordered, merged.quantile(q), q) < 0.02, q
+        assert abs(rank_error(ordered, merged.quantile(q), q) - rank_error(ordered, whole.quantile(q), q)) < 0.02
+
+def test_kll_stays_small_and_handles_edges():
+    sketch = KLLSketch(k=100, seed=0)
+    assert np.isnan(sketch.quantile(0.5))
+    sketch.update(np.arange(1_000_000, dtype=float))
+    assert sum(len(level) for level in sketch.levels) < 400
+    assert sketch.quantile(0) == 0 and sketch.quantile(1) == 999_999
+    sketch.update([np.nan])
+    assert sketch.n == 1_000_000
+
+def zipf_stream(rng, size=200_000, keys=5_000):
+    """Product-like keys with Zipf popularity and random weights"""
+    ranks = np.minimum(rng.zipf(1.3, size=size), keys)
+    return np.array([f"product-{r}" for r in ranks], dtype=object), rng.uniform(1, 100, size=size).round(2)
+
+def exact_totals(keys, weights):
+    return pd.Series(weights).groupby(keys).sum()
+
+def test_count_min_never_underestimates_and_stays_within_bound(rng):
+    keys, weights = zipf_stream(rng)
+    exact = exact_totals(keys, weights)
+    sketch = CountMinSketch.from_error(epsilon=0.001, delta=0.01)
+    sketch.update(keys, weights)
+    estimates = sketch.estimate(pd.Series(exact.index))
+    errors = estimates - exact.to_numpy()
+    assert sketch.total == pytest.approx(weights.sum())
+    assert (errors >= -1e-6).all()
+    assert (errors <= 0.001 * weights.sum()).mean() >= 0.99
+
+def test_count_min_merged_chunks_equal_one_pass_and_subtract_exactly(rng):
+    keys, weights = zipf_stream(rng, size=50_000)
+    whole = CountMinSketch(width=1024, depth=4)
+    whole.update(keys, weights)
+    parts = []
+    merged = CountMinSketch(width=1024, depth=4)
+    for key_part, weight_part in zip(chunks(keys), chunks(weights)):
+        part = CountMinSketch(width=1024, depth=4)
+        part.update(key_part, weight_part)
+        parts.append(part)
+        merged.merge(part)
+    assert np.allclose(merged.counts, whole.counts)
+    assert merged.total == pytest.approx(whole.total)
+
+    rest = CountMinSketch(width=1024, depth=4)
+    for part in parts[1:]:
+        rest.merge(part)
+    assert np.allclose(merged.subtract(parts[0]).counts, rest.counts)
+    with pytest.raises(ValueError):
+        merged.merge(CountMinSketch(width=512, depth=4))
+
+def test_count_min_from_error_shape():
+    sketch = CountMinSketch.from_error(epsilon=0.01, delta=0.01)
+    assert (sketch.width, sketch.depth) == (math.ceil(math.e / 0.01), math.ceil(math.log(100)))
+
+def test_top_k_finds_the_heaviest_keys(rng):
+    keys, weights = zipf_stream(rng)
+    exact = exact_totals(keys, weights).sort_values(ascending=False)
+    top = TopK(k=10, width=2048, depth=4)
+    for key_part, weight_part in zip(chunks(keys, 50), chunks(weights, 50)):
+        top.update(key_part, weight_part)
+    ranked = top.top()
+    assert len(ranked) == 10
+    assert len({key for key, _ in ranked} & set(exact.index[:10])) >= 9
+    assert ranked[0][0] == exact.index[0]
+    for key, estimate in ranked:
+        assert estimate >= exact[key] - 1e-6
+        assert estimate - exact[key] <= math.e / 2048 * weights.sum()
+
+def test_top_k_chunked_updates_match_one_pass(rng):
+    keys, weights = zipf_stream(rng, size=50_000)
+    whole = TopK(k=5, width=2048)
+    whole.update(keys, weights)
+    chunked = TopK(k=5, width=2048)
+    for key_part, weight_part in zip(chunks(keys, 25), chunks(weights, 25)):
+        chunked.update(key_part, weight_part)
+    assert np.allclose(chunked.sketch.counts, whole.sketch.counts)
+    assert [key for key, _ in chunked.top()] == [key for key, _ in whole.top()]
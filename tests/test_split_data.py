@@ -0,0 +1,29 @@
+"""split_data shard planning"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import SALES_CSV
+from split_data import plan_shards, shard_slug
+
+def test_missing_region_gets_an_unknown_shard():
+    df = pd.read_csv(SALES_CSV).head(50)
+    df.loc[[3, 7], 'Region'] = np.nan
+    df.loc[9, 'Region'] = 'Unknown'
+
+    shards = plan_shards(df, 'region', 0.7)
+
+    assert sum(len(shard) for shard in shards.values()) == len(df)
+    assert list(shards['region_unknown'].index) == [3, 7, 9]
+    assert 'region_nan' not in shards
+
+def test_shard_slug():
+    assert shard_slug('Home Appliances') == 'home_appliances'
+    assert shard_slug(np.nan) == shard_slug(None) == shard_slug('???') == 'unknown'
+
+@pytest.mark.parametrize('strategy', ['time', 'hash', 'category'])
+def test_every_row_lands_in_one_shard(strategy):
+    df = pd.read_csv(SALES_CSV, parse_dates=['Date'])
+    shards = plan_shards(df, strategy, 0.7)
+    assert sorted(i for shard in shards.values() for i in shard['Transaction ID']) == sorted(df['Transaction ID'])
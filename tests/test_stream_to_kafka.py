@@ -0,0 +1,72 @@
+"""stream_to_kafka pacing and checkpointed replay with a fake KafkaProducer"""
+
+import time
+from types import SimpleNamespace
+
+import pandas as pd
+
+import stream_to_kafka
+from conftest import SALES_CSV
+from replay_checkpoint import ReplayCheckpoint
+
+class FakeFuture:
+    def __init__(self, partition):
+        self.metadata = SimpleNamespace(partition=partition, offset=0)
+
+    def add_callback(self, callback, *args):
+        callback(*args, self.metadata)
+        return self
+
+    def add_errback(self, errback, *args):
+        return self
+
+class FakeProducer:
+    instances = []
+
+    def __init__(self, **config):
+        self.sent = []
+        FakeProducer.instances.append(self)
+
+    def send(self, topic, key=None, value=None):
+        self.sent.append(value)
+        return FakeFuture(len(self.sent) % 3)
+
+    def flush(self):
+        pass
+
+    def partitions_for(self, topic):
+        return {0, 1, 2}
+
+    def close(self):
+        pass
+
+def replay_csv(tmp_path, rows=20):
+    path = tmp_path / 'transactions.csv'
+    pd.read_csv(SALES_CSV).head(rows).to_csv(path, index=False)
+    return path
+
+def test_checkpointed_replay_is_rate_limited(tmp_path, monkeypatch):
+    monkeypatch.setattr(stream_to_kafka, 'KafkaProducer', FakeProducer)
+    csv = replay_csv(tmp_path)
+    state = tmp_path / 'state.json'
+
+    start = time.monotonic()
+    stream_to_kafka.stream_to_kafka(str(csv), rate=40, burst=1, checkpoint=str(state))
+    elapsed = time.monotonic() - start
+
+    assert len(FakeProducer.instances[-1].sent) == 20
+    # 20 records at 40/s from an empty bucket take about half a second
+    assert elapsed >= 0.4
+    assert ReplayCheckpoint(state, csv, data_start=0).record_number == 20
+
+def test_checkpointed_replay_resumes_after_the_last_acked_record(tmp_path, monkeypatch):
+    monkeypatch.setattr(stream_to_kafka, 'KafkaProducer', FakeProducer)
+    csv = replay_csv(tmp_path, rows=5)
+    state = tmp_path / 'state.json'
+    stream_to_kafka.stream_to_kafka(str(csv), checkpoint=str(state))
+    with open(csv, 'a') as f:
+        f.write(pd.read_csv(SALES_CSV).iloc[5:7].to_csv(header=False, index=False))
+
+    stream_to_kafka.stream_to_kafka(str(csv), checkpoint=str(state))
+
+    assert [t['record_number'] for t in FakeProducer.instances[-1].sent] == [6, 7]
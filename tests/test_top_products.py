@@ -0,0 +1,112 @@
+"""WindowedTopK pane sliding against an exact groupby, and the snapshot round trip"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from top_products import METRICS, WindowedTopK, load_snapshot, parse_window, query_snapshot, window_label, write_snapshot
+
+PANE = 60
+WINDOWS = (300, 3600, None)
+START = 1_000_000
+
+def event_batches(seed, batches=40, products=40):
+    """Seeded batches moving forward in time, with late events and jumps over several panes"""
+    rng = np.random.default_rng(seed)
+    now = START
+    for i in range(batches):
+        # Mostly a pane forward, sometimes a jump of up to 20 panes
+        now += PANE * (rng.integers(5, 21) if i % 7 == 6 else rng.integers(0, 2))
+        size = int(rng.integers(1, 80))
+        # Up to 80 minutes late: mostly inside the hour but outside the 5
+        # minutes, a few too old for any window
+        lateness = rng.exponential(900, size=size).clip(max=4800) * (rng.random(size) < 0.3)
+        times = now + rng.uniform(0, PANE, size=size) - lateness
+        yield list(zip(times, [f"product-{p}" for p in rng.integers(0, products, size=size)],
+                       rng.uniform(1, 500, size=size).round(2), rng.integers(1, 5, size=size)))
+
+def exact_top(events, latest, window, metric, k):
+    frame = pd.DataFrame(events, columns=['time', 'product', 'revenue', 'units'])
+    if window is not None:
+        frame = frame[frame['time'] // PANE * PANE > latest - window]
+    totals = frame.groupby('product')[METRICS].sum()
+    return totals.sort_values(metric, ascending=False).head(k), totals
+
+def assert_matches_exact(tracker, events, window, metric):
+    top = tracker.query(window, metric)
+    expected, totals = exact_top(events, tracker.latest, window, metric, tracker.k)
+    assert len(top) == len(expected)
+    # Ties on units can order products differently, so compare the ranked values
+    assert [row[metric] for row in top] == pytest.approx(list(expected[metric]))
+    for row in top:
+        assert row['revenue'] == pytest.approx(totals.loc[row['product'], 'revenue'], abs=0.01)
+        assert row['units'] == totals.loc[row['product'], 'units']
+
+@pytest.mark.parametrize('seed', range(3))
+def test_windows_match_exact_groupby(seed):
+    # Fewer products than candidates and a wide sketch make the estimates
+    # exact, so any error is in the pane bookkeeping
+    tracker = WindowedTopK(WINDOWS, PANE, k=10, candidates=64, width=4096)
+    events = []
+    for batch in event_batches(seed):
+        tracker.add(batch)
+        events += batch
+        for window in WINDOWS:
+            for metric in METRICS:
+                assert_matches_exact(tracker, events, window, metric)
+    assert tracker.too_old > 0
+    assert tracker.events == len(events)
+    # Panes older than the longest window are dropped
+    assert min(tracker.panes) > tracker.latest - 3600
+
+def test_late_pane_only_counts_in_windows_that_cover_it():
+    tracker = WindowedTopK(WINDOWS, PANE, k=5)
+    tracker.add([(START + 600, 'a', 10.0, 1)])
+    tracker.add([(START, 'b', 20.0, 2)])
+    assert [row['product'] for row in tracker.query(300)] == ['a']
+    assert [row['product'] for row in tracker.query(3600)] == ['b', 'a']
+    # Sliding past the 5 minute window must not subtract 'b' a second time
+    tracker.add([(START + 1200, 'c', 5.0, 1)])
+    assert tracker.query(300) == [{'product': 'c', 'revenue': 5.0, 'units': 1}]
+    assert [row['revenue'] for row in tracker.query(3600)] == [20.0, 10.0, 5.0]
+    # Too old for every window but still part of the all-time ranking
+    tracker.add([(START + 7200, 'd', 1.0, 1), (START, 'e', 99.0, 9)])
+    assert tracker.too_old == 1
+    assert [row['product'] for row in tracker.query(3600)] == ['d']
+    assert tracker.query(None)[0] == {'product': 'e', 'revenue': 99.0, 'units': 9}
+
+def test_untracked_windows_are_rejected():
+    with pytest.raises(ValueError):
+        WindowedTopK((90,), PANE)
+    tracker = WindowedTopK((300,), PANE)
+    tracker.add([(START, 'a', 1.0, 1)])
+    with pytest.raises(ValueError):
+        tracker.query(None)
+    with pytest.raises(ValueError):
+        tracker.query(600)
+
+def test_window_labels_round_trip():
+    for text in ('30s', '5m', '1h', '7d', 'all'):
+        assert window_label(parse_window(text)) == text
+    assert parse_window('300') == 300
+
+def test_snapshot_round_trip(tmp_path):
+    tracker = WindowedTopK(WINDOWS, PANE, k=3)
+    for batch in event_batches(0, batches=20):
+        tracker.add(batch)
+    path = tmp_path / 'top_products.json'
+    write_snapshot(tracker.snapshot(), path)
+
+    snapshot = load_snapshot(path)
+    assert snapshot['events'] == tracker.events
+    assert set(snapshot['windows']) == {'5m', '1h', 'all'}
+    for window in WINDOWS:
+        for metric in METRICS:
+            assert query_snapshot(snapshot, window_label(window), metric, k=3) == tracker.query(window, metric)
+    assert query_snapshot(snapshot, '1d') == []
+
+    snapshot['updated'] -= 120
+    write_snapshot(snapshot, path)
+    assert load_snapshot(path, max_age=60) is None
+    assert load_snapshot(path, max_age=None) is not None
+    assert load_snapshot(tmp_path / 'missing.json') is None
@@ -0,0 +1,167 @@
+"""WindowAggregator results, late-data handling and a brute-force cross-check"""
+
+import random
+from types import SimpleNamespace
+
+import pytest
+from kafka import TopicPartition
+
+import window_aggregator
+from window_aggregator import (AggregatorService, WindowAggregator, WindowSpec, _RestoreWatermark, event_view,
+                               format_time, parse_event_time)
+
+DIMENSIONS = ('Electronics', 'North', 'Cash')
+
+def window(results, name, start):
+    return [r for r in results if r['window'] == name and r['start'] == format_time(start)]
+
+def test_tumbling_window_closes_at_the_watermark():
+    aggregator = WindowAggregator([WindowSpec(60)], max_delay=0, allowed_lateness=0)
+    aggregator.add(10, DIMENSIONS, 5.0, 1)
+    aggregator.add(50, DIMENSIONS, 7.5, 2)
+    assert aggregator.advance(59) == []
+
+    [result] = aggregator.advance(60)
+    assert (result['start'], result['end']) == (format_time(0), format_time(60))
+    assert (result['count'], result['revenue'], result['units'], result['revision']) == (2, 12.5, 3, 0)
+    assert result['by']['category'] == {'Electronics': [2, 12.5, 3]}
+
+def test_sliding_window_sums_its_panes():
+    aggregator = WindowAggregator([WindowSpec(120, 60)], max_delay=0, allowed_lateness=0)
+    for t in (30, 90, 150):
+        aggregator.add(t, DIMENSIONS, 1.0, 1)
+    results = aggregator.advance(180)
+    assert [r['count'] for r in window(results, 'sliding_120s_60s', 0)] == [2]
+    assert [r['count'] for r in window(results, 'sliding_120s_60s', 60)] == [2]
+
+def test_late_event_within_lateness_republishes_with_next_revision():
+    aggregator = WindowAggregator([WindowSpec(60)], max_delay=0, allowed_lateness=30)
+    aggregator.add(10, DIMENSIONS, 1.0, 1)
+    aggregator.add(70, DIMENSIONS, 1.0, 1)
+    [first] = aggregator.advance()
+
+    aggregator.add(20, DIMENSIONS, 4.0, 1)
+    [revised] = aggregator.advance()
+    assert (revised['start'], revised['revision'], revised['count'], revised['revenue']) == (first['start'], 1, 2, 5.0)
+    assert aggregator.late_updates == 1
+
+def test_event_past_allowed_lateness_is_dropped():
+    aggregator = WindowAggregator([WindowSpec(60)], max_delay=0, allowed_lateness=10)
+    aggregator.add(10, DIMENSIONS, 1.0, 1)
+    aggregator.add(200, DIMENSIONS, 1.0, 1)
+    aggregator.advance()
+    aggregator.add(20, DIMENSIONS, 1.0, 1)
+    assert aggregator.advance() == []
+    assert aggregator.late_dropped == 1
+
+def test_old_panes_are_released():
+    aggregator = WindowAggregator([WindowSpec(60)], max_delay=0, allowed_lateness=0)
+    for t in range(0, 6000, 7):
+        aggregator.add(t, DIMENSIONS, 1.0, 1)
+        aggregator.advance()
+    assert aggregator.open_panes() <= 2
+
+def test_window_spec_validation():
+    assert WindowSpec.parse('300:60').name == 'sliding_300s_60s'
+    assert WindowSpec.parse('60').name == 'tumbling_60s'
+    with pytest.raises(ValueError):
+        WindowSpec(300, 70)
+
+def test_event_view_reads_both_event_shapes():
+    generated = {'timestamp': '2025-01-01 00:01:00', 'category': 'Books', 'region': 'East',
+                 'payment_method': 'Cash', 'total_amount': 9.5, 'quantity': 2}
+    replayed = {'date': '2025-01-01', 'product_category': 'Books', 'region': 'East',
+                'payment_method': 'Cash', 'total_revenue': '9.5', 'units_sold': '2'}
+    assert event_view(generated)[1:] == event_view(replayed)[1:] == (('Books', 'East', 'Cash'), 9.5, 2)
+    assert event_view(generated)[0] - event_view(replayed)[0] == 60
+
+@pytest.mark.parametrize('seed', range(5))
+def test_latest_revisions_match_brute_force(seed):
+    rng = random.Random(seed)
+    specs = [WindowSpec(60), WindowSpec(180, 60)]
+    lateness = 45
+    aggregator = WindowAggregator(specs, max_delay=10, allowed_lateness=lateness)
+    # (event time, units, watermark when added): a window takes an event unless it was past the lateness then
+    events = []
+    latest = {}
+    clock = 1_000_000.0
+    for _ in range(60):
+        for _ in range(rng.randint(1, 8)):
+            clock += rng.uniform(0, 6)
+            t = clock - rng.choice([0, 0, 0, rng.uniform(0, 120)])
+            units = rng.randint(1, 3)
+            events.append((t, units, aggregator.watermark))
+            aggregator.add(t, DIMENSIONS, float(units), units)
+        for result in aggregator.advance():
+            latest[(result['window'], result['start'])] = result
+
+    sizes = {spec.name: spec.size for spec in specs}
+    assert latest
+    for (name, start), result in latest.items():
+        begin, size = parse_event_time(start), sizes[name]
+        expected = [u for t, u, watermark in events
+                    if begin <= t < begin + size and begin + size + lateness > watermark]
+        assert (result['count'], result['units']) == (len(expected), sum(expected)), (name, start)
+
+class FakeCommitConsumer:
+    """One partition; keeps what was committed, as a restarted consumer would read it back"""
+
+    def __init__(self, committed=None, position=0):
+        self.tp = TopicPartition('ecommerce-transactions', 0)
+        self.committed_offsets = committed or {}
+        self.next_offset = position
+
+    def assignment(self):
+        return {self.tp}
+
+    def position(self, tp):
+        return self.next_offset
+
+    def commit(self, offsets):
+        self.committed_offsets = offsets
+
+    def committed(self, tp, metadata=False):
+        return self.committed_offsets.get(tp)
+
+def test_restart_replays_open_windows_with_their_committed_revisions():
+    events = [(10, 0), (70, 1), (20, 2)]
+    first = AggregatorService(WindowAggregator([WindowSpec(60)], max_delay=0, allowed_lateness=60))
+    first.producer, first.consumer = SimpleNamespace(flush=lambda: None), FakeCommitConsumer(position=3)
+    published = []
+    for t, offset in events:
+        first.aggregator.add(t, DIMENSIONS, 1.0, 1, partition=0, offset=offset)
+        published += first.aggregator.advance()
+    assert [(r['start'], r['revision'], r['count']) for r in published] == [(format_time(0), 0, 1),
+                                                                           (format_time(0), 1, 2)]
+    first.commit()
+
+    # A new process reads the committed offset, watermark, position and revisions back
+    second = AggregatorService(WindowAggregator([WindowSpec(60)], max_delay=0, allowed_lateness=60))
+    second.consumer = FakeCommitConsumer(first.consumer.committed_offsets)
+    _RestoreWatermark(second).on_partitions_assigned([second.consumer.tp])
+    second.consumer.next_offset = second.consumer.committed(second.consumer.tp).offset
+    assert second.consumer.next_offset == 0 and second.replaying()
+
+    # Results are held back until the replay is past the committed position
+    for t, offset in events:
+        second.aggregator.add(t, DIMENSIONS, 1.0, 1, partition=0, offset=offset)
+        second.consumer.next_offset = offset + 1
+        if not second.replaying():
+            replayed = second.aggregator.advance()
+    assert [(r['start'], r['revision'], r['count']) for r in replayed] == [(format_time(0), 1, 2)]
+
+    # A late event after the restart moves on from the restored revision
+    second.aggregator.add(30, DIMENSIONS, 1.0, 1, partition=0, offset=3)
+    [revised] = second.aggregator.advance()
+    assert (revised['revision'], revised['count']) == (2, 3)
+
+def test_revisions_left_out_of_oversized_commit_metadata(monkeypatch):
+    aggregator = WindowAggregator([WindowSpec(60)], max_delay=0, allowed_lateness=60)
+    aggregator.add(10, DIMENSIONS, 1.0, 1)
+    aggregator.add(70, DIMENSIONS, 1.0, 1)
+    aggregator.advance()
+    aggregator.add(20, DIMENSIONS, 1.0, 1)
+    aggregator.advance()
+    assert '"revisions": {"tumbling_60s": {"0": 1}}' in window_aggregator._commit_metadata(aggregator, 3)
+    monkeypatch.setattr(window_aggregator, 'METADATA_MAX_BYTES', 50)
+    assert window_aggregator._commit_metadata(aggregator, 3) == '{"watermark": 70, "position": 3}'